@@ -1,51 +1,85 @@
 // 元素波纹 Service Worker - 优化版本
 const CACHE_NAME = 'element-ripples-v2';
 
-// 核心资源 - 必须缓存
-const CORE_ASSETS = [
-  './',
-  './index.html',
-  './css/style.css',
-  './js/audio-manager.js',
-  './js/ripple-renderer.js',
-  './js/main.js',
-  './manifest.json'
+// precache-manifest:start（由 tools/precache_manifest.py 生成，请勿手动修改）
+const PRECACHE_MANIFEST = [
+  {"url": "./", "revision": "cfc2e698da"},
+  {"url": "./css/style.css", "revision": "d2ab10d406"},
+  {"url": "./index.html", "revision": "cfc2e698da"},
+  {"url": "./js/audio-manager.js", "revision": "ae5d6e678b"},
+  {"url": "./js/main.js", "revision": "6549801e42"},
+  {"url": "./js/ripple-renderer.js", "revision": "7375ff1cfe"},
+  {"url": "./manifest.json", "revision": "9c773215db"}
 ];
+// precache-manifest:end
 
-// 次要资源 - 如果可能，也缓存这些
-const SECONDARY_ASSETS = [
-  './icons/icon-192.png',
-  './icons/icon-512.png',
+// 预缓存按文件内容（revision）缓存，版本更新时只下载内容变化的文件；
+// CACHE_NAME 只用于运行时缓存
+const PRECACHE_NAME = 'element-ripples-precache';
+
+// 外部资源 - 如果可能，也缓存这些
+const EXTERNAL_ASSETS = [
   'https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@400;700&display=swap'
 ];
 
-// 所有要缓存的资源
-const ASSETS = [...CORE_ASSETS, ...SECONDARY_ASSETS];
+// 清单中的地址 -> 带 revision 的缓存键
+const PRECACHE_KEYS = new Map(PRECACHE_MANIFEST.map(entry => {
+  const url = new URL(entry.url, self.location);
+  const key = new URL(url);
+  key.searchParams.set('__rev', entry.revision);
+  return [url.href, key.href];
+}));
+
+// 查找请求对应的预缓存键（忽略查询参数）
+function precacheKeyFor(request) {
+  const url = new URL(request.url);
+  url.search = '';
+  url.hash = '';
+  return PRECACHE_KEYS.get(url.href);
+}
 
 // 安装 Service Worker
 self.addEventListener('install', event => {
   event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(cache => {
-        console.log('缓存已打开');
-        return cache.addAll(ASSETS);
-      })
+    caches.open(PRECACHE_NAME)
+      .then(cache => Promise.all([...PRECACHE_KEYS].map(([url, key]) =>
+        cache.match(key).then(cached => {
+          if (cached) {
+            return;
+          }
+          // 只下载新增或内容变化的文件，缺失的文件跳过，不影响安装
+          return fetch(url, { cache: 'no-cache' })
+            .then(response => {
+              if (response.ok) {
+                return cache.put(key, response);
+              }
+            })
+            .catch(() => {});
+        })
+      )))
+      .then(() => caches.open(CACHE_NAME))
+      .then(cache => Promise.all(EXTERNAL_ASSETS.map(url => cache.add(url).catch(() => {}))))
       .then(() => self.skipWaiting())
   );
 });
 
 // 激活 Service Worker
 self.addEventListener('activate', event => {
+  const currentKeys = new Set(PRECACHE_KEYS.values());
   event.waitUntil(
-    caches.keys().then(cacheNames => {
-      return Promise.all(
-        cacheNames.filter(cacheName => {
-          return cacheName !== CACHE_NAME;
-        }).map(cacheName => {
-          return caches.delete(cacheName);
-        })
-      );
-    }).then(() => self.clients.claim())
+    caches.open(PRECACHE_NAME)
+      .then(cache => cache.keys().then(requests => Promise.all(
+        requests
+          .filter(request => !currentKeys.has(request.url))
+          .map(request => cache.delete(request))
+      )))
+      .then(() => caches.keys())
+      .then(cacheNames => Promise.all(
+        cacheNames
+          .filter(cacheName => cacheName !== CACHE_NAME && cacheName !== PRECACHE_NAME)
+          .map(cacheName => caches.delete(cacheName))
+      ))
+      .then(() => self.clients.claim())
   );
 });
 
@@ -56,32 +90,18 @@ self.addEventListener('fetch', event => {
 
   // 针对不同类型的请求使用不同的策略
 
-  // 1. 核心应用资源 - 缓存优先，网络回退
-  if (CORE_ASSETS.includes(requestURL.pathname) ||
-      requestURL.pathname === '/' ||
-      requestURL.pathname.endsWith('.html')) {
+  // 1. 预缓存的资源 - 缓存优先，网络回退
+  const precacheKey = precacheKeyFor(event.request);
+  if (precacheKey) {
     event.respondWith(
-      caches.match(event.request)
-        .then(cachedResponse => {
-          // 返回缓存的响应，同时在后台更新缓存
-          const fetchPromise = fetch(event.request)
-            .then(networkResponse => {
-              // 更新缓存
-              if (networkResponse && networkResponse.status === 200) {
-                const responseToCache = networkResponse.clone();
-                caches.open(CACHE_NAME)
-                  .then(cache => cache.put(event.request, responseToCache));
-              }
-              return networkResponse;
-            })
-            .catch(() => cachedResponse); // 如果网络请求失败，仍使用缓存
-
-          return cachedResponse || fetchPromise;
-        })
+      caches.open(PRECACHE_NAME)
+        .then(cache => cache.match(precacheKey))
+        .then(cachedResponse => cachedResponse || fetch(event.request))
         .catch(() => {
-          // 如果是导航请求且缓存失败，返回首页
-          if (event.request.mode === 'navigate') {
-            return caches.match('./index.html');
+          // 如果是导航请求且网络不可用，返回首页
+          const indexKey = PRECACHE_KEYS.get(new URL('./index.html', self.location).href);
+          if (event.request.mode === 'navigate' && indexKey) {
+            return caches.match(indexKey);
           }
           return fetch(event.request);
         })
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站点工具基准测试
+
+在临时目录中生成指定规模的合成项目目录（projects/<分类>/<项目>/project.json、
+README.md、index.html，带有真实分布的标签、更新日志和功能列表），然后依次运行
+各个工具，记录耗时、峰值内存（RSS）和输出文件大小，结果保存为 JSON。
+可以与之前保存的基线结果对比，耗时或内存超出阈值时视为性能回退。
+
+被测工具（按顺序运行，每种规模使用同一份合成目录）:
+  homepage       generate_homepage_simplified.py（冷启动，无项目目录缓存）
+  homepage_warm  generate_homepage_simplified.py（复用上一次的项目目录缓存）
+  details        generate_project_details.py
+  init_all       manage_versions.py init-all（补全约三成项目缺少的版本信息）
+  validate       validate_projects.py（在 init_all 之后运行，此时所有项目都应通过验证）
+
+用法:
+  python tools/benchmark.py                              # 100、1000、10000 个项目
+  python tools/benchmark.py --full                       # 额外测试 50000 个项目
+  python tools/benchmark.py --sizes 100 1000 --tools homepage details
+  python tools/benchmark.py --output bench.json --save-baseline
+  python tools/benchmark.py --baseline tools/benchmark_baseline.json --threshold 0.2
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+# 工具目录
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 默认测试规模，--full 时追加 FULL_SIZES
+DEFAULT_SIZES = [100, 1000, 10000]
+FULL_SIZES = [50000]
+
+# 默认结果文件和基线文件
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_BASELINE = os.path.join(TOOLS_DIR, "benchmark_baseline.json")
+
+# 复制到临时目录时忽略的文件
+IGNORED_TOOL_FILES = shutil.ignore_patterns(".cache", "__pycache__", "开发过程")
+
+# 合成数据使用的词汇
+TITLE_WORDS = ["光影", "粒子", "星空", "流体", "墨韵", "赛博", "量子", "霓虹", "涟漪", "极光",
+               "像素", "引力", "声波", "晶体", "花园", "迷宫", "烟花", "镜像", "漩涡", "织梦"]
+FEATURE_WORDS = ["实时渲染", "触摸交互", "重力感应", "音频可视化", "自定义颜色", "截图保存",
+                 "多点触控", "粒子拖尾", "物理碰撞", "参数面板", "全屏模式", "移动端适配"]
+DEPENDENCIES = ["Three.js", "p5.js", "GSAP", "Tailwind CSS", "Matter.js", "Tone.js", "Canvas API", "WebGL"]
+STATUSES = ["stable", "stable", "stable", "beta", "beta", "deprecated"]
+
+
+# 被测工具: 名称 -> (命令行参数, 输出文件函数)
+def _homepage_outputs(root):
+    # 主页样式和脚本默认外置为 assets/home.<哈希>.css/js，计入输出体积
+    assets = sorted(glob.glob(os.path.join(root, "assets", "home.*.css")) +
+                    glob.glob(os.path.join(root, "assets", "home.*.js")))
+    return [os.path.join(root, "index.html")] + assets
+
+
+def _details_outputs(root):
+    outputs = []
+    projects_root = os.path.join(root, "projects")
+    for category in os.listdir(projects_root):
+        category_path = os.path.join(projects_root, category)
+        for project in os.listdir(category_path):
+            outputs.append(os.path.join(category_path, project, "project-details.html"))
+    return outputs
+
+
+def _no_outputs(root):
+    return []
+
+
+TOOLS = {
+    "homepage": (["tools/generate_homepage_simplified.py"], _homepage_outputs),
+    "homepage_warm": (["tools/generate_homepage_simplified.py"], _homepage_outputs),
+    "details": (["tools/generate_project_details.py"], _details_outputs),
+    "init_all": (["tools/manage_versions.py", "init-all"], _no_outputs),
+    "validate": (["tools/validate_projects.py"], _no_outputs),
+}
+
+
+def load_site_config():
+    """读取仓库中的站点配置，合成项目使用其中的分类和标签"""
+    with open(os.path.join(TOOLS_DIR, "site_config_simplified.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def synthetic_project(rng, index, category_id, category_ids, tag_ids):
+    """生成一个合成项目的 project.json 内容和 README"""
+    title = f"{rng.choice(TITLE_WORDS)}{rng.choice(TITLE_WORDS)}-{index}"
+    major = rng.randint(1, 3)
+    changelog = []
+    for minor in range(rng.randint(1, 6)):
+        changelog.append({
+            "version": f"{major}.{minor}.0",
+            "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "changes": [f"{rng.choice(FEATURE_WORDS)}优化" for _ in range(rng.randint(1, 4))]
+        })
+    features = rng.sample(FEATURE_WORDS, rng.randint(2, 6))
+
+    config = {
+        "title": title,
+        "description": f"{title}：一个结合{'、'.join(features[:2])}的创意网页玩具",
+        "status": rng.choice(STATUSES),
+        "primary_category": category_id,
+        "secondary_categories": rng.sample(
+            [c for c in category_ids if c != category_id], rng.choice([0, 0, 1, 2])
+        ),
+        "tags": rng.sample(tag_ids, min(len(tag_ids), rng.randint(1, 4))),
+        "order": rng.randint(1, 100),
+        "features": features,
+        "dependencies": rng.sample(DEPENDENCIES, rng.randint(0, 3)),
+        "author": {
+            "name": "Little Shock Team",
+            "creator": "Little-Shock",
+            "contributors": []
+        }
+    }
+
+    # 约三成项目缺少版本信息，使 init-all 有实际工作量
+    if rng.random() >= 0.3:
+        config["version"] = changelog[-1]["version"]
+        config["last_updated"] = changelog[-1]["date"]
+        config["creation_date"] = changelog[0]["date"]
+        config["changelog"] = changelog
+        config["compatibility"] = {
+            "mobile": rng.random() < 0.8,
+            "desktop": True,
+            "min_screen_width": rng.choice([320, 375, 768]),
+            "performance_impact": rng.choice(["low", "medium", "high"])
+        }
+
+    readme = [f"# {title}", "", config["description"], "", "## 功能特点", ""]
+    readme.extend(f"- **{feature}**: {feature}相关的交互体验" for feature in features)
+    readme.extend(["", "## 版本信息", "", f"- **当前版本**: v{changelog[-1]['version']}", ""])
+    return config, "\n".join(readme) + "\n"
+
+
+def generate_tree(root, count, seed=0):
+    """在 root 下生成 count 个合成项目，并复制工具目录"""
+    rng = random.Random(seed)
+    site_config = load_site_config()
+    category_ids = [category["id"] for category in site_config["categories"]]
+    tag_ids = [tag["id"] for tag in site_config["tags"]]
+
+    shutil.copytree(TOOLS_DIR, os.path.join(root, "tools"), ignore=IGNORED_TOOL_FILES)
+
+    for index in range(count):
+        category_id = category_ids[index % len(category_ids)]
+        project_path = os.path.join(root, "projects", category_id, f"toy-{index:06d}")
+        os.makedirs(project_path)
+        config, readme = synthetic_project(rng, index, category_id, category_ids, tag_ids)
+        with open(os.path.join(project_path, "project.json"), 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=4)
+        with open(os.path.join(project_path, "README.md"), 'w', encoding='utf-8') as f:
+            f.write(readme)
+        with open(os.path.join(project_path, "index.html"), 'w', encoding='utf-8') as f:
+            f.write(f"<!DOCTYPE html><html><head><title>{config['title']}</title></head><body></body></html>\n")
+
+
+def run_tool(root, args, log_path):
+    """在 root 下运行工具，返回 (退出码, 耗时秒数, 峰值RSS(KB))"""
+    with open(log_path, 'ab') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable] + args, cwd=root, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 返回该子进程自身的资源使用情况
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    # macOS 上 ru_maxrss 的单位是字节，Linux 上是 KB
+    peak_rss_kb = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return process.returncode, elapsed, peak_rss_kb
+
+
+def output_bytes(paths):
+    """统计输出文件的总大小"""
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def run_benchmarks(sizes, tool_names, repeat=1, keep=False):
+    """对每种规模生成合成目录并运行各个工具，返回结果列表"""
+    results = []
+    for size in sizes:
+        root = tempfile.mkdtemp(prefix=f"web-toys-bench-{size}-")
+        log_path = os.path.join(root, "benchmark.log")
+        try:
+            print(f"\n生成 {size} 个合成项目: {root}")
+            start = time.perf_counter()
+            generate_tree(root, size)
+            print(f"  生成耗时: {time.perf_counter() - start:.2f}s")
+
+            for name in tool_names:
+                args, outputs = TOOLS[name]
+                # 冷启动测试前清除项目目录缓存；其余工具复用上一个工具留下的缓存
+                if name == "homepage":
+                    shutil.rmtree(os.path.join(root, "tools", ".cache"), ignore_errors=True)
+
+                runs = [run_tool(root, args, log_path) for _ in range(repeat)]
+                returncode = max(run[0] for run in runs)
+                seconds = min(run[1] for run in runs)
+                peak_rss_kb = max(run[2] for run in runs)
+                result = {
+                    "size": size,
+                    "tool": name,
+                    "seconds": round(seconds, 4),
+                    "peak_rss_kb": peak_rss_kb,
+                    "output_bytes": output_bytes(outputs(root)),
+                    "returncode": returncode
+                }
+                results.append(result)
+                status = "" if returncode == 0 else f"  (退出码 {returncode}，日志: {log_path})"
+                print(f"  {name:<14}{seconds:>10.3f}s{peak_rss_kb / 1024:>10.1f} MB"
+                      f"{result['output_bytes'] / 1024:>12.1f} KB{status}")
+        finally:
+            if keep:
+                print(f"  保留合成目录: {root}")
+            else:
+                shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """与基线对比，返回回退条目列表"""
+    baseline_index = {(r["size"], r["tool"]): r for r in baseline.get("results", [])}
+    regressions = []
+
+    print(f"\n与基线对比（阈值 {threshold:.0%}）:")
+    print(f"{'规模':>8}  {'工具':<14}{'耗时':>20}{'峰值内存':>22}")
+    for result in results:
+        previous = baseline_index.get((result["size"], result["tool"]))
+        if not previous:
+            continue
+
+        flags = []
+        time_delta = result["seconds"] / previous["seconds"] - 1 if previous["seconds"] else 0
+        rss_delta = result["peak_rss_kb"] / previous["peak_rss_kb"] - 1 if previous["peak_rss_kb"] else 0
+        if time_delta > threshold:
+            flags.append("耗时")
+        if rss_delta > threshold:
+            flags.append("内存")
+        marker = f"  回退: {'、'.join(flags)}" if flags else ""
+        print(f"{result['size']:>8}  {result['tool']:<14}"
+              f"{previous['seconds']:>8.3f}s → {result['seconds']:>7.3f}s ({time_delta:+.0%})"
+              f"{previous['peak_rss_kb'] / 1024:>8.1f} → {result['peak_rss_kb'] / 1024:>6.1f} MB ({rss_delta:+.0%}){marker}")
+        if flags:
+            regressions.append((result, flags))
+    return regressions
+
+
+def save_results(path, results):
+    """保存结果文件"""
+    data = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results
+    }
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {path}")
+        return True
+    except Exception as e:
+        print(f"保存结果文件时出错: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='在合成的大规模项目目录上对站点工具做基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', help=f"项目数量（默认: {' '.join(map(str, DEFAULT_SIZES))}）")
+    parser.add_argument('--full', action='store_true', help=f"额外测试 {' '.join(map(str, FULL_SIZES))} 个项目")
+    parser.add_argument('--tools', nargs='+', metavar='TOOL', help=f"要测试的工具（默认全部: {', '.join(TOOLS)}）")
+    parser.add_argument('--repeat', type=int, default=1, help='每个工具重复运行次数，耗时取最小值（默认: 1）')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help=f'结果文件（默认: {DEFAULT_OUTPUT}）')
+    parser.add_argument('--baseline', help='与该基线结果对比')
+    parser.add_argument('--save-baseline', action='store_true', help=f'同时把结果保存为基线 {DEFAULT_BASELINE}')
+    parser.add_argument('--threshold', type=float, default=0.2, help='回退阈值，相对基线的增幅（默认: 0.2）')
+    parser.add_argument('--keep', action='store_true', help='保留生成的合成目录')
+    args = parser.parse_args()
+
+    if not hasattr(os, "wait4"):
+        print("当前平台不支持 os.wait4，无法测量子进程的峰值内存")
+        return 1
+
+    tool_names = args.tools or list(TOOLS)
+    unknown = [name for name in tool_names if name not in TOOLS]
+    if unknown:
+        parser.error(f"未知的工具: {', '.join(unknown)}（可用: {', '.join(TOOLS)}）")
+    if args.repeat < 1:
+        parser.error("--repeat 必须大于 0")
+
+    sizes = args.sizes or DEFAULT_SIZES + (FULL_SIZES if args.full else [])
+    results = run_benchmarks(sizes, tool_names, args.repeat, args.keep)
+
+    save_results(args.output, results)
+    if args.save_baseline:
+        save_results(DEFAULT_BASELINE, results)
+
+    failed = [r for r in results if r["returncode"] != 0]
+    if failed:
+        print(f"\n{len(failed)} 次运行的退出码不为 0")
+
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except Exception as e:
+            print(f"读取基线文件时出错: {e}")
+            return 1
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项性能回退")
+            return 1
+        print("\n没有发现性能回退")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
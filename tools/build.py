@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站点构建流水线
+
+在同一个进程中按依赖顺序运行站点更新的各个阶段，所有阶段共享同一份项目目录快照
+和站点配置，不再为每个步骤启动子进程、重新扫描项目目录。
+
+每个阶段声明自己的输入和输出:
+  - 输入指纹由输入文件的内容哈希（以及生成脚本自身的哈希）计算得出
+  - 输出为阶段写入的文件，记录其 stat 签名
+上一次运行后输入指纹和输出签名都没有变化的阶段会被跳过。
+阶段运行期间的输出会实时打印，不会缓冲到最后。
+
+阶段:
+  metadata  更新项目元信息和README       (update_project_metadata.py all --readme)
+  details   生成项目详情页                (generate_project_details.py)
+  homepage  生成主页                      (generate_homepage_simplified.py)
+  precache  更新 Service Worker 预缓存清单 (precache_manifest.py)
+
+用法:
+  python tools/build.py                 # 运行全部阶段，跳过未受影响的阶段
+  python tools/build.py homepage        # 只运行指定阶段（及其依赖）
+  python tools/build.py --force         # 忽略构建状态，强制运行
+  python tools/build.py --jobs 4        # 详情页生成使用4个进程
+  python tools/build.py --list          # 列出阶段及其输入输出
+  python tools/build.py --profile       # 打印各阶段和各项目的耗时汇总
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+from project_catalog import get_catalog, CACHE_DIR
+from utils import read_site_config
+from profiling import get_profiler, profile_session, add_profile_arguments
+
+import update_project_metadata
+import generate_project_details
+import generate_homepage_simplified
+import precache_manifest
+
+# 工具目录
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 构建状态文件，记录每个阶段上一次运行后的输入指纹和输出签名
+STATE_PATH = os.path.join(CACHE_DIR, "build_state.json")
+
+# 站点配置文件
+SITE_CONFIG_PATH = "tools/site_config_simplified.json"
+
+
+def file_hash(path):
+    """计算文件内容哈希，文件不存在时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def stat_signature(path):
+    """返回文件的 stat 签名，文件不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class BuildContext:
+    """构建上下文：所有阶段共享的项目目录快照、站点配置和选项"""
+
+    def __init__(self, jobs=1):
+        self.jobs = jobs
+        self.catalog = get_catalog()
+        self.site_config = read_site_config()
+
+    def refresh_catalog(self):
+        """重新校验项目目录（只重新解析 stat 发生变化的 project.json）"""
+        self.catalog.refresh()
+
+    def project_config_inputs(self):
+        """所有 project.json 的内容哈希"""
+        return {entry["config_path"]: entry["hash"] for entry in self.catalog.entries()}
+
+    def file_inputs(self, paths):
+        """若干文件的内容哈希"""
+        return {path: file_hash(path) for path in paths}
+
+    def tool_inputs(self, *names):
+        """生成脚本自身的内容哈希，脚本变化时阶段需要重新运行"""
+        return {f"tools/{name}": file_hash(os.path.join(TOOLS_DIR, name)) for name in names}
+
+
+class Stage:
+    """构建阶段
+
+    inputs(ctx) 返回 {输入名: 指纹} 字典，outputs(ctx) 返回该阶段写入的文件路径列表，
+    run(ctx) 执行阶段并返回是否成功。updates_catalog 为 True 表示该阶段会修改
+    project.json，运行后需要刷新共享的项目目录快照。
+    """
+
+    def __init__(self, name, description, run, inputs, outputs, deps=(), updates_catalog=False):
+        self.name = name
+        self.description = description
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = tuple(deps)
+        self.updates_catalog = updates_catalog
+
+    def fingerprint(self, ctx):
+        """计算输入指纹"""
+        data = json.dumps(self.inputs(ctx), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def output_signatures(self, ctx):
+        """计算输出文件的 stat 签名"""
+        return {path: stat_signature(path) for path in self.outputs(ctx)}
+
+
+# ---- 阶段定义 ----
+
+def _metadata_inputs(ctx):
+    inputs = ctx.project_config_inputs()
+    inputs.update(ctx.file_inputs(
+        os.path.join(entry["path"], "README.md") for entry in ctx.catalog.entries()
+    ))
+    inputs.update(ctx.file_inputs(["tools/readme_template.md"]))
+    inputs.update(ctx.tool_inputs("update_project_metadata.py", "metadata_transaction.py", "project_schema.py",
+                                   "utils.py", "template_engine.py"))
+    return inputs
+
+
+def _metadata_outputs(ctx):
+    outputs = []
+    for entry in ctx.catalog.entries():
+        outputs.append(entry["config_path"])
+        outputs.append(os.path.join(entry["path"], "README.md"))
+    return outputs
+
+
+def _run_metadata(ctx):
+    return update_project_metadata.process_all_projects(
+        generate_readme_flag=True, site_config=ctx.site_config
+    )
+
+
+def _details_inputs(ctx):
+    inputs = ctx.project_config_inputs()
+    inputs.update(ctx.file_inputs(["tools/project_detail_template.html", SITE_CONFIG_PATH]))
+    inputs.update(ctx.tool_inputs("generate_project_details.py", "template_engine.py"))
+    return inputs
+
+
+def _details_outputs(ctx):
+    return [os.path.join(entry["path"], "project-details.html") for entry in ctx.catalog.valid_entries()]
+
+
+def _run_details(ctx):
+    return generate_project_details.process_all_projects(ctx.jobs, site_config=ctx.site_config) is not None
+
+
+def _homepage_inputs(ctx):
+    inputs = ctx.project_config_inputs()
+    inputs.update(ctx.file_inputs([SITE_CONFIG_PATH]))
+    inputs.update(ctx.tool_inputs("generate_homepage_simplified.py"))
+    return inputs
+
+
+def _homepage_outputs(ctx):
+    outputs = ["index.html"]
+    assets_dir = generate_homepage_simplified.ASSETS_DIR
+    if os.path.isdir(assets_dir):
+        outputs.extend(os.path.join(assets_dir, name) for name in sorted(os.listdir(assets_dir))
+                       if name.startswith(generate_homepage_simplified.ASSET_PREFIX))
+    return outputs
+
+
+def _run_homepage(ctx):
+    return generate_homepage_simplified.generate_homepage(site_config=ctx.site_config)
+
+
+def _service_workers(ctx):
+    """带 Service Worker 的项目: [(项目路径, Service Worker 路径)]"""
+    found = []
+    for entry in ctx.catalog.entries(include_missing=True):
+        sw_path = precache_manifest.find_service_worker(entry["path"])
+        if sw_path:
+            found.append((entry["path"], sw_path))
+    return found
+
+
+def _precache_inputs(ctx):
+    # 清单中每个文件的内容哈希：项目的 JS/CSS 等文件变化后必须重新生成 revision，
+    # 否则 Service Worker 会一直返回预缓存中的旧文件
+    inputs = {}
+    for project_path, sw_path in _service_workers(ctx):
+        inputs.update(ctx.file_inputs(precache_manifest.precache_files(project_path, sw_path)))
+    inputs.update(ctx.tool_inputs("precache_manifest.py", "site_dist.py"))
+    return inputs
+
+
+def _precache_outputs(ctx):
+    return [sw_path for _, sw_path in _service_workers(ctx)]
+
+
+def _run_precache(ctx):
+    precache_manifest.update_all()
+    return True
+
+
+STAGES = [
+    Stage("metadata", "更新项目元信息和README", _run_metadata,
+          _metadata_inputs, _metadata_outputs, updates_catalog=True),
+    Stage("details", "生成项目详情页", _run_details,
+          _details_inputs, _details_outputs, deps=["metadata"]),
+    Stage("homepage", "生成主页", _run_homepage,
+          _homepage_inputs, _homepage_outputs, deps=["metadata"]),
+    # 详情页写在项目目录中，也在预缓存范围内
+    Stage("precache", "更新 Service Worker 预缓存清单", _run_precache,
+          _precache_inputs, _precache_outputs, deps=["details"]),
+]
+
+STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+def resolve_stages(names):
+    """按依赖关系排序需要运行的阶段（包含依赖阶段）"""
+    ordered = []
+    visiting = set()
+
+    def visit(name):
+        if name in visiting:
+            raise ValueError(f"阶段之间存在循环依赖: {name}")
+        stage = STAGES_BY_NAME[name]
+        if stage in ordered:
+            return
+        visiting.add(name)
+        for dep in stage.deps:
+            visit(dep)
+        visiting.discard(name)
+        ordered.append(stage)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def load_state():
+    """读取构建状态"""
+    if not os.path.exists(STATE_PATH):
+        return {}
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"读取构建状态时出错，将重新运行所有阶段: {e}")
+        return {}
+
+
+def save_state(state):
+    """保存构建状态"""
+    try:
+        os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+        tmp_path = f"{STATE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, STATE_PATH)
+    except Exception as e:
+        print(f"保存构建状态时出错: {e}")
+
+
+def build(stage_names=None, force=False, jobs=1):
+    """运行构建流水线，返回是否全部成功"""
+    stages = resolve_stages(stage_names or [stage.name for stage in STAGES])
+    ctx = BuildContext(jobs)
+    if not ctx.site_config:
+        print("无法读取站点配置，构建中止")
+        return False
+
+    state = {} if force else load_state()
+    total_start = time.perf_counter()
+
+    for index, stage in enumerate(stages, 1):
+        prefix = f"[{index}/{len(stages)}] {stage.name}"
+        previous = state.get(stage.name, {})
+        fingerprint = stage.fingerprint(ctx)
+
+        if (not force
+                and previous.get("fingerprint") == fingerprint
+                and previous.get("outputs") == stage.output_signatures(ctx)):
+            print(f"{prefix}: 输入和输出均未变化，跳过")
+            continue
+
+        print(f"{prefix}: {stage.description}...", flush=True)
+        start = time.perf_counter()
+        with get_profiler().span(stage.name, category="build"):
+            ok = stage.run(ctx)
+        elapsed = time.perf_counter() - start
+
+        if stage.updates_catalog:
+            ctx.refresh_catalog()
+
+        if not ok:
+            print(f"{prefix}: 失败 ({elapsed:.2f}s)，构建中止")
+            state.pop(stage.name, None)
+            save_state(state)
+            return False
+
+        # 阶段可能修改了自己的输入（例如 project.json），记录运行后的指纹
+        state[stage.name] = {
+            "fingerprint": stage.fingerprint(ctx),
+            "outputs": stage.output_signatures(ctx)
+        }
+        save_state(state)
+        print(f"{prefix}: 完成 ({elapsed:.2f}s)", flush=True)
+
+    print(f"\n构建完成! 总耗时 {time.perf_counter() - total_start:.2f}s")
+    return True
+
+
+def list_stages():
+    """列出所有阶段"""
+    ctx = BuildContext()
+    for stage in STAGES:
+        deps = ', '.join(stage.deps) if stage.deps else '无'
+        print(f"{stage.name:<10} {stage.description}")
+        print(f"  依赖: {deps}")
+        print(f"  输入: {len(stage.inputs(ctx))} 个文件, 输出: {len(stage.outputs(ctx))} 个文件")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='在同一进程中运行站点构建流水线')
+    parser.add_argument('stages', nargs='*', metavar='stage',
+                        help=f"要运行的阶段（{', '.join(STAGES_BY_NAME)}），默认运行全部阶段")
+    parser.add_argument('--force', action='store_true', help='忽略构建状态，强制运行所有阶段')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='详情页生成的并发进程数，0 表示使用全部CPU核心（默认: 1）')
+    parser.add_argument('--list', action='store_true', help='列出所有阶段')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.list:
+        list_stages()
+        return 0
+
+    unknown = [name for name in args.stages if name not in STAGES_BY_NAME]
+    if unknown:
+        parser.error(f"未知的阶段: {', '.join(unknown)}（可用: {', '.join(STAGES_BY_NAME)}）")
+
+    with profile_session(args.profile, args.profile_trace, args.profile_cprofile):
+        ok = build(args.stages, args.force, args.jobs)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
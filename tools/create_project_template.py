@@ -6,6 +6,8 @@ import json
 import sys
 from datetime import datetime
 
+from precache_manifest import update_precache_manifest
+
 def read_site_config():
     """读取站点配置文件"""
     # 首先尝试读取根目录的配置文件
@@ -1098,54 +1100,85 @@ document.addEventListener('DOMContentLoaded', init);
 
 def create_service_worker(project_path, project_name):
     """创建Service Worker文件"""
+    cache_prefix = project_name.lower().replace(' ', '-')
     sw_content = f"""// {project_name} Service Worker
-const CACHE_NAME = '{project_name.lower().replace(' ', '-')}-v0.1.0';
-
-// 核心资源 - 必须缓存
-const CORE_ASSETS = [
-  './',
-  './index.html',
-  './css/style.css',
-  './js/utils.js',
-  './js/main.js',
-  './project-details.html'
-];
+const CACHE_NAME = '{cache_prefix}-v0.1.0';
+
+// 预缓存清单由 tools/precache_manifest.py 根据项目中实际存在的文件生成
+// precache-manifest:start（由 tools/precache_manifest.py 生成，请勿手动修改）
+const PRECACHE_MANIFEST = [];
+// precache-manifest:end
+
+// 预缓存按文件内容（revision）缓存，版本更新时只下载内容变化的文件；
+// CACHE_NAME 只用于运行时缓存
+const PRECACHE_NAME = '{cache_prefix}-precache';
 
-// 次要资源 - 如果可能，也缓存这些
-const SECONDARY_ASSETS = [
-  './assets/images/',
-  './assets/sounds/',
+// 外部资源 - 如果可能，也缓存这些
+const EXTERNAL_ASSETS = [
   'https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@400;500;700&display=swap'
 ];
 
-// 所有要缓存的资源
-const ASSETS = [...CORE_ASSETS, ...SECONDARY_ASSETS];
+// 清单中的地址 -> 带 revision 的缓存键
+const PRECACHE_KEYS = new Map(PRECACHE_MANIFEST.map(entry => {{
+  const url = new URL(entry.url, self.location);
+  const key = new URL(url);
+  key.searchParams.set('__rev', entry.revision);
+  return [url.href, key.href];
+}}));
+
+// 查找请求对应的预缓存键（忽略查询参数）
+function precacheKeyFor(request) {{
+  const url = new URL(request.url);
+  url.search = '';
+  url.hash = '';
+  return PRECACHE_KEYS.get(url.href);
+}}
 
 // 安装 Service Worker
 self.addEventListener('install', event => {{
   event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(cache => {{
-        console.log('缓存已打开');
-        return cache.addAll(CORE_ASSETS);
-      }})
+    caches.open(PRECACHE_NAME)
+      .then(cache => Promise.all([...PRECACHE_KEYS].map(([url, key]) =>
+        cache.match(key).then(cached => {{
+          if (cached) {{
+            return;
+          }}
+          // 只下载新增或内容变化的文件，缺失的文件跳过，不影响安装
+          return fetch(url, {{ cache: 'no-cache' }})
+            .then(response => {{
+              if (response.ok) {{
+                return cache.put(key, response);
+              }}
+            }})
+            .catch(() => {{}});
+        }})
+      )))
+      .then(() => caches.open(CACHE_NAME))
+      .then(cache => Promise.all(EXTERNAL_ASSETS.map(url => cache.add(url).catch(() => {{}}))))
       .then(() => self.skipWaiting())
   );
 }});
 
 // 激活 Service Worker
 self.addEventListener('activate', event => {{
+  const currentKeys = new Set(PRECACHE_KEYS.values());
   event.waitUntil(
-    caches.keys().then(cacheNames => {{
-      return Promise.all(
+    caches.open(PRECACHE_NAME)
+      .then(cache => cache.keys().then(requests => Promise.all(
+        requests
+          .filter(request => !currentKeys.has(request.url))
+          .map(request => cache.delete(request))
+      )))
+      .then(() => caches.keys())
+      .then(cacheNames => Promise.all(
         cacheNames.filter(cacheName => {{
-          return cacheName.startsWith('{project_name.lower().replace(' ', '-')}') && cacheName !== CACHE_NAME;
+          return cacheName.startsWith('{cache_prefix}') && cacheName !== CACHE_NAME && cacheName !== PRECACHE_NAME;
         }}).map(cacheName => {{
           console.log('删除旧缓存:', cacheName);
           return caches.delete(cacheName);
         }})
-      );
-    }}).then(() => self.clients.claim())
+      ))
+      .then(() => self.clients.claim())
   );
 }});
 
@@ -1156,6 +1189,17 @@ self.addEventListener('fetch', event => {{
     return;
   }}
 
+  // 处理预缓存的资源
+  const precacheKey = precacheKeyFor(event.request);
+  if (precacheKey) {{
+    event.respondWith(
+      caches.open(PRECACHE_NAME)
+        .then(cache => cache.match(precacheKey))
+        .then(response => response || fetch(event.request))
+    );
+    return;
+  }}
+
   // 处理字体请求
   if (event.request.url.includes('fonts.googleapis.com') || event.request.url.includes('fonts.gstatic.com')) {{
     event.respondWith(
@@ -1260,6 +1304,9 @@ def create_project(project_name, category, description=None, tags=None):
     if not create_service_worker(project_path, project_name):
         return False
 
+    # 根据已创建的文件生成预缓存清单
+    update_precache_manifest(project_path)
+
     print(f"\n项目 '{project_name}' 创建成功!")
     print(f"项目路径: {project_path}")
     print("\n接下来的步骤:")
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目文件去重
+
+按内容哈希检查 projects/ 下的所有文件，报告:
+  - 内容完全相同的文件（按浪费的字节数排序）
+  - 内容相近的项目目录（按共享内容的字节数计算相似度）
+  - 在多个分类目录下重复出现的同名项目（应改用 secondary_categories 在多个分类中展示）
+
+使用 --dist 时对发布目录（默认 dist/，见 site_dist.py）去重，每份内容只发布一次:
+  - 项目引用的与其他项目内容相同的资源（图片、音频、CSS、JS 等）改写为引用同一个共享路径，
+    浏览器和 CDN 只缓存一份。引用了其他文件的 CSS/JS 只有在被引用的文件也完全相同时才共享，
+    保证相对路径解析到的内容不变。
+  - 其余仍然重复的文件（HTML 页面、未被引用的文件）改为硬链接，发布目录只占用一份空间。
+
+硬链接的文件共享同一份数据，去重应作为发布目录的最后一个构建阶段运行；site_dist.py
+镜像时会先断开硬链接再复制，不会通过硬链接改写其他文件。
+
+用法:
+  python tools/dedupe_projects.py                      # 报告 projects/ 中的重复内容
+  python tools/dedupe_projects.py --dist               # 镜像站点到 dist/ 并去重
+  python tools/dedupe_projects.py --dist --no-mirror   # 在已有的 dist/ 上去重（接在其他构建阶段之后）
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import defaultdict
+from urllib.parse import quote
+
+from fingerprint_assets import MANIFEST_NAME, ProjectFingerprinter
+from project_catalog import get_catalog
+from site_dist import DIST_DIR, mirror_site, file_sha256
+from utils import AtomicFileWriter
+
+# 报告中列出的重复文件组数
+TOP_GROUPS = 20
+
+# 默认的项目相似度阈值
+DEFAULT_THRESHOLD = 0.5
+
+
+def hash_project(project_dir):
+    """计算项目内所有文件的哈希，返回 {相对路径: (哈希, 大小)}"""
+    files = {}
+    for root, dirs, names in os.walk(project_dir):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, project_dir).replace(os.sep, "/")
+            files[rel] = (file_sha256(path), os.path.getsize(path))
+    return files
+
+
+def hash_projects(root_dir="."):
+    """计算所有项目的文件哈希，返回 {项目路径: {相对路径: (哈希, 大小)}}"""
+    projects = {}
+    for entry in get_catalog().entries(include_missing=True):
+        project_dir = os.path.join(root_dir, entry["path"])
+        if os.path.isdir(project_dir):
+            projects[entry["path"]] = hash_project(project_dir)
+    return projects
+
+
+def find_duplicates(projects):
+    """内容相同的文件组，返回 [(哈希, 大小, [(项目路径, 相对路径), ...])]，按浪费的字节数排序"""
+    groups = defaultdict(list)
+    sizes = {}
+    for project, files in projects.items():
+        for rel, (digest, size) in files.items():
+            groups[digest].append((project, rel))
+            sizes[digest] = size
+    duplicates = [(digest, sizes[digest], sorted(locations))
+                  for digest, locations in groups.items() if len(locations) > 1 and sizes[digest] > 0]
+    duplicates.sort(key=lambda item: item[1] * (len(item[2]) - 1), reverse=True)
+    return duplicates
+
+
+def similar_projects(projects, threshold=DEFAULT_THRESHOLD):
+    """内容相近的项目对，相似度 = 共享内容的字节数 / 两个项目内容并集的字节数"""
+    project_blobs = {project: {digest: size for digest, size in files.values()}
+                     for project, files in projects.items()}
+
+    # 只比较至少共享一个非空文件的项目
+    index = defaultdict(set)
+    for project, blobs in project_blobs.items():
+        for digest, size in blobs.items():
+            if size > 0:
+                index[digest].add(project)
+    candidates = set()
+    for members in index.values():
+        members = sorted(members)
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                candidates.add((first, second))
+
+    pairs = []
+    for first, second in sorted(candidates):
+        a, b = project_blobs[first], project_blobs[second]
+        shared = sum(size for digest, size in a.items() if digest in b)
+        union = sum(a.values()) + sum(size for digest, size in b.items() if digest not in a)
+        similarity = shared / union if union else 0
+        if similarity >= threshold:
+            pairs.append((similarity, shared, first, second))
+    pairs.sort(reverse=True)
+    return pairs
+
+
+def repeated_project_names(projects):
+    """在多个分类目录下出现的同名项目，返回 {目录名: [(项目路径, 文件数)]}"""
+    by_name = defaultdict(list)
+    for project, files in projects.items():
+        by_name[os.path.basename(project)].append((project, len(files)))
+    return {name: sorted(items) for name, items in sorted(by_name.items()) if len(items) > 1}
+
+
+def _format_size(size):
+    return f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
+
+
+def print_report(projects, threshold=DEFAULT_THRESHOLD):
+    """打印重复内容报告，返回报告数据"""
+    duplicates = find_duplicates(projects)
+    pairs = similar_projects(projects, threshold)
+    repeated = repeated_project_names(projects)
+
+    total_files = sum(len(files) for files in projects.values())
+    total_bytes = sum(size for files in projects.values() for _, size in files.values())
+    wasted = sum(size * (len(locations) - 1) for _, size, locations in duplicates)
+    print(f"共 {len(projects)} 个项目, {total_files} 个文件, {_format_size(total_bytes)}; "
+          f"重复内容 {len(duplicates)} 组, 可节省 {_format_size(wasted)}")
+
+    if duplicates:
+        print(f"\n内容相同的文件（前 {min(TOP_GROUPS, len(duplicates))} 组）:")
+        for digest, size, locations in duplicates[:TOP_GROUPS]:
+            print(f"  {digest[:12]}  {_format_size(size)} x {len(locations)}")
+            for project, rel in locations:
+                print(f"    {project}/{rel}")
+
+    if pairs:
+        print(f"\n内容相近的项目（相似度 >= {threshold:.0%}）:")
+        for similarity, shared, first, second in pairs:
+            print(f"  {similarity:.0%}  共享 {_format_size(shared)}  {first} <-> {second}")
+
+    if repeated:
+        print("\n在多个分类中重复出现的项目目录（可改用 secondary_categories）:")
+        for name, items in repeated.items():
+            print(f"  {name}: " + ", ".join(f"{project} ({count} 个文件)" for project, count in items))
+
+    return {
+        "duplicates": [{"hash": digest, "size": size, "files": [f"{p}/{r}" for p, r in locations]}
+                       for digest, size, locations in duplicates],
+        "similar_projects": [{"similarity": round(similarity, 4), "shared_bytes": shared, "projects": [a, b]}
+                             for similarity, shared, a, b in pairs],
+        "repeated_names": {name: [project for project, _ in items] for name, items in repeated.items()},
+    }
+
+
+class SharedAssetRewriter(ProjectFingerprinter):
+    """把项目中对重复资源的引用改写为共享路径"""
+
+    include_fingerprinted = True
+
+    def __init__(self, project_dir, shared):
+        """shared 为 {相对路径: 共享文件的路径}"""
+        super().__init__(project_dir)
+        self.mapping = shared
+
+    def _rewrite_url(self, document, url):
+        target, base = self._resolve_with_base(document, url)
+        if target not in self.mapping:
+            return None
+        suffix_start = min([i for i in (url.find('?'), url.find('#')) if i >= 0], default=len(url))
+        path, suffix = url[:suffix_start], url[suffix_start:]
+        new_path = os.path.relpath(self.mapping[target], os.path.join(self.project_dir, base)).replace(os.sep, "/")
+        if '%' in path:
+            new_path = quote(new_path)
+        return f"{new_path}{suffix}"
+
+
+def _shareable_assets(projects, dist_dir):
+    """确定各项目中可以改为引用共享副本的资源
+
+    返回 {项目路径: SharedAssetRewriter}，其 mapping 为 {相对路径: 共享文件的路径}。
+    """
+    locations = defaultdict(list)
+    for project, files in projects.items():
+        for rel, (digest, size) in files.items():
+            if size > 0:
+                locations[digest].append((project, rel))
+    canonical = {digest: min(items) for digest, items in locations.items() if len(items) > 1}
+
+    # HTML 页面、Service Worker 等需要稳定地址的文件不在 assets 中，不会被共享
+    scanners = {project: SharedAssetRewriter(os.path.join(dist_dir, project), {}) for project in projects}
+
+    memo = {}
+
+    def same_context(project, rel, shared_project, shared_rel):
+        """引用了其他文件的文本资源：共享副本中的相对引用必须解析到相同的内容"""
+        key = (project, rel, shared_project, shared_rel)
+        if key in memo:
+            return memo[key]
+        memo[key] = True  # 循环引用按相同处理
+        scanner = scanners[project]
+        result = True
+        if rel in scanner.texts:
+            references = scanner.references(rel)
+            if references and rel != shared_rel:
+                result = False
+            for ref in references:
+                shared_file = projects[shared_project].get(ref)
+                if shared_file is None or shared_file[0] != projects[project][ref][0] \
+                        or not same_context(project, ref, shared_project, ref):
+                    result = False
+                    break
+        memo[key] = result
+        return result
+
+    shared = defaultdict(dict)
+    for project, files in projects.items():
+        scanner = scanners[project]
+        for rel, (digest, size) in files.items():
+            target = canonical.get(digest)
+            # 同一项目内的重复文件（例如带指纹的副本和原文件）只需硬链接
+            if target is None or target[0] == project or rel not in scanner.assets:
+                continue
+            if same_context(project, rel, *target):
+                shared[project][rel] = os.path.join(dist_dir, target[0], target[1])
+
+    for project, mapping in shared.items():
+        scanners[project].mapping = mapping
+    return {project: scanners[project] for project in shared}
+
+
+def _link_duplicates(dist_dir, projects):
+    """把内容相同的文件改为硬链接，返回 (新建的链接数, 节省的字节数)"""
+    links = 0
+    saved = 0
+    for digest, size, locations in find_duplicates(projects):
+        first = os.path.join(dist_dir, *locations[0])
+        for location in locations[1:]:
+            path = os.path.join(dist_dir, *location)
+            if os.path.samefile(first, path):
+                continue
+            temp_path = f"{path}.link-tmp"
+            try:
+                os.link(first, temp_path)
+                os.replace(temp_path, path)
+            except OSError as e:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                print(f"创建硬链接 {path} 时出错: {e}")
+                continue
+            links += 1
+            saved += size
+    return links, saved
+
+
+def dedupe_dist(dist_dir=DIST_DIR, mirror=True, threshold=DEFAULT_THRESHOLD):
+    """对发布目录中的项目去重，返回报告数据"""
+    if mirror:
+        stats = mirror_site(dist_dir)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+
+    projects = hash_projects(dist_dir)
+    report = print_report(projects, threshold)
+
+    # 改写引用：写入临时文件后替换，不会通过已有的硬链接改写其他文件
+    rewritten = 0
+    shared_count = 0
+    for project, rewriter in _shareable_assets(projects, dist_dir).items():
+        shared_count += len(rewriter.mapping)
+        for rel in rewriter.texts:
+            # 指纹清单记录的是项目内的文件，不指向共享路径
+            if rel == MANIFEST_NAME:
+                continue
+            content = rewriter.rewrite(rel)
+            if content == rewriter.texts[rel]:
+                continue
+            with AtomicFileWriter(os.path.join(dist_dir, project, rel), fsync=False) as writer:
+                writer.write(content)
+            if writer.changed:
+                rewritten += 1
+
+    links, saved = _link_duplicates(dist_dir, hash_projects(dist_dir))
+    print(f"\n处理完成! 共享资源: {shared_count}, 改写文件: {rewritten}, "
+          f"硬链接: {links} 个 (节省 {_format_size(saved)})")
+    report.update({"shared_assets": shared_count, "rewritten_files": rewritten, "hardlinks": links})
+    return report
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='按内容哈希查找重复的项目文件，并在发布目录中去重')
+    parser.add_argument('--dist', action='store_true', help='对发布目录去重（改写引用并创建硬链接）')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'报告的项目相似度阈值（默认: {DEFAULT_THRESHOLD}）')
+    parser.add_argument('--json', metavar='FILE', help='保存 JSON 格式的报告')
+    args = parser.parse_args()
+
+    if args.dist:
+        report = dedupe_dist(args.output, mirror=not args.no_mirror, threshold=args.threshold)
+    else:
+        report = print_report(hash_projects(), args.threshold)
+
+    if args.json:
+        try:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"报告已保存到 {args.json}")
+        except Exception as e:
+            print(f"保存报告时出错: {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+发布目录构建
+
+把站点镜像到发布目录（默认 dist/，见 site_dist.py），按顺序运行各个发布阶段:
+
+  mirror       镜像站点文件                       (site_dist.py)
+  tailwind     生成静态 Tailwind 样式              (tailwind_extract.py)
+  vendor       本地化 CDN 第三方库                 (vendor_libraries.py，需要 --cache-dir 离线缓存)
+  images       生成 WebP 图片                      (optimize_images.py，需要 Pillow)
+  dimensions   补充 <img> 尺寸和懒加载属性           (image_dimensions.py)
+  fonts        生成自托管的 Noto Sans SC 子集字体    (subset_fonts.py，需要 fontTools 和本地字体文件)
+  scripts      删除重复脚本，延迟阻塞渲染的脚本       (script_audit.py)
+  minify       压缩 HTML/CSS/JS/JSON               (minify.py，纯 Python)
+  fingerprint  生成资源指纹                        (fingerprint_assets.py)
+  precache     更新 Service Worker 预缓存清单       (precache_manifest.py)
+  dedupe       跨项目去重                          (dedupe_projects.py)
+  compress     为文本文件生成 .gz 和 .br 预压缩副本  (.br 需要 brotli)
+
+压缩和预压缩按多进程并行处理文件，结果按内容哈希缓存在 tools/.cache/dist_build/ 中：
+再次构建时只有内容变化的文件才会重新压缩，其余文件直接复用缓存。
+预压缩副本（例如 main.js.gz）供服务器按 Accept-Encoding 直接发送（nginx gzip_static/brotli_static），
+对应的源文件被删除或变得小于阈值时，多余的副本也会被删除。
+
+用法:
+  python tools/dist_build.py                     # 构建 dist/
+  python tools/dist_build.py --jobs 0            # 使用全部CPU核心
+  python tools/dist_build.py --skip vendor images
+  python tools/dist_build.py --min-size 2        # 只预压缩不小于 2KB 的文件
+"""
+
+import os
+import sys
+import gzip
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+import minify
+import optimize_images
+import subset_fonts
+from dedupe_projects import dedupe_dist
+from fingerprint_assets import FINGERPRINTED_PATTERN, fingerprint_projects
+from image_dimensions import annotate_dist
+from precache_manifest import update_all as update_precache_manifests
+from project_catalog import CACHE_DIR
+from script_audit import print_report as print_script_report, rewrite_dist
+from site_dist import DIST_DIR, PRECOMPRESSED_EXTENSIONS, mirror_site, iter_dist_files
+from tailwind_extract import extract_tailwind
+from vendor_libraries import VENDOR_DIR, vendor_libraries
+
+# 压缩结果缓存目录
+BUILD_CACHE_DIR = os.path.join(CACHE_DIR, "dist_build")
+
+# 生成预压缩副本的文本文件
+COMPRESS_EXTENSIONS = ('.html', '.htm', '.css', '.js', '.mjs', '.json', '.webmanifest', '.svg', '.txt', '.xml')
+
+# 小于该大小的文件不生成预压缩副本（压缩收益抵不过额外的文件）
+DEFAULT_MIN_COMPRESS_BYTES = 1024
+
+# 预压缩副本至少要比原文件小这么多才保留
+MIN_COMPRESSION_SAVING = 0.05
+
+# 发布阶段（按运行顺序）
+STAGES = [
+    ("mirror", "镜像站点文件"),
+    ("tailwind", "生成静态 Tailwind 样式"),
+    ("vendor", "本地化第三方库"),
+    ("images", "生成 WebP 图片"),
+    ("dimensions", "补充图片尺寸和懒加载属性"),
+    ("fonts", "生成 Noto Sans SC 子集字体"),
+    ("scripts", "调整脚本加载方式"),
+    ("minify", "压缩 HTML/CSS/JS/JSON"),
+    ("fingerprint", "生成资源指纹"),
+    ("precache", "更新预缓存清单"),
+    ("dedupe", "跨项目去重"),
+    ("compress", "生成 .gz/.br 预压缩副本"),
+]
+
+
+def _cache_path(kind, digest):
+    return os.path.join(BUILD_CACHE_DIR, kind, digest[:2], digest)
+
+
+def _read_cache(kind, digest):
+    try:
+        with open(_cache_path(kind, digest), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_bytes(path, data):
+    """写入临时文件后替换（不会通过去重阶段的硬链接改写其他文件）"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _should_minify(path, dist_dir):
+    """已压缩的库文件、带指纹的副本和本地化的第三方库不再压缩"""
+    name = os.path.basename(path)
+    rel = os.path.relpath(path, dist_dir).replace(os.sep, "/")
+    return (".min." not in name and not FINGERPRINTED_PATTERN.search(name)
+            and not rel.startswith(VENDOR_DIR.replace(os.sep, "/") + "/"))
+
+
+def minify_file(path):
+    """压缩单个文件，返回 {"path", "before", "after", "cached", "error"}"""
+    result = {"path": path, "before": 0, "after": 0, "cached": False, "error": None}
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        result["before"] = result["after"] = len(data)
+        ext = os.path.splitext(path)[1].lower()
+        digest = hashlib.sha256(f"{minify.MINIFIER_VERSION}\0{ext}\0".encode('utf-8') + data).hexdigest()
+
+        minified = _read_cache("minify", digest)
+        result["cached"] = minified is not None
+        if minified is None:
+            try:
+                content = data.decode('utf-8')
+            except UnicodeDecodeError:
+                return result
+            minified = minify.minify(path, content).encode('utf-8')
+            _write_bytes(_cache_path("minify", digest), minified)
+
+        if len(minified) < len(data):
+            _write_bytes(path, minified)
+            result["after"] = len(minified)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def _compress(kind, data):
+    if kind == "gz":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def compress_file(path):
+    """为单个文件生成预压缩副本，返回 {"path", "size", "compressed": {格式: 大小}, "encoded", "error"}"""
+    result = {"path": path, "size": 0, "compressed": {}, "encoded": 0, "error": None}
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        result["size"] = len(data)
+        digest = hashlib.sha256(data).hexdigest()
+        for kind in ("gz", "br") if brotli else ("gz",):
+            compressed = _read_cache(kind, digest)
+            if compressed is None:
+                compressed = _compress(kind, data)
+                _write_bytes(_cache_path(kind, digest), compressed)
+                result["encoded"] += 1
+
+            sibling = f"{path}.{kind}"
+            if len(compressed) > len(data) * (1 - MIN_COMPRESSION_SAVING):
+                if os.path.exists(sibling):
+                    os.remove(sibling)
+                continue
+            try:
+                with open(sibling, 'rb') as f:
+                    unchanged = f.read() == compressed
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                _write_bytes(sibling, compressed)
+            result["compressed"][kind] = len(compressed)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def _map(function, items, jobs):
+    """按需使用多进程处理"""
+    if jobs > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(function, items, chunksize=8))
+    return [function(item) for item in items]
+
+
+def minify_dist(dist_dir=DIST_DIR, jobs=1):
+    """压缩发布目录中的 HTML/CSS/JS/JSON，返回是否成功"""
+    extensions = tuple(minify.MINIFY_EXTENSIONS)
+    paths = [path for path in iter_dist_files(dist_dir, extensions) if _should_minify(path, dist_dir)]
+    results = _map(minify_file, paths, jobs)
+
+    failed = [result for result in results if result["error"]]
+    for result in failed:
+        print(f"压缩 {result['path']} 时出错: {result['error']}")
+    before = sum(result["before"] for result in results)
+    after = sum(result["after"] for result in results)
+    cached = sum(1 for result in results if result["cached"])
+    saved = (1 - after / before) * 100 if before else 0
+    print(f"处理完成! 文件: {len(results)}, 缓存命中: {cached}, 失败: {len(failed)}, "
+          f"{before / 1024:.0f} KB -> {after / 1024:.0f} KB (减少 {saved:.0f}%)")
+    return not failed
+
+
+def _remove_stale_siblings(dist_dir, min_bytes):
+    """删除源文件已不存在、不再需要预压缩的副本"""
+    removed = 0
+    for path in iter_dist_files(dist_dir, PRECOMPRESSED_EXTENSIONS):
+        source = os.path.splitext(path)[0]
+        if (os.path.isfile(source) and source.lower().endswith(COMPRESS_EXTENSIONS)
+                and os.path.getsize(source) >= min_bytes
+                and (path.endswith(".gz") or brotli is not None)):
+            continue
+        os.remove(path)
+        removed += 1
+    return removed
+
+
+def compress_dist(dist_dir=DIST_DIR, jobs=1, min_bytes=DEFAULT_MIN_COMPRESS_BYTES):
+    """为发布目录中的文本文件生成 .gz/.br 预压缩副本，返回是否成功"""
+    if brotli is None:
+        print("生成 .br 需要 brotli，请先安装: pip install brotli（本次只生成 .gz）")
+
+    removed = _remove_stale_siblings(dist_dir, min_bytes)
+    paths = [path for path in iter_dist_files(dist_dir, COMPRESS_EXTENSIONS) if os.path.getsize(path) >= min_bytes]
+    results = _map(compress_file, paths, jobs)
+
+    failed = [result for result in results if result["error"]]
+    for result in failed:
+        print(f"预压缩 {result['path']} 时出错: {result['error']}")
+    encoded = sum(result["encoded"] for result in results)
+    print(f"处理完成! 文件: {len(results)}, 新压缩: {encoded}, 删除过期副本: {removed}, 失败: {len(failed)}")
+    for kind in ("gz", "br"):
+        pairs = [(result["size"], result["compressed"][kind]) for result in results if kind in result["compressed"]]
+        if pairs:
+            before = sum(size for size, _ in pairs)
+            after = sum(size for _, size in pairs)
+            print(f"  .{kind}: {len(pairs)} 个文件, {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+    return not failed
+
+
+def run_stage(name, args):
+    """运行单个发布阶段，返回是否成功"""
+    dist_dir = args.output
+    if name == "mirror":
+        stats = mirror_site(dist_dir, clean=args.clean)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+        return True
+    if name == "tailwind":
+        return extract_tailwind(dist_dir, mirror=False)
+    if name == "vendor":
+        return vendor_libraries(dist_dir, cache_dir=args.cache_dir, mirror=False)
+    if name == "images":
+        if optimize_images.Image is None:
+            print("图片优化需要 Pillow，请先安装: pip install Pillow（跳过该阶段）")
+            return True
+        return optimize_images.optimize_images(dist_dir, jobs=args.jobs, mirror=False)
+    if name == "dimensions":
+        return annotate_dist(dist_dir, mirror=False)
+    if name == "fonts":
+        if subset_fonts.subset is None or subset_fonts.find_font_files(args.font_dir) is None:
+            print(f"字体子集化需要 fontTools（pip install fonttools brotli）和 {args.font_dir} 中的字体文件（跳过该阶段）")
+            return True
+        return subset_fonts.subset_fonts(dist_dir, args.font_dir, mirror=False)
+    if name == "scripts":
+        print_script_report(rewrite_dist(dist_dir, mirror=False), verbose=False)
+        return True
+    if name == "minify":
+        return minify_dist(dist_dir, args.jobs)
+    if name == "fingerprint":
+        return fingerprint_projects(dist_dir, mirror=False)
+    if name == "precache":
+        update_precache_manifests(dist_dir)
+        return True
+    if name == "dedupe":
+        dedupe_dist(dist_dir, mirror=False)
+        return True
+    if name == "compress":
+        return compress_dist(dist_dir, args.jobs, args.min_size * 1024)
+    raise ValueError(f"未知的阶段: {name}")
+
+
+def build_dist(args):
+    """按顺序运行发布阶段，返回是否全部成功"""
+    stages = [(name, description) for name, description in STAGES if name not in args.skip]
+    total_start = time.perf_counter()
+    for index, (name, description) in enumerate(stages, 1):
+        prefix = f"[{index}/{len(stages)}] {name}"
+        print(f"{prefix}: {description}...", flush=True)
+        start = time.perf_counter()
+        ok = run_stage(name, args)
+        elapsed = time.perf_counter() - start
+        if not ok:
+            print(f"{prefix}: 失败 ({elapsed:.2f}s)，构建中止")
+            return False
+        print(f"{prefix}: 完成 ({elapsed:.2f}s)", flush=True)
+
+    print(f"\n发布目录构建完成! {args.output}, 总耗时 {time.perf_counter() - total_start:.2f}s")
+    return True
+
+
+def main():
+    """主函数"""
+    stage_names = [name for name, _ in STAGES]
+    parser = argparse.ArgumentParser(description='构建发布目录：镜像、压缩并生成预压缩副本')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--skip', nargs='+', default=[], choices=stage_names, metavar='STAGE',
+                        help=f"跳过的阶段（{', '.join(stage_names)}）")
+    parser.add_argument('--clean', action='store_true', help='清空发布目录后重新镜像')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='压缩和图片编码的并发进程数，0 表示使用全部CPU核心（默认: 1）')
+    parser.add_argument('--min-size', type=int, default=DEFAULT_MIN_COMPRESS_BYTES // 1024,
+                        help=f'生成预压缩副本的最小文件大小，单位KB（默认: {DEFAULT_MIN_COMPRESS_BYTES // 1024}）')
+    parser.add_argument('--cache-dir', help='第三方库的离线缓存目录（见 vendor_libraries.py）')
+    parser.add_argument('--font-dir', default=subset_fonts.DEFAULT_FONT_DIR,
+                        help=f'Noto Sans SC 字体文件目录（默认: {subset_fonts.DEFAULT_FONT_DIR}）')
+    args = parser.parse_args()
+
+    if args.jobs < 0:
+        parser.error("--jobs 不能为负数")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+
+    return 0 if build_dist(args) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
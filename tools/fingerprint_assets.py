@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目静态资源指纹
+
+为发布目录（默认 dist/，见 site_dist.py）中每个项目的静态资源（CSS、JS、图片、音频等）
+生成带内容哈希的副本 name.<哈希>.ext，并改写项目内对它们的引用:
+  - HTML 中的 src/href/srcset 等属性值和内联脚本、样式中的字符串
+  - CSS 中的 url() 和 @import
+  - JS 中的 import 路径和 src 等字符串（先按 JS 文件所在目录解析，再按项目根目录解析）
+  - Service Worker 和 Web App Manifest 中的缓存列表、图标路径
+只改写能解析为项目内实际文件的引用，外部链接和项目外的共享文件（例如 ../../js/）保持不变。
+
+资源之间的引用（CSS 引用图片、JS 模块互相导入）按依赖顺序处理：被引用的文件先确定哈希，
+引用方改写后再计算自己的哈希，因此任何依赖变化都会传递到引用方的文件名。循环引用的一组文件
+使用组内全部内容的联合哈希。
+
+HTML 页面、Service Worker 脚本、Web App Manifest 和 project.json 保持原文件名（需要稳定的地址），其余文件都可以按
+Cache-Control: immutable 发布。每个项目生成 asset-manifest.json，记录原路径到带哈希路径的映射；
+原文件仍然保留，供无法静态识别的动态引用使用。
+
+用法:
+  python tools/fingerprint_assets.py               # 镜像站点到 dist/ 并生成指纹
+  python tools/fingerprint_assets.py --no-mirror   # 在已有的 dist/ 上处理（例如接在图片优化之后）
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from urllib.parse import quote, unquote
+
+from project_catalog import get_catalog
+from site_dist import DIST_DIR, PRECOMPRESSED_EXTENSIONS, mirror_site
+from utils import write_file_if_changed
+
+# 哈希长度（十六进制字符数）
+HASH_LENGTH = 10
+
+# 清单文件名
+MANIFEST_NAME = "asset-manifest.json"
+
+# 已带指纹的文件名，例如 style.0123456789.css
+FINGERPRINTED_PATTERN = re.compile(r'\.[0-9a-f]{%d}\.[^./]+$' % HASH_LENGTH)
+
+# 需要扫描和改写引用的文本文件
+TEXT_EXTENSIONS = ('.html', '.htm', '.css', '.js', '.mjs', '.json', '.webmanifest', '.svg')
+
+# 保持原文件名的文件
+UNHASHED_EXTENSIONS = ('.html', '.htm', '.md')
+UNHASHED_NAMES = {"project.json", MANIFEST_NAME, "service-worker.js", "sw.js", "manifest.json"}
+
+# 引用匹配：引号中的字符串，以及不带引号的 CSS url()
+QUOTED_PATTERN = re.compile(r'(["\'`])([^"\'`\r\n]{1,500}?)\1')
+CSS_URL_PATTERN = re.compile(r'(url\(\s*)([^"\'()\s][^()\s]*)(\s*\))')
+
+
+def content_hash(data):
+    """计算内容哈希"""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def fingerprinted_name(rel_path, digest):
+    """css/style.css -> css/style.<哈希>.css"""
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{digest}{ext}"
+
+
+class ProjectFingerprinter:
+    """处理单个项目目录"""
+
+    # 是否把已带指纹的文件也作为资源（本类生成指纹时跳过它们，子类改写引用时需要包含）
+    include_fingerprinted = False
+
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self.files = []
+        self.assets = set()
+        self.texts = {}
+        self.mapping = {}
+        self._scan()
+
+    def _scan(self):
+        """收集项目内的文件，读取文本文件内容"""
+        for root, dirs, files in os.walk(self.project_dir):
+            dirs.sort()
+            for name in sorted(files):
+                # 上一次生成的带指纹副本不作为源文件
+                if not self.include_fingerprinted and FINGERPRINTED_PATTERN.search(name):
+                    continue
+                # 预压缩副本随源文件重新生成
+                if name.endswith(PRECOMPRESSED_EXTENSIONS):
+                    continue
+                rel = os.path.relpath(os.path.join(root, name), self.project_dir).replace(os.sep, "/")
+                self.files.append(rel)
+                if name not in UNHASHED_NAMES and not name.lower().endswith(UNHASHED_EXTENSIONS):
+                    self.assets.add(rel)
+                if name.lower().endswith(TEXT_EXTENSIONS):
+                    try:
+                        with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                            self.texts[rel] = f.read()
+                    except (OSError, UnicodeDecodeError):
+                        pass
+
+    def _resolve(self, document, url):
+        """把文档中的引用解析为项目内的资源路径，无法解析时返回 None"""
+        return self._resolve_with_base(document, url)[0]
+
+    def _resolve_with_base(self, document, url):
+        """解析引用，返回 (资源路径, 解析时使用的基准目录)，无法解析时返回 (None, None)"""
+        if not url or url.startswith(('http:', 'https:', '//', 'data:', 'blob:', '/', '#', 'mailto:', 'javascript:')):
+            return None, None
+        path = unquote(url.split('#')[0].split('?')[0])
+        if not path or path.endswith('/'):
+            return None, None
+
+        bases = [os.path.dirname(document)]
+        # JS 中的字符串通常相对于页面（项目根目录）解析
+        if document.endswith(('.js', '.mjs')) and bases[0]:
+            bases.append("")
+        for base in bases:
+            rel = os.path.normpath(os.path.join(base, path)).replace(os.sep, "/")
+            if rel in self.assets:
+                return rel, base
+        return None, None
+
+    def _rewrite_url(self, document, url):
+        """改写单个引用，返回新的引用，不需要改写时返回 None"""
+        target = self._resolve(document, url)
+        if target is None:
+            return None
+        if target not in self.mapping:
+            return None
+
+        # 保留引用中的目录部分和查询参数，只替换文件名
+        suffix_start = min([i for i in (url.find('?'), url.find('#')) if i >= 0], default=len(url))
+        path, suffix = url[:suffix_start], url[suffix_start:]
+        directory, _, filename = path.rpartition('/')
+        new_name = os.path.basename(self.mapping[target])
+        if '%' in filename:
+            new_name = quote(new_name)
+        return f"{directory}/{new_name}{suffix}" if directory else f"{new_name}{suffix}"
+
+    def _rewrite_value(self, document, value):
+        """改写字符串值，支持 srcset 形式的逗号分隔列表"""
+        rewritten = self._rewrite_url(document, value.strip())
+        if rewritten is not None:
+            return value.replace(value.strip(), rewritten)
+        if ',' not in value:
+            return None
+
+        changed = False
+        parts = []
+        for part in value.split(','):
+            tokens = part.strip().split(None, 1)
+            new_url = self._rewrite_url(document, tokens[0]) if tokens else None
+            if new_url is not None:
+                changed = True
+                part = part.replace(tokens[0], new_url, 1)
+            parts.append(part)
+        return ','.join(parts) if changed else None
+
+    def references(self, document):
+        """文档引用的项目内资源"""
+        content = self.texts.get(document, "")
+        refs = set()
+        for match in QUOTED_PATTERN.finditer(content):
+            for part in match.group(2).split(','):
+                tokens = part.strip().split(None, 1)
+                target = self._resolve(document, tokens[0]) if tokens else None
+                if target:
+                    refs.add(target)
+        if document.endswith(('.css', '.html', '.htm', '.svg')):
+            for match in CSS_URL_PATTERN.finditer(content):
+                target = self._resolve(document, match.group(2))
+                if target:
+                    refs.add(target)
+        refs.discard(document)
+        return refs
+
+    def rewrite(self, document):
+        """按当前映射改写文档中的引用"""
+        content = self.texts[document]
+
+        def replace_quoted(match):
+            new_value = self._rewrite_value(document, match.group(2))
+            if new_value is None:
+                return match.group(0)
+            return f"{match.group(1)}{new_value}{match.group(1)}"
+
+        def replace_url(match):
+            new_url = self._rewrite_url(document, match.group(2))
+            if new_url is None:
+                return match.group(0)
+            return f"{match.group(1)}{new_url}{match.group(3)}"
+
+        content = QUOTED_PATTERN.sub(replace_quoted, content)
+        if document.endswith(('.css', '.html', '.htm', '.svg')):
+            content = CSS_URL_PATTERN.sub(replace_url, content)
+        return content
+
+    def _components(self, graph):
+        """Tarjan 强连通分量，被依赖的分量先输出"""
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        counter = [0]
+
+        def visit(node):
+            index[node] = lowlink[node] = counter[0]
+            counter[0] += 1
+            stack.append(node)
+            on_stack.add(node)
+            for dep in sorted(graph[node]):
+                if dep not in index:
+                    visit(dep)
+                    lowlink[node] = min(lowlink[node], lowlink[dep])
+                elif dep in on_stack:
+                    lowlink[node] = min(lowlink[node], index[dep])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+
+        for node in sorted(graph):
+            if node not in index:
+                visit(node)
+        return components
+
+    def _read_bytes(self, rel):
+        with open(os.path.join(self.project_dir, rel), 'rb') as f:
+            return f.read()
+
+    def fingerprint(self):
+        """计算所有资源的带哈希文件名，返回 {原路径: 带哈希路径}"""
+        graph = {rel: (self.references(rel) & self.assets if rel in self.texts else set())
+                 for rel in self.assets}
+        outputs = {}
+
+        for component in self._components(graph):
+            # 先按已确定的依赖改写，组内互相引用在文件名确定后再改写
+            contents = {}
+            for rel in component:
+                if rel in self.texts:
+                    contents[rel] = self.rewrite(rel).encode('utf-8')
+                else:
+                    contents[rel] = self._read_bytes(rel)
+
+            if len(component) == 1:
+                rel = component[0]
+                self.mapping[rel] = fingerprinted_name(rel, content_hash(contents[rel]))
+            else:
+                digest = content_hash(b"\0".join(content_hash(contents[rel]).encode() for rel in component))
+                for rel in component:
+                    self.mapping[rel] = fingerprinted_name(rel, digest)
+                for rel in component:
+                    if rel in self.texts:
+                        contents[rel] = self.rewrite(rel).encode('utf-8')
+            outputs.update(contents)
+
+        return outputs
+
+    def run(self):
+        """生成带哈希的副本、改写引用并写入清单，返回 (资源数, 改写的文件数)"""
+        outputs = self.fingerprint()
+        rewritten = 0
+
+        # 带哈希的副本；文本资源的原文件也改写为引用带哈希的依赖
+        for rel, data in outputs.items():
+            write_file_if_changed(os.path.join(self.project_dir, self.mapping[rel]), data)
+            if rel in self.texts and write_file_if_changed(os.path.join(self.project_dir, rel), data):
+                rewritten += 1
+
+        # 保持原文件名的文本文件（HTML、Service Worker、Manifest 等）
+        for rel in self.texts:
+            if rel in self.assets:
+                continue
+            content = self.rewrite(rel)
+            if content != self.texts[rel] and write_file_if_changed(os.path.join(self.project_dir, rel), content):
+                rewritten += 1
+
+        self._write_manifest()
+        return len(self.mapping), rewritten
+
+    def _write_manifest(self):
+        """写入清单，并删除上一次生成、本次不再使用的带哈希副本"""
+        manifest_path = os.path.join(self.project_dir, MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get("assets", {})
+        except (OSError, ValueError):
+            previous = {}
+
+        current = set(self.mapping.values())
+        for stale in set(previous.values()) - current:
+            stale_path = os.path.join(self.project_dir, stale)
+            # 只删除项目内的副本
+            if (FINGERPRINTED_PATTERN.search(stale) and not os.path.normpath(stale).startswith(os.pardir)
+                    and os.path.exists(stale_path)):
+                os.remove(stale_path)
+
+        manifest = {"version": 1, "assets": dict(sorted(self.mapping.items()))}
+        write_file_if_changed(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2) + "\n")
+
+
+def fingerprint_projects(dist_dir=DIST_DIR, mirror=True):
+    """为发布目录中的所有项目生成资源指纹，返回是否全部成功"""
+    if mirror:
+        stats = mirror_site(dist_dir)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+
+    success_count = 0
+    fail_count = 0
+    total_assets = 0
+    for entry in get_catalog().entries(include_missing=True):
+        project_dir = os.path.join(dist_dir, entry["path"])
+        if not os.path.isdir(project_dir):
+            continue
+        try:
+            assets, rewritten = ProjectFingerprinter(project_dir).run()
+        except Exception as e:
+            print(f"处理项目 {entry['path']} 时出错: {e}")
+            fail_count += 1
+            continue
+        total_assets += assets
+        success_count += 1
+        if assets:
+            print(f"  {entry['path']}: {assets} 个资源, 改写 {rewritten} 个文件")
+
+    print(f"处理完成! 项目: {success_count}, 失败: {fail_count}, 资源: {total_assets}")
+    return fail_count == 0
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='为项目静态资源生成内容哈希文件名并改写引用')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    args = parser.parse_args()
+
+    return 0 if fingerprint_projects(args.output, mirror=not args.no_mirror) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
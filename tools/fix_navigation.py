@@ -3,15 +3,18 @@
 """
 导航修复工具
 
-这个脚本合并了add_back_link_fix.py和apply_navigation_fix.py的功能，
-用于修复项目页面中的导航问题，特别是在移动端浏览器中的返回链接问题。
+这个脚本合并了add_back_link_fix.py、apply_navigation_fix.py、apply_navigation_fix_to_all.py
+和update-back-links.sh的功能，用于修复项目页面中的导航问题，特别是在移动端浏览器中的返回链接问题。
 
 功能:
-1. 确保js目录存在
-2. 创建或更新导航修复脚本
-3. 修改主页，添加导航修复脚本
-4. 修改所有项目页面，添加返回链接修复脚本
-5. 修改所有项目页面中的返回链接，使用绝对路径
+1. 确保js目录存在，缺少导航修复脚本时创建
+2. 修改主页，添加导航修复脚本（navigation-fix.js）
+3. 修改所有项目页面，添加返回链接修复脚本（back-link-fix-mobile.js）
+4. 修改所有项目页面中的返回链接，使用绝对路径
+
+页面的修改注册为 html_transform.py 中的转换，每个页面只读取一次、应用全部转换后最多写回一次；
+已按当前版本处理过且之后没有改动的页面直接跳过：处理结果按 stat 签名和内容哈希缓存，
+--check 对没有改动的页面只需一次 stat，不读取文件。
 
 用法:
   python tools/fix_navigation.py [选项]
@@ -19,22 +22,38 @@
 选项:
   --homepage-only    只修复主页导航
   --projects-only    只修复项目页面导航
-  --check            只检查问题，不进行修复
+  --all-pages        处理项目中的所有HTML页面（默认只处理各项目的index.html）
+  --check            只检查问题，不进行修复（有需要修改的页面时退出码为 1）
+  --jobs N           并发处理的进程数，0 表示使用全部CPU核心（默认: 1）
   --verbose          显示详细输出
+  --json             以 JSON 输出结果（用于 CI 等流水线）
   --help             显示帮助信息并退出
 """
 
-import os
 import re
 import sys
+import json
 import argparse
 from pathlib import Path
 
+from html_transform import Transform, TransformEngine, insert_before_body_end, relative_url
+
 # 项目根目录
 ROOT_DIR = Path(__file__).parent.parent
 PROJECTS_DIR = ROOT_DIR / "projects"
 JS_DIR = ROOT_DIR / "js"
 
+# 主页和项目页面加载的修复脚本
+HOMEPAGE = "index.html"
+NAVIGATION_SCRIPT = "navigation-fix.js"
+BACK_LINK_SCRIPT = "back-link-fix-mobile.js"
+
+# 任意版本的返回链接修复脚本（back-link-fix.js、back-link-fix-new.js 等）
+BACK_LINK_SCRIPT_PATTERN = re.compile(r'back-link-fix[\w-]*\.js')
+BACK_LINK_PATTERN = re.compile(r'<a\b([^>]*\bclass="back-link"[^>]*)>(\s*返回主菜单\s*)</a>')
+HREF_PATTERN = re.compile(r'\bhref="([^"]*)"')
+ID_PATTERN = re.compile(r'\bid=')
+
 # 导航修复脚本内容
 NAVIGATION_FIX_JS = """/**
  * 修复移动端浏览器返回主页后无法再次点击链接的问题
@@ -84,246 +103,163 @@ function fixProjectLinks() {
 }
 """
 
-# 返回链接修复脚本内容
-BACK_LINK_FIX_JS = """/**
- * 修复项目页面中的返回链接
- *
- * 问题原因：
- * 在移动端浏览器中，使用相对路径的返回链接（如 "../index.html"）可能导致
- * 用户返回主页后无法再次点击项目链接。这个脚本将返回链接修改为绝对路径。
- */
-
-document.addEventListener('DOMContentLoaded', function() {
-    // 修复返回链接
-    fixBackLink();
-});
-
-/**
- * 修复返回主菜单的链接
- */
-function fixBackLink() {
-    // 获取返回链接元素
-    const backLink = document.querySelector('.back-link');
-
-    if (!backLink) {
-        console.log('未找到返回链接');
-        return;
-    }
-
-    // 获取原始href
-    const originalHref = backLink.getAttribute('href');
-
-    // 构建绝对URL - 无论原始链接是什么，都使用根路径
-    const absoluteUrl = window.location.origin + '/';
-
-    // 修改返回链接的href属性
-    backLink.setAttribute('href', absoluteUrl);
-
-    // 添加点击事件处理
-    backLink.addEventListener('click', function(e) {
-        // 阻止默认行为
-        e.preventDefault();
-
-        // 在URL中添加一个时间戳参数，确保主页刷新
-        const timestamp = new Date().getTime();
-        const urlWithTimestamp = absoluteUrl + '?t=' + timestamp;
-
-        // 使用绝对URL导航
-        window.location.href = urlWithTimestamp;
-    });
-}
-"""
-
 def ensure_js_dir():
     """确保js目录存在"""
     JS_DIR.mkdir(exist_ok=True)
     return True
 
-def create_or_update_script(script_name, content):
-    """创建或更新脚本文件"""
+def create_script_if_missing(script_name, content):
+    """缺少脚本文件时创建（已有的脚本可能已经更新过，不覆盖）"""
     script_path = JS_DIR / script_name
-    
-    # 检查文件是否存在且内容相同
     if script_path.exists():
-        with open(script_path, 'r', encoding='utf-8') as f:
-            existing_content = f.read()
-        
-        if existing_content.strip() == content.strip():
-            print(f"脚本 {script_name} 已存在且内容相同，无需更新")
-            return True
-    
-    # 创建或更新文件
+        return True
+
     with open(script_path, 'w', encoding='utf-8') as f:
         f.write(content)
-    
-    print(f"已创建/更新脚本: {script_path}")
-    return True
 
-def add_script_to_html(html_file, script_path, script_name, check_only=False):
-    """向HTML文件添加脚本引用"""
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 检查是否已经包含了脚本
-    if script_name in content:
-        print(f"文件 {html_file} 已包含 {script_name} 脚本")
-        return False
-    
-    if check_only:
-        print(f"文件 {html_file} 需要添加 {script_name} 脚本")
-        return True
-    
-    # 在</body>标签前添加脚本引用
-    script_tag = f'<script src="{script_path}"></script>\n</body>'
-    modified_content = content.replace('</body>', script_tag)
-    
-    # 如果内容没有变化，可能是HTML结构不同
-    if modified_content == content:
-        # 尝试在</html>标签前添加
-        script_tag = f'<script src="{script_path}"></script>\n</html>'
-        modified_content = content.replace('</html>', script_tag)
-        
-        # 如果仍然没有变化，可能需要手动处理
-        if modified_content == content:
-            print(f"无法修改文件 {html_file}，请手动添加脚本")
-            return False
-    
-    # 写回文件
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(modified_content)
-    
-    print(f"已向 {html_file} 添加 {script_name} 脚本")
+    print(f"已创建脚本: {script_path}")
     return True
 
-def fix_back_link(html_file, check_only=False):
-    """修复返回链接，使用绝对路径"""
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 查找返回链接
-    back_link_pattern = r'<a\s+href="[^"]*"\s+class="back-link"[^>]*>返回主菜单</a>'
-    back_link_match = re.search(back_link_pattern, content)
-    
-    if not back_link_match:
-        print(f"文件 {html_file} 中未找到返回链接")
-        return False
-    
-    # 检查是否已经是绝对路径
-    if 'href="/"' in back_link_match.group(0) or 'href="http' in back_link_match.group(0):
-        print(f"文件 {html_file} 中的返回链接已经是绝对路径")
-        return False
-    
-    if check_only:
-        print(f"文件 {html_file} 中的返回链接需要修复")
-        return True
-    
-    # 替换为绝对路径
-    new_back_link = '<a href="/" class="back-link" id="backToHome">返回主菜单</a>'
-    modified_content = content.replace(back_link_match.group(0), new_back_link)
-    
-    # 如果内容没有变化，可能是正则表达式匹配有问题
-    if modified_content == content:
-        print(f"无法修改文件 {html_file} 中的返回链接，请手动修改")
+def _is_homepage(page):
+    return page == HOMEPAGE
+
+def _is_project_page(page):
+    return page.startswith("projects/") and 'backup' not in page.lower()
+
+def add_navigation_script(content, page):
+    """主页加载导航修复脚本"""
+    if NAVIGATION_SCRIPT in content:
+        return content
+    return insert_before_body_end(content, f'<script src="js/{NAVIGATION_SCRIPT}"></script>')
+
+def add_back_link_script(content, page):
+    """项目页面加载返回链接修复脚本（已加载任意版本时不再添加）
+
+    脚本只在 DOMContentLoaded 时初始化，使用 defer 不阻塞页面解析。
+    """
+    if BACK_LINK_SCRIPT_PATTERN.search(content):
+        return content
+    script_url = relative_url(page, f"js/{BACK_LINK_SCRIPT}")
+    return insert_before_body_end(content, f'<script src="{script_url}" defer></script>')
+
+def normalize_back_link(content, page):
+    """返回主菜单的链接使用绝对路径，没有 id 时加上 id="backToHome"（与返回链接修复脚本配合）"""
+
+    def replace(match):
+        attributes = match.group(1)
+        href = HREF_PATTERN.search(attributes)
+        if href and (href.group(1) == "/" or href.group(1).startswith("http")):
+            return match.group(0)
+        if href:
+            attributes = f'{attributes[:href.start()]}href="/"{attributes[href.end():]}'
+        else:
+            attributes = f' href="/"{attributes}'
+        if not ID_PATTERN.search(attributes):
+            attributes = f'{attributes.rstrip()} id="backToHome"'
+        return f'<a{attributes}>{match.group(2)}</a>'
+
+    return BACK_LINK_PATTERN.sub(replace, content)
+
+# 导航修复的转换（按顺序应用），修改转换逻辑时递增版本号
+NAVIGATION_TRANSFORMS = [
+    Transform("navigation-script", 1, add_navigation_script, _is_homepage, "主页加载导航修复脚本"),
+    Transform("back-link-script", 2, add_back_link_script, _is_project_page, "项目页面加载返回链接修复脚本"),
+    Transform("back-link-href", 1, normalize_back_link, _is_project_page, "返回链接使用绝对路径"),
+]
+
+def find_project_pages(all_pages=False):
+    """查找项目页面：默认为各项目的index.html，all_pages 时为项目中的所有HTML页面"""
+    if all_pages:
+        return sorted(PROJECTS_DIR.rglob("*.html"))
+    return sorted(PROJECTS_DIR.glob("*/*/index.html"))
+
+def run_navigation_fix(homepage=True, projects=True, all_pages=False, transforms=None,
+                       check_only=False, verbose=False, jobs=1, json_output=False):
+    """对主页和项目页面应用导航修复转换，返回是否全部成功（只检查时还要求没有需要修改的页面）
+
+    json_output 为 True 时不输出逐个文件的信息，最后以 JSON 输出结果。
+    """
+    log = (lambda *args: None) if json_output else print
+    if not check_only and not ensure_js_dir():
         return False
-    
-    # 写回文件
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(modified_content)
-    
-    print(f"已修复 {html_file} 中的返回链接")
-    return True
 
-def fix_homepage(check_only=False, verbose=False):
-    """修复主页导航"""
-    # 确保js目录存在
-    if not ensure_js_dir():
-        return False
-    
-    # 创建或更新导航修复脚本
-    if not create_or_update_script("navigation-fix.js", NAVIGATION_FIX_JS):
-        return False
-    
-    # 向主页添加导航修复脚本
-    index_file = ROOT_DIR / "index.html"
-    if not index_file.exists():
-        print("错误：找不到主页文件")
-        return False
-    
-    return add_script_to_html(index_file, "js/navigation-fix.js", "navigation-fix.js", check_only)
-
-def fix_project_pages(check_only=False, verbose=False):
-    """修复项目页面导航"""
-    # 确保js目录存在
-    if not ensure_js_dir():
-        return False
-    
-    # 创建或更新返回链接修复脚本
-    if not create_or_update_script("back-link-fix.js", BACK_LINK_FIX_JS):
-        return False
-    
-    # 统计
-    total_files = 0
-    script_added = 0
-    back_link_fixed = 0
-    
-    # 遍历所有项目目录
-    for category_dir in PROJECTS_DIR.iterdir():
-        if not category_dir.is_dir():
-            continue
-        
-        for project_dir in category_dir.iterdir():
-            if not project_dir.is_dir():
-                continue
-            
-            # 查找index.html文件
-            index_file = project_dir / "index.html"
-            if index_file.exists():
-                total_files += 1
-                
-                # 添加返回链接修复脚本
-                if add_script_to_html(index_file, "../../js/back-link-fix.js", "back-link-fix.js", check_only):
-                    script_added += 1
-                
-                # 修复返回链接
-                if fix_back_link(index_file, check_only):
-                    back_link_fixed += 1
-    
-    if verbose or check_only:
-        print(f"\n项目页面检查结果：共 {total_files} 个文件，需要添加脚本 {script_added} 个，需要修复返回链接 {back_link_fixed} 个")
-    
-    return True
+    pages = []
+    if homepage:
+        index_file = ROOT_DIR / HOMEPAGE
+        if not index_file.exists():
+            print("错误：找不到主页文件")
+            return False
+        if not check_only:
+            create_script_if_missing(NAVIGATION_SCRIPT, NAVIGATION_FIX_JS)
+        pages.append(index_file)
+    if projects:
+        if not (JS_DIR / BACK_LINK_SCRIPT).exists():
+            print(f"错误：找不到返回链接修复脚本文件 {JS_DIR / BACK_LINK_SCRIPT}")
+            return False
+        pages += find_project_pages(all_pages)
+
+    engine = TransformEngine(transforms or NAVIGATION_TRANSFORMS, ROOT_DIR, jobs=jobs)
+    results = engine.run(pages, check_only)
+    for result in results:
+        for error in result["errors"]:
+            log(f"处理文件 {result['page']} 时出错: {error}")
+        if result["changed"]:
+            action = "需要修改" if check_only else "已修改"
+            log(f"{action} {result['page']}: {', '.join(result['changed_by'])}")
+        elif verbose:
+            log(f"无需修改 {result['page']}{'（已是最新）' if result['skipped'] else ''}")
+
+    stats = engine.stats
+    success = stats["failed"] == 0 and not (check_only and stats["changed"])
+    if json_output:
+        print(json.dumps({
+            "ok": success,
+            "check": check_only,
+            "stats": stats,
+            "pages": [
+                {"page": r["page"], "transforms": r["changed_by"], "errors": r["errors"]}
+                for r in results if r["changed"] or r["errors"]
+            ],
+        }, ensure_ascii=False, indent=2))
+        return success
+
+    print(f"\n处理完成! 页面: {stats['files']}, {'需要修改' if check_only else '修改'}: {stats['changed']}, "
+          f"跳过（已是最新）: {stats['skipped']}（其中 {stats['stat_hits']} 个未读取文件）, 失败: {stats['failed']}")
+    return success
 
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='修复网页导航问题')
     parser.add_argument('--homepage-only', action='store_true', help='只修复主页导航')
     parser.add_argument('--projects-only', action='store_true', help='只修复项目页面导航')
+    parser.add_argument('--all-pages', action='store_true', help='处理项目中的所有HTML页面')
     parser.add_argument('--check', action='store_true', help='只检查问题，不进行修复')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='并发处理的进程数，0 表示使用全部CPU核心（默认: 1）')
     parser.add_argument('--verbose', action='store_true', help='显示详细输出')
-    
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果（用于 CI 等流水线）')
+
     args = parser.parse_args()
-    
+    if args.jobs < 0:
+        parser.error("--jobs 不能为负数")
+
     # 如果没有指定特定选项，则修复所有
-    fix_home = not args.projects_only
-    fix_projects = not args.homepage_only
-    
-    success = True
-    
-    if fix_home:
-        print("正在处理主页导航...")
-        if not fix_homepage(args.check, args.verbose):
-            success = False
-    
-    if fix_projects:
-        print("正在处理项目页面导航...")
-        if not fix_project_pages(args.check, args.verbose):
-            success = False
-    
-    if args.check:
-        print("\n检查完成。使用相同的命令但不带 --check 参数来修复问题。")
-    else:
-        print("\n导航修复完成！")
-    
+    success = run_navigation_fix(
+        homepage=not args.projects_only,
+        projects=not args.homepage_only,
+        all_pages=args.all_pages,
+        check_only=args.check,
+        verbose=args.verbose,
+        jobs=args.jobs,
+        json_output=args.json,
+    )
+
+    if not args.json:
+        if args.check:
+            print("\n检查完成。使用相同的命令但不带 --check 参数来修复问题。")
+        else:
+            print("\n导航修复完成！")
+
     return 0 if success else 1
 
 if __name__ == "__main__":
@@ -5,7 +5,25 @@ import os
 import json
 import re
 import sys
+import hashlib
+import textwrap
 from collections import defaultdict
+from html import escape
+
+from project_catalog import get_catalog, CACHE_DIR
+from utils import AtomicFileWriter, write_file_if_changed
+from profiling import get_profiler, profile_session, profile_options_from_argv
+from validate_projects import validate_projects
+
+# 生成器版本，卡片HTML结构变化时递增以作废片段缓存
+GENERATOR_VERSION = 2
+
+# 卡片片段缓存文件
+CARD_CACHE_PATH = os.path.join(CACHE_DIR, "homepage_cards.json")
+
+# 外置样式和脚本的输出目录（相对于站点根目录），文件名带内容哈希，可以长期缓存
+ASSETS_DIR = "assets"
+ASSET_PREFIX = "home."
 
 # 状态文本映射
 STATUS_TEXT = {
@@ -14,6 +32,13 @@ STATUS_TEXT = {
     "deprecated": "已归档"
 }
 
+# 性能影响文本映射（compatibility.performance_impact，由 page_weight.py 推导）
+PERFORMANCE_TEXT = {
+    "low": "轻量",
+    "medium": "中等负载",
+    "high": "高负载"
+}
+
 def read_site_config():
     """读取站点配置文件"""
     # 首先尝试读取简化版配置文件
@@ -55,8 +80,12 @@ def read_project_config(project_path):
             return None
     return None
 
-def generate_project_card(project_path, config, valid_tag_ids):
-    """生成项目卡片HTML"""
+def generate_project_card(project_path, config, valid_tag_ids, order=None, primary_category=None):
+    """生成项目卡片HTML
+
+    order 不为 None 时写入 data-order 属性，供紧凑模式在客户端按分类重新排序。
+    primary_category 为分组时确定的主分类（没有配置时取所在目录），与卡片所在的分类区域保持一致。
+    """
     # 获取项目目录名
     project_dir = os.path.basename(project_path)
 
@@ -77,7 +106,8 @@ def generate_project_card(project_path, config, valid_tag_ids):
             version_info += f" ({last_updated})"
 
     # 获取分类信息
-    primary_category = config.get("primary_category", "")
+    if primary_category is None:
+        primary_category = config.get("primary_category", "")
     secondary_categories = config.get("secondary_categories", [])
     all_categories = [primary_category] + secondary_categories if primary_category else secondary_categories
 
@@ -91,7 +121,8 @@ def generate_project_card(project_path, config, valid_tag_ids):
             tag_ids.append(tag_id)
 
     # 构建项目卡片HTML，添加数据属性用于筛选
-    card_html = f"""                <div class="toy-card" data-categories="{' '.join(all_categories)}" data-tags="{' '.join(tag_ids)}">
+    order_attr = f' data-order="{order}"' if order is not None else ''
+    card_html = f"""                <div class="toy-card" data-categories="{' '.join(all_categories)}" data-tags="{' '.join(tag_ids)}"{order_attr}>
                     <a href="{project_path}/index.html" class="toy-link">
                         <h3 class="toy-title">{title}</h3>
                         <p class="toy-description">{description}</p>
@@ -107,6 +138,13 @@ def generate_project_card(project_path, config, valid_tag_ids):
                         <div class="toy-meta">
                             <span class="toy-status {status}">{status_text}</span>"""
 
+    # 显示性能影响
+    compatibility = config.get("compatibility")
+    impact = compatibility.get("performance_impact") if isinstance(compatibility, dict) else None
+    if impact in PERFORMANCE_TEXT:
+        card_html += f"""
+                            <span class="toy-performance {impact}" title="性能影响">{PERFORMANCE_TEXT[impact]}</span>"""
+
     # 如果有版本信息，添加到卡片中
     if version_info:
         card_html += f"""
@@ -118,84 +156,120 @@ def generate_project_card(project_path, config, valid_tag_ids):
                 </div>"""
     return card_html
 
-def generate_homepage():
-    """生成主页HTML"""
-    # 读取站点配置
-    site_config = read_site_config()
-    if not site_config:
-        print("无法读取站点配置，生成中止")
-        return
-
-    # 获取分类和标签
-    categories = site_config.get("categories", [])
-    tags = site_config.get("tags", [])
-
-    # 创建有效标签ID列表
-    valid_tag_ids = [tag["id"] for tag in tags]
-
-    # 按分类组织项目
-    projects_by_category = defaultdict(list)
-    all_projects = []
+class CardFragmentCache:
+    """项目卡片HTML片段缓存
+
+    片段以「生成器版本 + 输出模式 + 有效标签集合 + 项目路径 + 项目配置」的哈希为键，
+    配置未变化的项目直接复用上次渲染的HTML。persistent 为 True 时缓存会保存到磁盘，
+    供下一次增量构建使用。
+    """
+
+    def __init__(self, valid_tag_ids, persistent=False, compact=False, cache_path=CARD_CACHE_PATH):
+        self.persistent = persistent
+        self.compact = compact
+        self.cache_path = cache_path
+        self.tags_key = hashlib.sha256(' '.join(sorted(valid_tag_ids)).encode('utf-8')).hexdigest()
+        self.valid_tag_ids = valid_tag_ids
+        self.fragments = {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        if persistent:
+            self._load()
+
+    def _load(self):
+        """读取磁盘上的片段缓存"""
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == GENERATOR_VERSION:
+                self.fragments = data.get("fragments", {})
+        except Exception as e:
+            print(f"读取卡片片段缓存时出错，将全部重新渲染: {e}")
+
+    def key(self, project_path, config, primary_category=None):
+        """计算卡片片段的缓存键"""
+        config_json = json.dumps(config, ensure_ascii=False, sort_keys=True)
+        mode = "compact" if self.compact else "full"
+        raw = f"{GENERATOR_VERSION}\0{mode}\0{self.tags_key}\0{project_path}\0{primary_category}\0{config_json}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def render(self, project_path, config, primary_category=None):
+        """返回项目卡片HTML，未命中缓存时才重新渲染"""
+        key = self.key(project_path, config, primary_category)
+        card_html = self.used.get(key)
+        if card_html is None:
+            card_html = self.fragments.get(key)
+            if card_html is None:
+                order = config.get("order", 999) if self.compact else None
+                with get_profiler().span("render", project=project_path):
+                    card_html = generate_project_card(project_path, config, self.valid_tag_ids, order, primary_category)
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.used[key] = card_html
+        return card_html
+
+    def save(self):
+        """保存本次用到的片段（自动清理已失效的条目）"""
+        if not self.persistent:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": GENERATOR_VERSION, "fragments": self.used}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"保存卡片片段缓存时出错: {e}")
 
-    # 项目根目录
-    projects_root = "projects"
-
-    # 遍历分类目录
-    for category_dir in os.listdir(projects_root):
-        category_path = os.path.join(projects_root, category_dir)
-        if os.path.isdir(category_path):
-            # 找到对应的分类ID
-            category_id = None
-            for cat in categories:
-                if cat["id"] == category_dir:
-                    category_id = category_dir
-                    break
-
-            if not category_id:
-                print(f"警告: 找不到目录 {category_dir} 对应的分类ID")
-                continue
+# 分类标签切换脚本：每个分类有独立的内容区域
+SECTION_TAB_SCRIPT = """            // 分类标签点击事件
+            categoryTabs.forEach(tab => {
+                tab.addEventListener('click', function() {
+                    // 移除所有激活状态
+                    categoryTabs.forEach(t => t.classList.remove('active'));
+                    categoryContents.forEach(c => c.classList.remove('active'));
 
-            # 遍历该分类下的所有项目
-            for project_dir in os.listdir(category_path):
-                project_path = os.path.join(category_path, project_dir)
-                if os.path.isdir(project_path):
-                    config = read_project_config(project_path)
-                    if config:
-                        # 获取项目在分类中的顺序
-                        order = config.get("order", 999)
+                    // 激活当前分类
+                    this.classList.add('active');
+                    const categoryId = this.getAttribute('data-category');
+                    document.getElementById('content-' + categoryId).classList.add('active');
 
-                        # 获取主分类和次要分类
-                        primary_category = config.get("primary_category", category_id)
-                        secondary_categories = config.get("secondary_categories", [])
+                    // 应用当前标签筛选
+                    applyTagFilters();
+                });
+            });
+"""
 
-                        # 添加到主分类
-                        projects_by_category[primary_category].append((project_path, config, order))
+# 分类标签切换脚本（紧凑模式）：只有一个内容区域，切换标题并按分类筛选卡片
+COMPACT_TAB_SCRIPT = """            // 分类标签点击事件
+            const categoryTitle = document.getElementById('categoryTitle');
+            const categoryDescription = document.getElementById('categoryDescription');
+            const defaultTitle = categoryTitle.textContent;
+            const defaultDescription = categoryDescription.textContent;
 
-                        # 添加到次要分类
-                        for sec_category in secondary_categories:
-                            if sec_category != primary_category:
-                                projects_by_category[sec_category].append((project_path, config, 999))  # 次要分类中顺序靠后
+            categoryTabs.forEach(tab => {
+                tab.addEventListener('click', function() {
+                    // 移除所有激活状态
+                    categoryTabs.forEach(t => t.classList.remove('active'));
 
-                        # 添加到所有项目列表
-                        all_projects.append((project_path, config, order))
-                    else:
-                        print(f"警告: 项目 {project_path} 没有配置文件或配置文件无效")
+                    // 激活当前分类并更新标题
+                    this.classList.add('active');
+                    const isAll = this.getAttribute('data-category') === 'all';
+                    categoryTitle.textContent = isAll ? defaultTitle : this.getAttribute('data-title');
+                    categoryDescription.textContent = isAll ? defaultDescription : this.getAttribute('data-description');
 
-    # 生成HTML
-    html = []
+                    // 按当前分类和标签筛选卡片
+                    applyTagFilters();
+                });
+            });
+"""
 
-    # HTML头部
-    html.append("""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>网页玩具合集 - Little Shock</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@400;500;700;900&display=swap" rel="stylesheet">
-    <style>
-        :root {
+# 主页样式（内联时原样放入 <style>，外置时去掉缩进写入 assets/home.<hash>.css）
+HOMEPAGE_CSS = """        :root {
             --primary-color: #6200ea;
             --secondary-color: #00b0ff;
             --accent-color: #ff4081;
@@ -451,6 +525,19 @@ def generate_homepage():
             color: #e57373;
         }
 
+        .toy-performance {
+            font-size: 0.75rem;
+            color: rgba(255, 255, 255, 0.6);
+        }
+
+        .toy-performance.low {
+            color: #81c784;
+        }
+
+        .toy-performance.high {
+            color: #e57373;
+        }
+
         .toy-version {
             font-size: 0.8rem;
             color: rgba(255, 255, 255, 0.6);
@@ -568,110 +655,10 @@ def generate_homepage():
             .tag-cloud {
                 grid-template-columns: repeat(2, 1fr);
             }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>""")
-
-    # 添加团队名称和描述
-    html.append(f'            <div class="team-name">{site_config.get("team_name", "Little Shock")}</div>')
-    html.append(f'            <p class="subtitle">{site_config.get("site_description", "创意网页玩具合集")}</p>')
-    html.append(f'            <div class="little-shock-link">')
-    html.append(f'                <a href="{site_config.get("team_link", "#")}" target="_blank">Little Shock 专区 @ WaytoAGI</a>')
-    html.append(f'            </div>')
-    html.append(f'        </header>')
-
-    # 添加标签筛选器
-    html.append("""        <div class="tag-filter">
-            <h3 class="tag-filter-title">标签筛选</h3>
-            <div class="tag-cloud">""")
-
-    # 添加标签，只显示配置中的标签
-    for tag in tags:
-        html.append(f'                <div class="tag-item" data-tag="{tag["id"]}">{tag["name"]}</div>')
-
-    html.append("""            </div>
-            <div class="tag-filter-actions">
-                <button class="tag-filter-button" id="clearTags">清除筛选</button>
-                <button class="tag-filter-button primary" id="applyTags">应用筛选</button>
-            </div>
-        </div>""")
-
-    # 添加分类导航
-    html.append("""        <div class="category-nav">
-            <div class="nav-arrows left">
-                <div class="nav-arrow-icon">◀</div>
-            </div>
-            <div class="category-nav-scroll">""")
-
-    # 按order排序分类
-    sorted_categories = sorted(categories, key=lambda x: x.get("order", 999))
-
-    # 添加"全部"分类
-    html.append('                <div class="category-tab" data-category="all"><span class="category-icon">🔍</span>全部项目</div>')
-
-    # 只显示有项目的分类
-    for category in sorted_categories:
-        category_id = category.get("id")
-        if category_id in projects_by_category and projects_by_category[category_id]:
-            icon = category.get("icon", "")
-            icon_html = f'<span class="category-icon">{icon}</span>' if icon else ''
-            html.append(f'                <div class="category-tab" data-category="{category_id}">{icon_html}{category.get("name", "未命名")}</div>')
-
-    html.append("""            </div>
-            <div class="nav-arrows right">
-                <div class="nav-arrow-icon">▶</div>
-            </div>
-        </div>
-        <div class="content-area">""")
-
-    # 添加"全部"分类内容
-    html.append("""            <div class="category-content" id="content-all">
-                <h2 class="category-title">全部项目</h2>
-                <p class="category-description">所有创意网页玩具的完整集合</p>
-                <div class="toys-container">""")
-
-    # 对所有项目按order排序
-    all_projects.sort(key=lambda x: x[2])
-
-    # 生成每个项目的卡片
-    for project_path, config, _ in all_projects:
-        html.append(generate_project_card(project_path, config, valid_tag_ids))
-
-    html.append("""                </div>
-            </div>""")
-
-    # 生成每个分类的内容
-    for category in sorted_categories:
-        category_id = category.get("id")
-        if category_id in projects_by_category and projects_by_category[category_id]:
-            # 对每个分类中的项目按order排序
-            projects = sorted(projects_by_category[category_id], key=lambda x: x[2])
-
-            # 生成分类内容区域
-            html.append(f"""            <div class="category-content" id="content-{category_id}">
-                <h2 class="category-title">{category.get("name", "未命名")}</h2>
-                <p class="category-description">{category.get("description", "")}</p>
-                <div class="toys-container">""")
-
-            # 生成每个项目的卡片
-            for project_path, config, _ in projects:
-                html.append(generate_project_card(project_path, config, valid_tag_ids))
-
-            html.append("""                </div>
-            </div>""")
-
-    # HTML尾部
-    html.append("""        </div>
-        <footer>
-            <p class="copyright">""" + site_config.get("copyright", "© 2025 Little Shock 团队") + """</p>
-        </footer>
-    </div>
+        }"""
 
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {
+# 主页脚本：分类切换部分之前和之后的内容
+HOMEPAGE_SCRIPT_BEFORE_TABS = """        document.addEventListener('DOMContentLoaded', function() {
             // 获取所有分类标签和内容区域
             const categoryTabs = document.querySelectorAll('.category-tab');
             const categoryContents = document.querySelectorAll('.category-content');
@@ -685,23 +672,9 @@ def generate_homepage():
                 document.getElementById('content-all').classList.add('active');
             }
 
-            // 分类标签点击事件
-            categoryTabs.forEach(tab => {
-                tab.addEventListener('click', function() {
-                    // 移除所有激活状态
-                    categoryTabs.forEach(t => t.classList.remove('active'));
-                    categoryContents.forEach(c => c.classList.remove('active'));
-
-                    // 激活当前分类
-                    this.classList.add('active');
-                    const categoryId = this.getAttribute('data-category');
-                    document.getElementById('content-' + categoryId).classList.add('active');
-
-                    // 应用当前标签筛选
-                    applyTagFilters();
-                });
-            });
+"""
 
+HOMEPAGE_SCRIPT_AFTER_TABS = """
             // 导航箭头功能
             function updateArrowsVisibility() {
                 leftArrow.classList.toggle('visible', navScroll.scrollLeft > 0);
@@ -767,6 +740,12 @@ def generate_homepage():
                     const cardTags = card.getAttribute('data-tags').split(' ');
                     const tagMatch = selectedTags.length === 0 || selectedTags.some(tag => cardTags.includes(tag));
 
+                    // 紧凑模式下，卡片在当前分类中的顺序：主分类按order排序，次要分类靠后
+                    if (card.hasAttribute('data-order')) {
+                        const isPrimary = activeCategory === 'all' || cardCategories[0] === activeCategory;
+                        card.style.order = isPrimary ? card.getAttribute('data-order') : 999;
+                    }
+
                     // 显示或隐藏卡片
                     if (categoryMatch && tagMatch) {
                         card.style.display = '';
@@ -775,40 +754,274 @@ def generate_homepage():
                     }
                 });
             }
-        });
-    </script>
-</body>
-</html>""")
+        });"""
+
+def homepage_script(compact=False):
+    """主页脚本（紧凑模式使用不同的分类切换逻辑）"""
+    tab_script = COMPACT_TAB_SCRIPT if compact else SECTION_TAB_SCRIPT
+    return HOMEPAGE_SCRIPT_BEFORE_TABS + tab_script + HOMEPAGE_SCRIPT_AFTER_TABS
+
+def write_homepage_assets(compact=False):
+    """把主页样式和脚本写入 assets/home.<哈希>.css/js，返回 {"css": 路径, "js": 路径}
+
+    文件名包含内容哈希，内容不变时文件名不变，可以配合 Cache-Control: immutable 长期缓存；
+    内容变化时生成新文件名，旧文件随之删除。
+    """
+    contents = {
+        "css": textwrap.dedent(HOMEPAGE_CSS).strip() + "\n",
+        "js": textwrap.dedent(homepage_script(compact)).strip() + "\n"
+    }
+
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    assets = {}
+    for ext, content in contents.items():
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+        path = os.path.join(ASSETS_DIR, f"{ASSET_PREFIX}{digest}.{ext}")
+        if write_file_if_changed(path, content):
+            print(f"已生成主页资源文件: {path}")
+        assets[ext] = path.replace(os.sep, "/")
+    return assets
+
+def prune_homepage_assets(keep):
+    """删除不再被主页引用的旧资源文件"""
+    if not os.path.isdir(ASSETS_DIR):
+        return
+    keep = {os.path.basename(path) for path in keep}
+    for name in os.listdir(ASSETS_DIR):
+        if name.startswith(ASSET_PREFIX) and name.endswith((".css", ".js")) and name not in keep:
+            try:
+                os.remove(os.path.join(ASSETS_DIR, name))
+            except OSError as e:
+                print(f"删除旧资源文件 {name} 时出错: {e}")
+
+def generate_homepage(incremental=False, compact=False, site_config=None, inline_assets=False):
+    """生成主页HTML
+
+    incremental 为 True 时启用持久化的卡片片段缓存，只重新渲染配置发生变化的项目卡片。
+    compact 为 True 时每个项目只输出一张卡片，分类切换和标签筛选都在客户端
+    通过 data-categories/data-tags 属性切换卡片的显示状态。
+    site_config 为 None 时自行读取站点配置；构建流水线会传入已读取的配置。
+    样式和脚本默认外置为 assets/ 下带内容哈希的文件；inline_assets 为 True 时内联到页面中。
+    """
+    profiler = get_profiler()
+
+    # 读取站点配置
+    if site_config is None:
+        site_config = read_site_config()
+    if not site_config:
+        print("无法读取站点配置，生成中止")
+        return False
+
+    # 获取分类和标签
+    categories = site_config.get("categories", [])
+    tags = site_config.get("tags", [])
+
+    # 创建有效标签ID列表
+    valid_tag_ids = [tag["id"] for tag in tags]
+
+    # 卡片片段缓存：同一项目出现在多个分类中时只渲染一次
+    card_cache = CardFragmentCache(valid_tag_ids, persistent=incremental, compact=compact)
+
+    # 按分类组织项目
+    projects_by_category = defaultdict(list)
+    all_projects = []
+
+    # 有效的分类ID
+    category_ids = {cat["id"] for cat in categories}
+    warned_dirs = set()
+
+    # 遍历项目目录（来自带缓存的项目目录，只重新解析变化过的 project.json）
+    for entry in get_catalog().entries(include_missing=True):
+        category_dir = entry["category_dir"]
+        if category_dir not in category_ids:
+            if category_dir not in warned_dirs:
+                print(f"警告: 找不到目录 {category_dir} 对应的分类ID")
+                warned_dirs.add(category_dir)
+            continue
+
+        project_path = entry["path"]
+        config = entry["config"]
+        if config:
+            # 获取项目在分类中的顺序
+            order = config.get("order", 999)
+
+            # 获取主分类和次要分类
+            primary_category = config.get("primary_category", category_dir)
+            secondary_categories = config.get("secondary_categories", [])
+
+            # 添加到主分类
+            projects_by_category[primary_category].append((project_path, config, order, primary_category))
+
+            # 添加到次要分类
+            for sec_category in secondary_categories:
+                if sec_category != primary_category:
+                    projects_by_category[sec_category].append((project_path, config, 999, primary_category))  # 次要分类中顺序靠后
+
+            # 添加到所有项目列表
+            all_projects.append((project_path, config, order, primary_category))
+        else:
+            print(f"警告: 项目 {project_path} 没有配置文件或配置文件无效")
+
+    # 先写入资源文件，保证新页面引用的文件在页面替换前就已存在
+    assets = None if inline_assets else write_homepage_assets(compact)
+
+    # 流式写入主页：逐块写入同目录下的临时文件，fsync 后原子替换 index.html，
+    # 写入过程中的读取方只会看到旧的完整页面；内容未变化时保留原文件
+    with profiler.span("page"):
+        with AtomicFileWriter('index.html') as writer:
+            writer.write_lines(iter_homepage_html(site_config, projects_by_category, all_projects,
+                                                  card_cache, compact, assets))
+
+    prune_homepage_assets(assets.values() if assets else [])
+
+    card_cache.save()
+    if incremental:
+        print(f"卡片片段: 复用 {card_cache.hits} 个, 重新渲染 {card_cache.misses} 个")
+
+    if writer.changed:
+        print("主页生成完成！")
+    else:
+        print("主页内容没有变化，跳过写入")
+    return True
+
+def iter_homepage_html(site_config, projects_by_category, all_projects, card_cache, compact=False, assets=None):
+    """逐块生成主页HTML，块之间以换行连接
+
+    调用方边生成边写入文件，不需要在内存中拼出整个页面。
+    assets 为 write_homepage_assets 返回的资源路径，为 None 时内联样式和脚本。
+    """
+    categories = site_config.get("categories", [])
+    tags = site_config.get("tags", [])
+
+    if assets:
+        stylesheet_html = f'    <link rel="stylesheet" href="{assets["css"]}">'
+        script_html = f'    <script src="{assets["js"]}"></script>'
+    else:
+        stylesheet_html = f"    <style>\n{HOMEPAGE_CSS}\n    </style>"
+        script_html = f"    <script>\n{homepage_script(compact)}\n    </script>"
+
+    # HTML头部
+    yield """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>网页玩具合集 - Little Shock</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@400;500;700;900&display=swap" rel="stylesheet">
+""" + stylesheet_html + """
+</head>
+<body>
+    <div class="container">
+        <header>"""
 
-    # 将HTML写入文件
-    with open('index.html', 'w', encoding='utf-8') as f:
-        f.write('\n'.join(html))
+    # 添加团队名称和描述
+    yield f'            <div class="team-name">{site_config.get("team_name", "Little Shock")}</div>'
+    yield f'            <p class="subtitle">{site_config.get("site_description", "创意网页玩具合集")}</p>'
+    yield f'            <div class="little-shock-link">'
+    yield f'                <a href="{site_config.get("team_link", "#")}" target="_blank">Little Shock 专区 @ WaytoAGI</a>'
+    yield f'            </div>'
+    yield f'        </header>'
 
-    print("主页生成完成！")
+    # 添加标签筛选器
+    yield """        <div class="tag-filter">
+            <h3 class="tag-filter-title">标签筛选</h3>
+            <div class="tag-cloud">"""
+
+    # 添加标签，只显示配置中的标签
+    for tag in tags:
+        yield f'                <div class="tag-item" data-tag="{tag["id"]}">{tag["name"]}</div>'
+
+    yield """            </div>
+            <div class="tag-filter-actions">
+                <button class="tag-filter-button" id="clearTags">清除筛选</button>
+                <button class="tag-filter-button primary" id="applyTags">应用筛选</button>
+            </div>
+        </div>"""
+
+    # 添加分类导航
+    yield """        <div class="category-nav">
+            <div class="nav-arrows left">
+                <div class="nav-arrow-icon">◀</div>
+            </div>
+            <div class="category-nav-scroll">"""
 
-def validate_project_metadata(project_path, config):
-    """验证项目元数据是否完整"""
-    issues = []
+    # 按order排序分类
+    sorted_categories = sorted(categories, key=lambda x: x.get("order", 999))
 
-    # 检查必要字段
-    required_fields = ["title", "description", "status", "primary_category"]
-    for field in required_fields:
-        if field not in config:
-            issues.append(f"缺少必要字段 '{field}'")
+    # 添加"全部"分类
+    yield '                <div class="category-tab" data-category="all"><span class="category-icon">🔍</span>全部项目</div>'
 
-    # 检查index.html文件是否存在
-    index_path = os.path.join(project_path, "index.html")
-    if not os.path.exists(index_path):
-        issues.append(f"缺少 index.html 文件")
+    # 只显示有项目的分类
+    for category in sorted_categories:
+        category_id = category.get("id")
+        if category_id in projects_by_category and projects_by_category[category_id]:
+            icon = category.get("icon", "")
+            icon_html = f'<span class="category-icon">{icon}</span>' if icon else ''
+            # 紧凑模式下分类标题和描述由客户端从标签的数据属性中读取
+            data_attrs = ''
+            if compact:
+                data_attrs = f' data-title="{escape(category.get("name", "未命名"))}" data-description="{escape(category.get("description", ""))}"'
+            yield f'                <div class="category-tab" data-category="{category_id}"{data_attrs}>{icon_html}{category.get("name", "未命名")}</div>'
 
-    # 检查primary_category是否与实际目录匹配
-    if "primary_category" in config:
-        primary_category = config["primary_category"]
-        actual_category = os.path.basename(os.path.dirname(project_path))
-        if primary_category != actual_category:
-            issues.append(f"primary_category '{primary_category}' 与实际目录 '{actual_category}' 不匹配")
+    yield """            </div>
+            <div class="nav-arrows right">
+                <div class="nav-arrow-icon">▶</div>
+            </div>
+        </div>
+        <div class="content-area">"""
 
-    return issues
+    # 添加"全部"分类内容
+    title_id = ' id="categoryTitle"' if compact else ''
+    description_id = ' id="categoryDescription"' if compact else ''
+    yield f"""            <div class="category-content" id="content-all">
+                <h2 class="category-title"{title_id}>全部项目</h2>
+                <p class="category-description"{description_id}>所有创意网页玩具的完整集合</p>
+                <div class="toys-container">"""
+
+    # 对所有项目按order排序
+    all_projects.sort(key=lambda x: x[2])
+
+    # 生成每个项目的卡片
+    for project_path, config, _, primary_category in all_projects:
+        yield card_cache.render(project_path, config, primary_category)
+
+    yield """                </div>
+            </div>"""
+
+    # 生成每个分类的内容（紧凑模式下所有卡片只出现在"全部"区域中）
+    for category in sorted_categories:
+        if compact:
+            break
+        category_id = category.get("id")
+        if category_id in projects_by_category and projects_by_category[category_id]:
+            # 对每个分类中的项目按order排序
+            projects = sorted(projects_by_category[category_id], key=lambda x: x[2])
+
+            # 生成分类内容区域
+            yield f"""            <div class="category-content" id="content-{category_id}">
+                <h2 class="category-title">{category.get("name", "未命名")}</h2>
+                <p class="category-description">{category.get("description", "")}</p>
+                <div class="toys-container">"""
+
+            # 生成每个项目的卡片
+            for project_path, config, _, primary_category in projects:
+                yield card_cache.render(project_path, config, primary_category)
+
+            yield """                </div>
+            </div>"""
+
+    # HTML尾部
+    yield """        </div>
+        <footer>
+            <p class="copyright">""" + site_config.get("copyright", "© 2025 Little Shock 团队") + """</p>
+        </footer>
+    </div>
+
+""" + script_html + """
+</body>
+</html>"""
 
 if __name__ == "__main__":
     # 检查是否有--validate参数
@@ -816,38 +1029,16 @@ if __name__ == "__main__":
         # 仅验证项目元数据，不生成主页
         print("正在验证项目元数据...")
 
-        site_config = read_site_config()
-        if not site_config:
-            print("无法读取站点配置，验证中止")
-            sys.exit(1)
-
-        projects_root = "projects"
-        issues_found = False
-
-        for category_dir in os.listdir(projects_root):
-            category_path = os.path.join(projects_root, category_dir)
-            if os.path.isdir(category_path):
-                for project_dir in os.listdir(category_path):
-                    project_path = os.path.join(category_path, project_dir)
-                    if os.path.isdir(project_path):
-                        config = read_project_config(project_path)
-                        if config:
-                            issues = validate_project_metadata(project_path, config)
-                            if issues:
-                                print(f"项目 '{project_path}' 存在以下问题:")
-                                for issue in issues:
-                                    print(f"  - {issue}")
-                                issues_found = True
-                        else:
-                            print(f"警告: 项目 '{project_path}' 没有配置文件或配置文件无效")
-                            issues_found = True
-
-        if not issues_found:
-            print("验证完成: 所有项目元数据都符合要求")
-            sys.exit(0)
-        else:
-            print("验证完成: 发现一些问题，请修复后再生成主页")
-            sys.exit(1)
+        # 与 validate_projects.py 相同：按结构定义验证（带缓存），并检查跨项目问题
+        sys.exit(0 if validate_projects() else 1)
     else:
-        # 生成主页
-        generate_homepage()
+        # 生成主页（--incremental 启用卡片片段缓存，--compact 每个项目只输出一张卡片，
+        # --inline 把样式和脚本内联到页面中，--profile/--profile-trace/--profile-cprofile 剖析各阶段耗时）
+        try:
+            profile, trace_path, cprofile_path, args = profile_options_from_argv(sys.argv[1:])
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        with profile_session(profile, trace_path, cprofile_path):
+            generate_homepage(incremental="--incremental" in args, compact="--compact" in args,
+                              inline_assets="--inline" in args)
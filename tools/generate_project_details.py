@@ -4,12 +4,30 @@
 import os
 import json
 import re
+import sys
 import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import template_engine
+from project_catalog import get_catalog
+from utils import write_file_if_changed, AtomicFileWriter
+from profiling import (
+    Profiler, get_profiler, set_profiler, profile_session, add_profile_arguments
+)
+
 def read_site_config():
     """读取站点配置文件"""
-    # 首先尝试读取根目录的配置文件
+    # 首先尝试读取简化版配置文件
+    if os.path.exists('tools/site_config_simplified.json'):
+        try:
+            with open('tools/site_config_simplified.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取简化版站点配置文件时出错: {e}")
+
+    # 如果简化版不存在，尝试读取根目录的配置文件
     if os.path.exists('site_config.json'):
         try:
             with open('site_config.json', 'r', encoding='utf-8') as f:
@@ -54,76 +72,32 @@ def read_template():
     return None
 
 def render_template(template, context):
-    """简单的模板渲染函数"""
-    # 替换基本变量
-    for key, value in context.items():
-        if isinstance(value, str):
-            template = template.replace(f"{{{{{key}}}}}", value)
-    
-    # 处理条件语句 {{#var}}content{{/var}}
-    for key, value in context.items():
-        if isinstance(value, bool):
-            if value:
-                # 如果条件为真，移除标记但保留内容
-                template = re.sub(r'\{\{#' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}', r'\1', template, flags=re.DOTALL)
-                # 移除否定条件的内容
-                template = re.sub(r'\{\{\^' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}', '', template, flags=re.DOTALL)
-            else:
-                # 如果条件为假，移除标记和内容
-                template = re.sub(r'\{\{#' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}', '', template, flags=re.DOTALL)
-                # 保留否定条件的内容
-                template = re.sub(r'\{\{\^' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}', r'\1', template, flags=re.DOTALL)
-    
-    # 处理列表 {{#items}}{{.}}{{/items}}
-    for key, value in context.items():
-        if isinstance(value, list) and value:
-            # 找到列表模板
-            list_pattern = r'\{\{#' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}'
-            list_matches = re.findall(list_pattern, template, re.DOTALL)
-            
-            if list_matches:
-                list_template = list_matches[0]
-                # 为列表中的每个项目渲染模板
-                rendered_items = []
-                for item in value:
-                    if isinstance(item, dict):
-                        # 如果列表项是字典，递归渲染
-                        item_rendered = list_template
-                        for item_key, item_value in item.items():
-                            if isinstance(item_value, str):
-                                item_rendered = item_rendered.replace(f"{{{{{item_key}}}}}", item_value)
-                        rendered_items.append(item_rendered)
-                    else:
-                        # 如果列表项是简单值，替换 {{.}}
-                        rendered_items.append(list_template.replace("{{.}}", str(item)))
-                
-                # 替换整个列表模板
-                template = re.sub(list_pattern, ''.join(rendered_items), template, flags=re.DOTALL)
-            
-            # 处理列表长度条件
-            length_key = f"{key}.length"
-            if value:
-                template = re.sub(r'\{\{#' + length_key + r'\}\}(.*?)\{\{/' + length_key + r'\}\}', r'\1', template, flags=re.DOTALL)
-            else:
-                template = re.sub(r'\{\{#' + length_key + r'\}\}(.*?)\{\{/' + length_key + r'\}\}', '', template, flags=re.DOTALL)
-    
-    # 处理性能影响特殊情况
-    if 'compatibility' in context and 'performance_impact' in context['compatibility']:
-        impact = context['compatibility']['performance_impact']
-        context[f'compatibility.performance_impact_{impact}'] = True
-        
+    """简单的模板渲染函数
+
+    模板由 template_engine 预编译并缓存，渲染时只对模板做一次线性遍历，
+    嵌套字段（如 compatibility.*）和列表区块都在同一次遍历中处理。
+    """
+    # 处理性能影响特殊情况：展开为 compatibility.performance_impact_<级别> 布尔值
+    compatibility = context.get('compatibility')
+    if isinstance(compatibility, dict) and 'performance_impact' in compatibility:
+        impact = compatibility['performance_impact']
+        compatibility = dict(compatibility)
         for level in ['low', 'medium', 'high']:
-            if level == impact:
-                template = re.sub(r'\{\{#compatibility.performance_impact_' + level + r'\}\}(.*?)\{\{/compatibility.performance_impact_' + level + r'\}\}', r'\1', template, flags=re.DOTALL)
-            else:
-                template = re.sub(r'\{\{#compatibility.performance_impact_' + level + r'\}\}(.*?)\{\{/compatibility.performance_impact_' + level + r'\}\}', '', template, flags=re.DOTALL)
-    
-    return template
+            compatibility[f'performance_impact_{level}'] = level == impact
+        context = dict(context, compatibility=compatibility)
 
-def generate_project_detail(project_path, config, template):
-    """生成项目详情页"""
-    # 准备模板上下文
-    context = {
+    return template_engine.render(template, context)
+
+def build_detail_context(project_path, config):
+    """准备详情页模板上下文"""
+    # 作者信息可能是字典，也可能直接是作者名称字符串
+    author = config.get('author', {})
+    if isinstance(author, dict):
+        author_name = author.get('name', 'Little Shock Team')
+    else:
+        author_name = author or 'Little Shock Team'
+
+    return {
         'title': config.get('title', os.path.basename(project_path)),
         'description': config.get('description', ''),
         'version': config.get('version', '1.0.0'),
@@ -137,29 +111,81 @@ def generate_project_detail(project_path, config, template):
             'min_screen_width': 320,
             'performance_impact': 'medium'
         }),
-        'author_name': config.get('author', {}).get('name', 'Little Shock Team'),
+        'author_name': author_name,
         'features': config.get('features', []),
         'dependencies': config.get('dependencies', [])
     }
-    
+
+def write_project_detail(project_path, config, template):
+    """渲染并保存项目详情页
+
+    返回 "written"（已写入）、"skipped"（内容未变化，未写入）或 "failed"（出错）。
+    内容未变化时不重写文件，保留其修改时间，避免 Service Worker 缓存和 CDN ETag 失效。
+    """
+    profiler = get_profiler()
+
     # 渲染模板
-    rendered_html = render_template(template, context)
-    
+    try:
+        with profiler.span("render", project=project_path):
+            rendered_html = render_template(template, build_detail_context(project_path, config))
+    except Exception as e:
+        print(f"渲染项目详情页 {project_path} 时出错: {e}")
+        return "failed"
+
     # 保存到项目目录
     detail_path = os.path.join(project_path, 'project-details.html')
     try:
-        with open(detail_path, 'w', encoding='utf-8') as f:
-            f.write(rendered_html)
-        print(f"已生成项目详情页: {detail_path}")
-        return True
+        with profiler.span("write", project=project_path):
+            written = write_file_if_changed(detail_path, rendered_html)
+        if written:
+            print(f"已生成项目详情页: {detail_path}")
+            return "written"
+        return "skipped"
     except Exception as e:
         print(f"保存项目详情页时出错: {e}")
-        return False
+        return "failed"
+
+def generate_project_detail(project_path, config, template):
+    """生成项目详情页"""
+    return write_project_detail(project_path, config, template) != "failed"
+
+# 工作进程中的模板，由进程池初始化函数设置，避免每个任务都传输一次模板
+_worker_template = None
+
+def _init_worker(template, profile_origin=None):
+    """进程池初始化：保存模板并预编译
+
+    profile_origin 非空时主进程正在剖析，工作进程使用相同的时间原点记录事件。
+    """
+    global _worker_template
+    _worker_template = template
+    template_engine.compile_template(template)
+    if profile_origin is not None:
+        set_profiler(Profiler(profile_origin))
+
+def _write_project_detail_task(task):
+    """进程池任务：渲染并保存单个项目的详情页
+
+    剖析时返回 (状态, 本任务的剖析数据)，由主进程合并。
+    """
+    project_path, config = task
+    profiler = get_profiler()
+    if not profiler.enabled:
+        return write_project_detail(project_path, config, _worker_template)
 
-def process_all_projects():
-    """处理所有项目"""
+    profiler.reset()
+    status = write_project_detail(project_path, config, _worker_template)
+    return status, profiler.export()
+
+def process_all_projects(jobs=1, site_config=None):
+    """处理所有项目
+
+    jobs 大于 1 时使用进程池并发渲染详情页，jobs 为 0 时使用全部CPU核心。
+    site_config 为 None 时自行读取站点配置；构建流水线会传入已读取的配置。
+    """
     # 读取站点配置
-    site_config = read_site_config()
+    if site_config is None:
+        site_config = read_site_config()
     if not site_config:
         print("无法读取站点配置，生成中止")
         return
@@ -170,32 +196,46 @@ def process_all_projects():
         print("无法读取模板，生成中止")
         return
     
-    # 项目根目录
-    projects_root = "projects"
+    # 渲染、写入、跳过和失败计数
+    counts = {"rendered": 0, "written": 0, "skipped": 0, "failed": 0}
+    
+    # 收集所有项目（来自带缓存的项目目录，只重新解析变化过的 project.json）
+    tasks = []
+    for entry in get_catalog().entries(include_missing=True):
+        if entry["config"]:
+            tasks.append((entry["path"], entry["config"]))
+        else:
+            print(f"警告: 项目 {entry['path']} 没有配置文件或配置文件无效")
+            counts["failed"] += 1
     
-    # 成功和失败计数
-    success_count = 0
-    fail_count = 0
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
     
-    # 遍历分类目录
-    for category_dir in os.listdir(projects_root):
-        category_path = os.path.join(projects_root, category_dir)
-        if os.path.isdir(category_path):
-            # 遍历该分类下的所有项目
-            for project_dir in os.listdir(category_path):
-                project_path = os.path.join(category_path, project_dir)
-                if os.path.isdir(project_path):
-                    config = read_project_config(project_path)
-                    if config:
-                        if generate_project_detail(project_path, config, template):
-                            success_count += 1
-                        else:
-                            fail_count += 1
-                    else:
-                        print(f"警告: 项目 {project_path} 没有配置文件或配置文件无效")
-                        fail_count += 1
+    profiler = get_profiler()
+
+    if jobs > 1 and len(tasks) > 1:
+        # 按任务数把项目分块交给工作进程，减少进程间通信次数
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        profile_origin = profiler.origin_us if profiler.enabled else None
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(template, profile_origin)) as executor:
+            results = list(executor.map(_write_project_detail_task, tasks, chunksize=chunksize))
+        if profiler.enabled:
+            # 合并工作进程的剖析数据
+            for _, data in results:
+                profiler.merge(data)
+            results = [status for status, _ in results]
+    else:
+        results = [write_project_detail(path, config, template) for path, config in tasks]
+    
+    for status in results:
+        if status != "failed":
+            counts["rendered"] += 1
+        counts[status] += 1
     
-    print(f"处理完成! 成功: {success_count}, 失败: {fail_count}")
+    print(f"处理完成! 渲染: {counts['rendered']}, 写入: {counts['written']}, "
+          f"未变化跳过: {counts['skipped']}, 失败: {counts['failed']}")
+    return counts
 
 def update_project_links():
     """更新项目卡片，添加详情页链接"""
@@ -217,8 +257,8 @@ def update_project_links():
         
         updated_html = re.sub(pattern, add_details_link, html)
         
-        # 添加详情页链接的JavaScript
-        if '</body>' in updated_html:
+        # 添加详情页链接的JavaScript（已添加过时跳过，保证重复运行结果不变）
+        if '</body>' in updated_html and 'details-button' not in html:
             details_script = """
     <script>
         document.addEventListener('DOMContentLoaded', function() {
@@ -246,8 +286,8 @@ def update_project_links():
 """
             updated_html = updated_html.replace('</body>', details_script + '</body>')
             
-            # 添加详情按钮样式
-            if '</style>' in updated_html:
+            # 添加详情按钮样式（主页样式外置时没有内联 <style>，插入到 </head> 之前）
+            if '</style>' in updated_html or '</head>' in updated_html:
                 details_style = """
         .toy-card {
             position: relative;
@@ -280,19 +320,39 @@ def update_project_links():
             transform: translateY(-2px) !important;
         }
 """
-                updated_html = updated_html.replace('</style>', details_style + '</style>')
-        
-        # 保存更新后的HTML
-        with open('index.html', 'w', encoding='utf-8') as f:
-            f.write(updated_html)
+                if '</style>' in updated_html:
+                    updated_html = updated_html.replace('</style>', details_style + '</style>')
+                else:
+                    updated_html = updated_html.replace('</head>', f"    <style>{details_style}    </style>\n</head>")
         
-        print("已更新主页，添加项目详情页链接")
+        # 原子替换主页（内容未变化时跳过写入），避免静态服务器读到写了一半的文件
+        with AtomicFileWriter('index.html') as writer:
+            writer.write(updated_html)
+        if writer.changed:
+            print("已更新主页，添加项目详情页链接")
+        else:
+            print("主页已包含项目详情页链接，无需更新")
         return True
     except Exception as e:
         print(f"更新主页时出错: {e}")
         return False
 
-if __name__ == "__main__":
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='生成所有项目的详情页')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='并发渲染的进程数，0 表示使用全部CPU核心（默认: 1）')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.jobs < 0:
+        parser.error("--jobs 不能为负数")
+
     print("开始生成项目详情页...")
-    process_all_projects()
-    update_project_links()
+    with profile_session(args.profile, args.profile_trace, args.profile_cprofile):
+        process_all_projects(args.jobs)
+        update_project_links()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
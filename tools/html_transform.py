@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 批量改写引擎
+
+维护脚本（导航修复等）把对页面的修改注册为转换（Transform），引擎对每个 HTML 文件只读取一次，
+按顺序应用所有适用的转换，内容有变化时才原子地写回一次；文件按多进程并行处理。
+
+每个转换有名称和版本号，处理结果记录在清单（默认 tools/.cache/html_transforms.json）中:
+
+  {"version": 2, "root": "/path/to/repo", "saved_ns": ..., "files": {
+      "projects/a/b/index.html": {"hash": "<sha256>", "mtime_ns": ..., "size": ...,
+                                  "transforms": {"back-link-href": 1, ...}}}}
+
+文件的 stat 签名（mtime/size）与清单一致、且所有转换都已按当前版本应用过时，只需一次 stat，
+不读取文件；签名变化时读取文件，内容哈希仍与清单一致（例如只是 touch 过）的文件同样跳过已应用的
+转换。重复运行不会改写任何文件。修改转换的逻辑时递增其版本号，所有文件会按新版本重新处理；
+文件被手动修改后哈希变化，同样会重新处理。与 project_catalog.py 相同，在清单写入前后极短时间内
+修改的文件不信任 mtime。只检查（check_only）时不写入文件，但已满足所有转换的文件仍会记入清单，
+下一次检查直接跳过。
+
+转换函数接收 (content, page)，返回新的内容；page 为页面相对于根目录的路径（使用 /）。
+无法应用时抛出 TransformError，该转换不会记入清单，同一文件的其他转换照常应用。
+"""
+
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from project_catalog import CACHE_DIR, RACY_WINDOW_NS
+from utils import AtomicFileWriter
+
+# 清单格式版本，结构变化时递增以丢弃旧清单
+MANIFEST_VERSION = 2
+DEFAULT_MANIFEST_PATH = os.path.join(CACHE_DIR, "html_transforms.json")
+
+
+class TransformError(Exception):
+    """转换无法应用于页面"""
+
+
+class Transform:
+    """一个已注册的页面转换
+
+    name      名称，同时是清单中的键
+    version   版本号，转换逻辑变化时递增
+    apply     转换函数 (content, page) -> content
+    applies   判断页面是否适用 (page) -> bool，None 表示适用于所有页面
+    """
+
+    def __init__(self, name, version, apply, applies=None, description=""):
+        self.name = name
+        self.version = version
+        self.apply = apply
+        self.applies = applies
+        self.description = description
+
+    def applies_to(self, page):
+        return self.applies is None or self.applies(page)
+
+
+def insert_before_body_end(content, snippet):
+    """在最后一个 </body>（没有时为 </html>）之前插入一行，返回新的内容"""
+    for tag in ('</body>', '</html>'):
+        index = content.rfind(tag)
+        if index >= 0:
+            return f"{content[:index]}{snippet}\n{content[index:]}"
+    raise TransformError("找不到 </body> 或 </html> 标签，请手动添加")
+
+
+def relative_url(page, target):
+    """从页面到根目录下 target 的相对 URL，例如 projects/a/b/index.html -> ../../../js/x.js"""
+    return os.path.relpath(target, os.path.dirname(page) or ".").replace(os.sep, "/")
+
+
+def _process_file(task):
+    """对单个文件应用转换（进程池任务）
+
+    返回 {"page", "hash", "mtime_ns", "size", "applied", "changed_by", "errors", "changed", "skipped"}。
+    """
+    path, page, transforms, recorded, check_only = task
+    result = {"page": page, "hash": None, "mtime_ns": None, "size": None, "applied": {},
+              "changed_by": [], "errors": [], "changed": False, "skipped": False}
+    try:
+        with open(path, 'rb') as f:
+            # 读取前的签名：读取期间文件被修改时，下次运行签名不一致，会重新读取
+            st = os.fstat(f.fileno())
+            data = f.read()
+    except OSError as e:
+        result["errors"].append(f"读取失败: {e}")
+        return result
+
+    digest = hashlib.sha256(data).hexdigest()
+    done = recorded.get("transforms", {}) if recorded.get("hash") == digest else {}
+    pending = [t for t in transforms if done.get(t.name) != t.version]
+    result["hash"] = digest
+    result["mtime_ns"] = st.st_mtime_ns
+    result["size"] = st.st_size
+    result["applied"] = dict(done)
+    if not pending:
+        result["skipped"] = True
+        return result
+
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        result["errors"].append(f"不是 UTF-8 文件: {e}")
+        return result
+
+    for transform in pending:
+        try:
+            updated = transform.apply(content, page)
+        except TransformError as e:
+            result["errors"].append(f"{transform.name}: {e}")
+            continue
+        if updated != content:
+            result["changed_by"].append(transform.name)
+            content = updated
+        result["applied"][transform.name] = transform.version
+
+    if result["changed_by"]:
+        result["changed"] = True
+        # 内容变化后，本次没有运行的转换需要重新确认
+        names = {t.name for t in transforms}
+        result["applied"] = {name: version for name, version in result["applied"].items() if name in names}
+        if not check_only:
+            with AtomicFileWriter(path, fsync=False) as writer:
+                writer.write(content)
+            st = os.stat(path)
+            result["hash"] = hashlib.sha256(content.encode('utf-8')).hexdigest()
+            result["mtime_ns"] = st.st_mtime_ns
+            result["size"] = st.st_size
+    return result
+
+
+class TransformEngine:
+    """按清单增量地对一组 HTML 文件应用转换"""
+
+    def __init__(self, transforms, root_dir=".", manifest_path=DEFAULT_MANIFEST_PATH, jobs=1):
+        self.transforms = list(transforms)
+        self.root_dir = os.path.abspath(root_dir)
+        self.manifest_path = manifest_path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.files = {}
+        self._saved_ns = 0
+        # 最近一次运行的统计（stat_hits 为只凭 stat 签名跳过、没有读取的文件数）
+        self.stats = {"files": 0, "skipped": 0, "stat_hits": 0, "changed": 0, "failed": 0}
+
+    def load_manifest(self):
+        """读取清单，版本或根目录不一致时丢弃"""
+        self.files = {}
+        self._saved_ns = 0
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"读取转换清单时出错，将重新处理所有文件: {e}")
+            return
+        if data.get("version") == MANIFEST_VERSION and data.get("root") == self.root_dir:
+            self.files = data.get("files", {})
+            self._saved_ns = data.get("saved_ns", 0)
+
+    def save_manifest(self):
+        """写入清单（删除已不存在的文件的记录）"""
+        if not self.manifest_path:
+            return
+        self.files = {page: entry for page, entry in self.files.items()
+                      if os.path.exists(os.path.join(self.root_dir, page))}
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        data = {"version": MANIFEST_VERSION, "root": self.root_dir, "saved_ns": time.time_ns(),
+                "files": self.files}
+        with AtomicFileWriter(self.manifest_path, fsync=False) as writer:
+            writer.write(json.dumps(data, ensure_ascii=False, indent=1, sort_keys=True))
+
+    def _is_fresh(self, recorded, st, transforms):
+        """stat 签名与清单一致且所有转换都已应用时，无需读取文件"""
+        if recorded.get("mtime_ns") != st.st_mtime_ns or recorded.get("size") != st.st_size:
+            return False
+        # 在清单写入前后极短时间内修改的文件，mtime 不足以区分，需要重新读取
+        if st.st_mtime_ns >= self._saved_ns - RACY_WINDOW_NS:
+            return False
+        done = recorded.get("transforms", {})
+        return all(done.get(t.name) == t.version for t in transforms)
+
+    def page_name(self, path):
+        """文件相对于根目录的路径（使用 /）"""
+        return os.path.relpath(os.path.abspath(path), self.root_dir).replace(os.sep, "/")
+
+    def run(self, paths, check_only=False):
+        """对文件应用转换，返回每个文件的处理结果（只检查时不写入文件）"""
+        self.load_manifest()
+        tasks = []
+        cached = []
+        for path in paths:
+            page = self.page_name(path)
+            transforms = [t for t in self.transforms if t.applies_to(page)]
+            if not transforms:
+                continue
+            full_path = os.path.join(self.root_dir, page)
+            recorded = self.files.get(page, {})
+            try:
+                fresh = self._is_fresh(recorded, os.stat(full_path), transforms)
+            except OSError:
+                fresh = False
+            if fresh:
+                cached.append({"page": page, "hash": recorded["hash"], "mtime_ns": recorded["mtime_ns"],
+                               "size": recorded["size"], "applied": recorded["transforms"], "changed_by": [],
+                               "errors": [], "changed": False, "skipped": True})
+                continue
+            tasks.append((full_path, page, transforms, recorded, check_only))
+
+        if self.jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                results = list(executor.map(_process_file, tasks, chunksize=8))
+        else:
+            results = [_process_file(task) for task in tasks]
+
+        self.stats = {"files": len(results) + len(cached), "skipped": len(cached), "stat_hits": len(cached),
+                      "changed": 0, "failed": 0}
+        for result in results:
+            self.stats["skipped"] += result["skipped"]
+            self.stats["changed"] += result["changed"]
+            self.stats["failed"] += bool(result["errors"])
+            # 只检查时，需要修改的文件的转换并没有写入，不能记入清单
+            if result["hash"] and not (check_only and result["changed"]):
+                self.files[result["page"]] = {key: result[key] for key in ("hash", "mtime_ns", "size")}
+                self.files[result["page"]]["transforms"] = result["applied"]
+        if results:
+            self.save_manifest()
+        return sorted(results + cached, key=lambda result: result["page"])
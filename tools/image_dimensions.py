@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片尺寸和懒加载属性
+
+在发布目录（默认 dist/，见 site_dist.py）的 HTML 中为 <img> 补充属性:
+  - width/height  从本地图片的文件头读取固有尺寸（PNG、JPEG、GIF、WebP、BMP、SVG），
+                  不解码整张图片，也不需要 Pillow；浏览器据此在图片加载前预留位置，避免布局偏移
+  - decoding="async"
+  - loading="lazy"  只用于首屏以下的图片：每个页面的前几张图片（默认 2 张）视为首屏内容，
+                    保持立即加载；带 id 的图片通常由脚本读取或替换，也不延迟加载
+
+已有的属性不会被修改；只写了 width 或 height 之一的图片不补充尺寸。
+补充了尺寸的页面在 <head> 开头加入零优先级的 :where(img[width][height]) { height: auto } 规则，
+只用 CSS 设置宽度的图片仍按比例缩放，页面自己的样式总是优先。
+src 为空、由脚本绑定（Vue 的 :src 等）或为 data: URL 的图片不处理；
+远程图片无法读取尺寸，在报告中列出。
+
+用法:
+  python tools/image_dimensions.py               # 镜像站点到 dist/ 并补充属性
+  python tools/image_dimensions.py --no-mirror   # 直接处理发布目录
+  python tools/image_dimensions.py --eager 1     # 每个页面只有第一张图片立即加载
+"""
+
+import os
+import re
+import sys
+import struct
+import argparse
+from urllib.parse import unquote
+
+from site_dist import DIST_DIR, mirror_site, iter_dist_files
+from utils import write_file_if_changed
+
+# 每个页面中保持立即加载的前几张图片
+DEFAULT_EAGER_IMAGES = 2
+
+# 补充了尺寸的页面加入的样式（:where() 的优先级为 0，页面样式总是优先）
+HEIGHT_AUTO_STYLE = '<style data-image-dimensions>:where(img[width][height]){height:auto}</style>'
+
+IMG_PATTERN = re.compile(r'<img\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.IGNORECASE)
+# <script>、<style>、<template> 和注释中的 <img> 不是页面元素
+SKIPPED_REGION_PATTERN = re.compile(
+    r'<!--.*?-->|<(script|style|template)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL
+)
+# 属性名包含 Vue/Alpine 等框架使用的 : 和 @，避免把 :src 当作 src
+ATTRIBUTE_PATTERN = re.compile(r'([^\s"\'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+)))?')
+HEAD_PATTERN = re.compile(r'<head\b[^>]*>', re.IGNORECASE)
+SVG_TAG_PATTERN = re.compile(r'<svg\b[^>]*>', re.IGNORECASE | re.DOTALL)
+SVG_LENGTH_PATTERN = re.compile(r'^\s*([\d.]+)\s*(px)?\s*$')
+
+# JPEG 中带图片尺寸的 SOF 标记（排除 DHT、JPG、DAC）
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# EXIF 方向为 5-8 时图片旋转了 90 度，显示尺寸宽高互换
+JPEG_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _jpeg_orientation(segment):
+    """从 APP1 EXIF 段读取方向，没有时返回 None"""
+    if not segment.startswith(b'Exif\0\0'):
+        return None
+    tiff = segment[6:]
+    if tiff[:2] == b'II':
+        order = '<'
+    elif tiff[:2] == b'MM':
+        order = '>'
+    else:
+        return None
+    try:
+        offset = struct.unpack(f'{order}I', tiff[4:8])[0]
+        count = struct.unpack(f'{order}H', tiff[offset:offset + 2])[0]
+        for index in range(count):
+            entry = offset + 2 + index * 12
+            tag = struct.unpack(f'{order}H', tiff[entry:entry + 2])[0]
+            if tag == 0x0112:
+                return struct.unpack(f'{order}H', tiff[entry + 8:entry + 10])[0]
+    except struct.error:
+        pass
+    return None
+
+
+def _jpeg_size(f):
+    f.seek(2)
+    orientation = None
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            if orientation in JPEG_ROTATED_ORIENTATIONS:
+                return height, width
+            return width, height
+        if marker == 0xE1 and orientation is None:
+            orientation = _jpeg_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def _webp_size(header):
+    chunk = header[12:16]
+    if chunk == b'VP8 ' and len(header) >= 30:
+        width, height = struct.unpack('<HH', header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(header) >= 25:
+        bits = struct.unpack('<I', header[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(header) >= 30:
+        width = int.from_bytes(header[24:27], 'little') + 1
+        height = int.from_bytes(header[27:30], 'little') + 1
+        return width, height
+    return None
+
+
+def _svg_size(f):
+    """SVG 根元素的 width/height（只接受 px 或无单位），否则使用 viewBox"""
+    text = f.read(64 * 1024).decode('utf-8', errors='replace')
+    match = SVG_TAG_PATTERN.search(text)
+    if not match:
+        return None
+    attrs = {name.lower(): next((v for v in values if v), "")
+             for name, *values in ATTRIBUTE_PATTERN.findall(match.group(0)[4:-1])}
+    lengths = [SVG_LENGTH_PATTERN.match(attrs.get(name, "")) for name in ("width", "height")]
+    if all(lengths):
+        return tuple(round(float(length.group(1))) for length in lengths)
+    try:
+        _, _, width, height = (float(v) for v in re.split(r'[\s,]+', attrs.get("viewbox", "").strip()))
+    except ValueError:
+        return None
+    return round(width), round(height)
+
+
+def read_image_size(path):
+    """从文件头读取图片的 (宽, 高)，无法识别时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(32)
+            if header.startswith(b'\x89PNG\r\n\x1a\n') and header[12:16] == b'IHDR':
+                size = struct.unpack('>II', header[16:24])
+            elif header[:6] in (b'GIF87a', b'GIF89a'):
+                size = struct.unpack('<HH', header[6:10])
+            elif header.startswith(b'\xff\xd8'):
+                size = _jpeg_size(f)
+            elif header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+                size = _webp_size(header)
+            elif header.startswith(b'BM') and len(header) >= 26:
+                width, height = struct.unpack('<ii', header[18:26])
+                size = (width, abs(height))
+            elif path.lower().endswith('.svg'):
+                f.seek(0)
+                size = _svg_size(f)
+            else:
+                size = None
+    except (OSError, struct.error):
+        return None
+    if not size or min(size) <= 0:
+        return None
+    return tuple(size)
+
+
+def parse_attributes(tag):
+    """解析 <img ...> 的属性，返回 {小写名称: 值}"""
+    attrs = {}
+    for match in ATTRIBUTE_PATTERN.finditer(tag[4:-1].rstrip('/')):
+        value = next((v for v in match.group(2, 3, 4) if v is not None), "")
+        attrs.setdefault(match.group(1).lower(), value)
+    return attrs
+
+
+def _resolve_image(document_path, url):
+    """把 src 解析为发布目录中的路径；远程图片返回 "remote"，不处理的引用返回 None"""
+    url = url.strip()
+    if url.startswith(('http:', 'https:', '//')):
+        return "remote"
+    if not url or url.startswith(('data:', 'blob:', '/', '#', '{', '$')):
+        return None
+    path = unquote(url.split('#')[0].split('?')[0])
+    return os.path.normpath(os.path.join(os.path.dirname(document_path), path))
+
+
+def annotate_images(html, document_path, eager=DEFAULT_EAGER_IMAGES, sizes=None):
+    """补充页面中 <img> 的尺寸、decoding 和 loading 属性
+
+    返回 (新的 HTML, {"sized", "lazy", "remote": [url], "missing": [url]})。
+    sizes 为 {图片路径: (宽, 高) 或 None} 的缓存，可在多个页面之间共享。
+    """
+    sizes = {} if sizes is None else sizes
+    stats = {"sized": 0, "lazy": 0, "remote": [], "missing": []}
+    skipped = [(m.start(), m.end()) for m in SKIPPED_REGION_PATTERN.finditer(html)]
+    position = [0]
+
+    def replace(match):
+        if any(start <= match.start() < end for start, end in skipped):
+            return match.group(0)
+        tag = match.group(0)
+        attrs = parse_attributes(tag)
+        position[0] += 1
+        additions = []
+
+        target = _resolve_image(document_path, attrs.get("src", ""))
+        if target == "remote":
+            if "width" not in attrs and "height" not in attrs:
+                stats["remote"].append(attrs["src"])
+        elif target and "width" not in attrs and "height" not in attrs:
+            if target not in sizes:
+                sizes[target] = read_image_size(target) if os.path.isfile(target) else None
+            size = sizes[target]
+            if size:
+                additions.append(f'width="{size[0]}" height="{size[1]}"')
+                stats["sized"] += 1
+            else:
+                stats["missing"].append(attrs["src"])
+        if target is None:
+            # 由脚本设置 src 的图片保持原样
+            return tag
+
+        if "decoding" not in attrs:
+            additions.append('decoding="async"')
+        if ("loading" not in attrs and "id" not in attrs and "fetchpriority" not in attrs
+                and position[0] > eager):
+            additions.append('loading="lazy"')
+            stats["lazy"] += 1
+        if not additions:
+            return tag
+        if tag.endswith('/>'):
+            return f"{tag[:-2].rstrip()} {' '.join(additions)} />"
+        return f"{tag[:-1].rstrip()} {' '.join(additions)}>"
+
+    updated = IMG_PATTERN.sub(replace, html)
+    if stats["sized"] and HEIGHT_AUTO_STYLE not in updated:
+        head = HEAD_PATTERN.search(updated)
+        if head:
+            updated = f"{updated[:head.end()]}\n{HEIGHT_AUTO_STYLE}{updated[head.end():]}"
+        else:
+            updated = f"{HEIGHT_AUTO_STYLE}\n{updated}"
+    return updated, stats
+
+
+def annotate_dist(dist_dir=DIST_DIR, eager=DEFAULT_EAGER_IMAGES, mirror=True):
+    """处理发布目录中的所有 HTML，返回是否成功"""
+    if mirror:
+        stats = mirror_site(dist_dir)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+
+    sizes = {}
+    pages = 0
+    rewritten = 0
+    sized = 0
+    lazy = 0
+    remote = []
+    missing = []
+    for path in iter_dist_files(dist_dir, ('.html', '.htm')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"读取文件 {path} 时出错: {e}")
+            continue
+        pages += 1
+        updated, stats = annotate_images(content, path, eager, sizes)
+        if updated != content and write_file_if_changed(path, updated):
+            rewritten += 1
+        sized += stats["sized"]
+        lazy += stats["lazy"]
+        remote += [(path, url) for url in stats["remote"]]
+        missing += [(path, url) for url in stats["missing"]]
+
+    if remote:
+        print(f"无法读取尺寸的远程图片 ({len(remote)}):")
+        for path, url in remote:
+            print(f"  {path}: {url[:100]}")
+    if missing:
+        print(f"找不到或无法识别的本地图片 ({len(missing)}):")
+        for path, url in missing:
+            print(f"  {path}: {url}")
+    print(f"处理完成! 页面: {pages}, 改写: {rewritten}, 补充尺寸: {sized}, 延迟加载: {lazy}, "
+          f"远程图片: {len(remote)}, 缺失: {len(missing)}")
+    return True
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='为发布目录中的 <img> 补充尺寸、decoding 和 loading 属性')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--eager', type=int, default=DEFAULT_EAGER_IMAGES,
+                        help=f'每个页面中立即加载的前几张图片（默认: {DEFAULT_EAGER_IMAGES}）')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    args = parser.parse_args()
+
+    if args.eager < 0:
+        parser.error("--eager 不能为负数")
+    return 0 if annotate_dist(args.output, args.eager, mirror=not args.no_mirror) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
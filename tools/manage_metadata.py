@@ -42,7 +42,7 @@ def list_projects_by_category():
     # 按分类组织项目
     projects_by_category = defaultdict(list)
     for project in projects:
-        config, _ = load_project_config(project["path"])
+        config = project["config"]
         if config:
             primary_category = config.get("primary_category", project["category_dir"])
             projects_by_category[primary_category].append(project["name"])
@@ -149,7 +149,7 @@ def collect_all_tags():
     
     # 收集标签
     for project in projects:
-        config, _ = load_project_config(project["path"])
+        config = project["config"]
         if not config:
             continue
         
@@ -7,6 +7,11 @@ import sys
 import re
 from datetime import datetime
 
+from project_catalog import get_catalog
+from precache_manifest import update_precache_manifest
+from page_weight import estimate_performance_impact
+from metadata_transaction import MetadataTransaction
+
 def load_project_config(project_path):
     """加载项目配置"""
     config_path = os.path.join(project_path, "project.json")
@@ -20,17 +25,6 @@ def load_project_config(project_path):
         print(f"项目配置文件不存在: {config_path}")
     return None, None
 
-def save_project_config(config, config_path):
-    """保存项目配置"""
-    try:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=4)
-        print(f"项目配置已保存到 {config_path}")
-        return True
-    except Exception as e:
-        print(f"保存项目配置文件时出错: {e}")
-        return False
-
 def find_project_directory(project_name):
     """查找项目目录的完整路径"""
     projects_root = "projects"
@@ -53,46 +47,58 @@ def find_project_directory(project_name):
     
     return None
 
-def update_version(project_name, new_version, changes=None):
-    """更新项目版本"""
+def update_version(project_name, new_version, changes=None, transaction=None):
+    """更新项目版本
+
+    传入 transaction 时只把修改加入事务，由调用方统一提交；否则立即写回 project.json。
+    """
     # 查找项目目录
     project_path = find_project_directory(project_name)
     if not project_path:
         print(f"找不到项目: {project_name}")
         return False
-    
-    # 加载项目配置
-    config, config_path = load_project_config(project_path)
-    if not config:
+
+    config_path = os.path.join(project_path, "project.json")
+    if not os.path.exists(config_path):
+        print(f"项目配置文件不存在: {config_path}")
         return False
-    
+
     # 获取当前日期
     today = datetime.now().strftime("%Y-%m-%d")
-    
-    # 更新版本信息
-    old_version = config.get("version", "0.1.0")
-    config["version"] = new_version
-    config["last_updated"] = today
-    
-    # 初始化更新日志
-    if "changelog" not in config:
-        config["changelog"] = []
-    
-    # 添加新的更新日志条目
-    changelog_entry = {
-        "version": new_version,
-        "date": today,
-        "changes": changes if changes else ["版本更新"]
-    }
-    
-    # 将新的更新日志条目添加到列表开头
-    config["changelog"].insert(0, changelog_entry)
-    
-    # 保存配置
-    if save_project_config(config, config_path):
+
+    def edit(config):
+        # 更新版本信息
+        old_version = config.get("version", "0.1.0")
+        config["version"] = new_version
+        config["last_updated"] = today
+
+        # 初始化更新日志
+        if "changelog" not in config:
+            config["changelog"] = []
+
+        # 添加新的更新日志条目
+        changelog_entry = {
+            "version": new_version,
+            "date": today,
+            "changes": changes if changes else ["版本更新"]
+        }
+
+        # 将新的更新日志条目添加到列表开头
+        config["changelog"].insert(0, changelog_entry)
         print(f"项目 {project_name} 版本已从 {old_version} 更新到 {new_version}")
+
+    if transaction is not None:
+        transaction.add(config_path, edit, f"更新版本到 {new_version}")
         return True
-    return False
+
+    # 单独调用时立即提交
+    standalone = MetadataTransaction()
+    standalone.add(config_path, edit, f"更新版本到 {new_version}")
+    result = standalone.commit()[0]
+    if result["error"]:
+        return False
+    print(f"项目配置已保存到 {config_path}")
+    return True
 
 def update_service_worker_version(project_path, new_version):
     """更新Service Worker中的版本号"""
@@ -109,7 +115,7 @@ def update_service_worker_version(project_path, new_version):
                 with open(sw_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                 
-                # 查找并更新缓存名称中的版本号
+                # 查找并更新缓存名称中的版本号（预缓存按文件 revision 更新，CACHE_NAME 只影响运行时缓存）
                 version_pattern = r"(const\s+CACHE_NAME\s*=\s*['\"])([^'\"]+)(['\"])"
                 if re.search(version_pattern, content):
                     # 提取缓存名称前缀
@@ -125,6 +131,7 @@ def update_service_worker_version(project_path, new_version):
                         f.write(updated_content)
                     
                     print(f"已更新Service Worker缓存版本: {sw_path}")
+                    update_precache_manifest(project_path)
                     return True
             except Exception as e:
                 print(f"更新Service Worker时出错: {e}")
@@ -144,23 +151,18 @@ def list_projects():
     print(f"{'项目名称':<30} {'版本':<10} {'状态':<10} {'最后更新':<12}")
     print("-" * 60)
     
-    # 遍历所有分类目录
-    for category_dir in os.listdir(projects_root):
-        category_path = os.path.join(projects_root, category_dir)
-        if os.path.isdir(category_path):
-            # 遍历该分类下的所有项目
-            for project_dir in os.listdir(category_path):
-                project_path = os.path.join(category_path, project_dir)
-                if os.path.isdir(project_path):
-                    # 读取项目配置
-                    config, _ = load_project_config(project_path)
-                    if config:
-                        title = config.get("title", project_dir)
-                        version = config.get("version", "未知")
-                        status = config.get("status", "未知")
-                        last_updated = config.get("last_updated", "未知")
-                        
-                        print(f"{title:<30} {version:<10} {status:<10} {last_updated:<12}")
+    # 遍历所有项目（来自带缓存的项目目录，只重新解析变化过的 project.json）
+    for entry in get_catalog(projects_root).entries():
+        config = entry["config"]
+        if config:
+            title = config.get("title", entry["name"])
+            version = config.get("version", "未知")
+            status = config.get("status", "未知")
+            last_updated = config.get("last_updated", "未知")
+            
+            print(f"{title:<30} {version:<10} {status:<10} {last_updated:<12}")
+        else:
+            print(f"读取项目配置文件时出错: {entry['error']}")
     
     print("=" * 60)
 
@@ -211,51 +213,61 @@ def show_project_info(project_name):
     
     print("=" * 60)
 
-def initialize_version_info(project_name):
-    """初始化项目版本信息"""
+def initialize_version_info(project_name, transaction=None):
+    """初始化项目版本信息
+
+    传入 transaction 时只把修改加入事务，由调用方统一提交；否则立即写回 project.json。
+    """
     # 查找项目目录
     project_path = find_project_directory(project_name)
     if not project_path:
         print(f"找不到项目: {project_name}")
         return False
-    
-    # 加载项目配置
-    config, config_path = load_project_config(project_path)
-    if not config:
+
+    config_path = os.path.join(project_path, "project.json")
+    if not os.path.exists(config_path):
+        print(f"项目配置文件不存在: {config_path}")
         return False
-    
+
     # 获取当前日期
     today = datetime.now().strftime("%Y-%m-%d")
-    
-    # 初始化版本信息
-    if "version" not in config:
-        config["version"] = "1.0.0"
-    
-    if "last_updated" not in config:
-        config["last_updated"] = today
-    
-    # 初始化更新日志
-    if "changelog" not in config:
-        config["changelog"] = [{
-            "version": config["version"],
-            "date": config["last_updated"],
-            "changes": ["初始版本"]
-        }]
-    
-    # 初始化兼容性信息
-    if "compatibility" not in config:
-        config["compatibility"] = {
-            "mobile": True,
-            "desktop": True,
-            "min_screen_width": 320,
-            "performance_impact": "medium"
-        }
-    
-    # 保存配置
-    if save_project_config(config, config_path):
-        print(f"已初始化项目 {project_name} 的版本信息")
+
+    def edit(config):
+        # 初始化版本信息
+        if "version" not in config:
+            config["version"] = "1.0.0"
+
+        if "last_updated" not in config:
+            config["last_updated"] = today
+
+        # 初始化更新日志
+        if "changelog" not in config:
+            config["changelog"] = [{
+                "version": config["version"],
+                "date": config["last_updated"],
+                "changes": ["初始版本"]
+            }]
+
+        # 初始化兼容性信息（性能影响由页面体积分析推导）
+        if "compatibility" not in config:
+            config["compatibility"] = {
+                "mobile": True,
+                "desktop": True,
+                "min_screen_width": 320,
+                "performance_impact": estimate_performance_impact(project_path)
+            }
+
+    if transaction is not None:
+        transaction.add(config_path, edit, "初始化版本信息")
         return True
-    return False
+
+    # 单独调用时立即提交
+    standalone = MetadataTransaction()
+    standalone.add(config_path, edit, "初始化版本信息")
+    if standalone.commit()[0]["error"]:
+        return False
+    print(f"已初始化项目 {project_name} 的版本信息")
+    return True
 
 def initialize_all_projects():
     """初始化所有项目的版本信息"""
@@ -268,34 +280,35 @@ def initialize_all_projects():
     success_count = 0
     fail_count = 0
     
-    # 遍历所有分类目录
-    for category_dir in os.listdir(projects_root):
-        category_path = os.path.join(projects_root, category_dir)
-        if os.path.isdir(category_path):
-            # 遍历该分类下的所有项目
-            for project_dir in os.listdir(category_path):
-                project_path = os.path.join(category_path, project_dir)
-                if os.path.isdir(project_path):
-                    # 读取项目配置
-                    config, config_path = load_project_config(project_path)
-                    if config:
-                        # 检查是否需要初始化版本信息
-                        needs_init = (
-                            "version" not in config or
-                            "last_updated" not in config or
-                            "changelog" not in config or
-                            "compatibility" not in config
-                        )
-                        
-                        if needs_init:
-                            print(f"初始化项目: {project_dir}")
-                            if initialize_version_info(project_dir):
-                                success_count += 1
-                            else:
-                                fail_count += 1
-                        else:
-                            print(f"项目已有版本信息: {project_dir}")
-                            success_count += 1
+    # 所有修改加入同一个事务，每个 project.json 只读写一次
+    transaction = MetadataTransaction()
+
+    # 遍历所有项目（来自带缓存的项目目录，只重新解析变化过的 project.json）
+    for entry in get_catalog(projects_root).entries():
+        project_dir = entry["name"]
+        config = entry["config"]
+        if config:
+            # 检查是否需要初始化版本信息
+            needs_init = (
+                "version" not in config or
+                "last_updated" not in config or
+                "changelog" not in config or
+                "compatibility" not in config
+            )
+            
+            if needs_init:
+                print(f"初始化项目: {project_dir}")
+                if not initialize_version_info(project_dir, transaction=transaction):
+                    fail_count += 1
+            else:
+                print(f"项目已有版本信息: {project_dir}")
+                success_count += 1
+
+    for result in transaction.commit():
+        if result["error"]:
+            fail_count += 1
+        else:
+            success_count += 1
     
     print(f"\n初始化完成! 成功: {success_count}, 失败: {fail_count}")
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+project.json 批量事务
+
+版本管理、元信息补全、作者信息更新、项目移动等操作原本各自读取、修改并重写 project.json，
+批量维护时同一个文件会被读写多次。MetadataTransaction 先收集各个操作对各文件的修改（edit），
+提交时每个文件只读取一次，按加入顺序依次应用所有修改，按 project_schema.py 的结构定义验证结果后原子地写回；
+序列化结果与读取到的内容相同时不写入，保留文件的修改时间。
+
+修改函数接收解析后的配置（dict），可以原地修改，也可以返回新的配置；抛出异常或引入了验证问题
+（文件原有的问题不计）时该文件的所有修改都会被放弃，原文件保持不变，其他文件照常提交。
+
+用法:
+    with MetadataTransaction() as transaction:
+        update_version("光绘", "1.2.0", ["修复问题"], transaction=transaction)
+        update_project_metadata(project_path, transaction=transaction)
+    # 退出 with 块时提交；也可以手动调用 transaction.commit()
+"""
+
+import os
+import re
+import json
+from collections import Counter
+
+from profiling import get_profiler
+from project_schema import validate_config as validate_schema, format_problem
+from utils import AtomicFileWriter
+
+
+def serialize_config(config):
+    """按仓库统一的格式序列化项目配置（与 utils.save_project_config 相同）"""
+    return json.dumps(config, ensure_ascii=False, indent=4)
+
+
+def validate_config(config):
+    """按 project_schema.py 的结构定义检查项目配置，返回错误列表
+
+    缺少必要字段只是警告（由 validate_projects.py 报告），不阻止提交。
+    """
+    return [format_problem(problem) for problem in validate_schema(config) if problem["level"] == "error"]
+
+
+def _new_problems(before, after):
+    """修改新引入的问题（忽略数组下标，插入更新日志条目不会使已有问题变成新问题）"""
+    def normalize(problem):
+        return re.sub(r"\[\d+\]", "[]", problem)
+
+    remaining = Counter(normalize(problem) for problem in before)
+    problems = []
+    for problem in after:
+        key = normalize(problem)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            problems.append(problem)
+    return problems
+
+
+class MetadataTransaction:
+    """收集对多个 project.json 的修改，提交时每个文件读取一次、最多写入一次
+
+    提交后 results 保存每个文件的处理结果:
+      {"path", "config", "changed", "error", "descriptions"}
+    config 为提交后的配置（出错时为 None），descriptions 为已应用的修改说明。
+    """
+
+    def __init__(self, validate=validate_config, fsync=True):
+        self.validate = validate
+        self.fsync = fsync
+        self.results = {}
+        self.stats = {"files": 0, "changed": 0, "unchanged": 0, "failed": 0}
+        self._pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # with 块内出错时放弃所有修改
+        if exc_type is None:
+            self.commit()
+        else:
+            self._pending = {}
+        return False
+
+    def add(self, config_path, edit, description=""):
+        """为 config_path 加入一个修改，提交时按加入顺序应用"""
+        key = os.path.abspath(config_path)
+        if key not in self._pending:
+            self._pending[key] = {"path": config_path, "edits": []}
+        self._pending[key]["edits"].append((edit, description))
+
+    def __len__(self):
+        return sum(len(item["edits"]) for item in self._pending.values())
+
+    def result(self, config_path):
+        """提交后某个文件的处理结果，没有修改过该文件时为 None"""
+        return self.results.get(os.path.abspath(config_path))
+
+    def _commit_file(self, path, edits):
+        """读取、修改、验证并写回一个文件"""
+        profiler = get_profiler()
+        result = {"path": path, "config": None, "changed": False, "error": None, "descriptions": []}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            profiler.count_read(path, len(content.encode('utf-8')))
+            config = json.loads(content)
+        except Exception as e:
+            result["error"] = f"读取项目配置文件时出错: {e}"
+            return result
+
+        before = serialize_config(config)
+        # 已有文件中的历史问题不阻止提交，只拒绝修改新引入的问题
+        existing = self.validate(config) if self.validate else []
+        for edit, description in edits:
+            try:
+                updated = edit(config)
+            except Exception as e:
+                result["error"] = f"{description or '修改'}失败: {e}"
+                return result
+            if updated is not None:
+                config = updated
+            if description:
+                result["descriptions"].append(description)
+
+        problems = _new_problems(existing, self.validate(config)) if self.validate else []
+        if problems:
+            result["error"] = "修改后的配置无效: " + "; ".join(problems)
+            return result
+
+        after = serialize_config(config)
+        result["config"] = config
+        if after == before:
+            profiler.count_unchanged(path)
+            return result
+        try:
+            with profiler.span("write", project=os.path.dirname(path)):
+                with AtomicFileWriter(path, fsync=self.fsync) as writer:
+                    writer.write(after)
+        except OSError as e:
+            result["config"] = None
+            result["error"] = f"保存项目配置文件时出错: {e}"
+            return result
+        result["changed"] = writer.changed
+        return result
+
+    def commit(self):
+        """应用所有修改，返回本次处理的结果列表（按加入顺序）"""
+        pending, self._pending = self._pending, {}
+        committed = []
+        for key, item in pending.items():
+            result = self._commit_file(item["path"], item["edits"])
+            self.results[key] = result
+            committed.append(result)
+            self.stats["files"] += 1
+            if result["error"]:
+                self.stats["failed"] += 1
+                print(f"错误: {item['path']}: {result['error']}")
+            elif result["changed"]:
+                self.stats["changed"] += 1
+            else:
+                self.stats["unchanged"] += 1
+        return committed
+
+    def summary(self):
+        """一行统计信息"""
+        stats = self.stats
+        return f"处理 {stats['files']} 个文件, 写入 {stats['changed']} 个, 未变化 {stats['unchanged']} 个, 失败 {stats['failed']} 个"
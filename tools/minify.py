@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+纯 Python 的 HTML/CSS/JS/JSON 压缩
+
+只做不改变语义的保守压缩，不依赖第三方库:
+  - JS   去掉注释（保留 /*! 和 @license 注释）、缩进和行内多余空白；保留换行，
+         不依赖自动分号插入规则的分析。字符串、模板字符串和正则表达式原样保留
+  - CSS  去掉注释、合并空白、删除 { } ; , > 和冒号后的空白以及块末尾的分号
+  - HTML 删除注释（保留条件注释），合并标签之间和文本中的空白，压缩内联的 <script>/<style>；
+         <pre>、<textarea> 和非 JS 类型的 <script>（着色器、模板等）原样保留，标签本身不改动
+  - JSON 去掉缩进和空白
+
+无法可靠解析的输入（例如未闭合的字符串）原样返回。
+"""
+
+import os
+import re
+import json
+
+# 压缩规则变化时递增，使按内容哈希缓存的压缩结果失效
+MINIFIER_VERSION = 1
+
+# 按扩展名选择压缩方式
+MINIFY_EXTENSIONS = {
+    ".html": "html",
+    ".htm": "html",
+    ".css": "css",
+    ".js": "js",
+    ".mjs": "js",
+    ".json": "json",
+    ".webmanifest": "json",
+}
+
+# JS 中正则表达式可以跟在这些关键字之后（其余标识符之后的 / 是除号）
+_REGEX_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+    "case", "do", "else", "yield", "await",
+}
+
+_HORIZONTAL_SPACE = ' \t\r\f\v\u00a0\ufeff'
+
+
+class _ParseError(ValueError):
+    """输入无法可靠解析"""
+
+
+def _is_word_char(c):
+    return c.isalnum() or c in '_$\\' or ord(c) > 127
+
+
+def _scan_string(source, i):
+    """扫描从 i 开始的引号字符串，返回结束位置"""
+    quote = source[i]
+    j = i + 1
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == quote:
+            return j + 1
+        if c == '\n':
+            break
+        j += 1
+    raise _ParseError("字符串未闭合")
+
+
+def _scan_template(source, i):
+    """扫描从 i 开始的模板字符串（含嵌套的 ${...}），返回结束位置"""
+    j = i + 1
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+        elif c == '`':
+            return j + 1
+        elif source.startswith('${', j):
+            j = _scan_braces(source, j + 2)
+        else:
+            j += 1
+    raise _ParseError("模板字符串未闭合")
+
+
+def _scan_braces(source, j):
+    """扫描模板字符串中 ${ 之后的表达式，返回匹配的 } 之后的位置"""
+    depth = 1
+    while j < len(source):
+        c = source[j]
+        if c in '"\'':
+            j = _scan_string(source, j)
+            continue
+        if c == '`':
+            j = _scan_template(source, j)
+            continue
+        if source.startswith('/*', j):
+            end = source.find('*/', j + 2)
+            if end < 0:
+                break
+            j = end + 2
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    raise _ParseError("模板表达式未闭合")
+
+
+def _scan_regex(source, i):
+    """扫描从 i 开始的正则表达式字面量（含标志），返回结束位置"""
+    j = i + 1
+    in_class = False
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            break
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            j += 1
+            while j < len(source) and _is_word_char(source[j]):
+                j += 1
+            return j
+        j += 1
+    raise _ParseError("正则表达式未闭合")
+
+
+def _regex_allowed(last_token):
+    """根据上一个记号判断 / 是否开始一个正则表达式"""
+    if not last_token:
+        return True
+    if _is_word_char(last_token[-1]):
+        return last_token in _REGEX_KEYWORDS
+    if last_token[0] in '"\'`' or (last_token[0] == '/' and len(last_token) > 1):
+        return False
+    return last_token not in (')', ']', '}')
+
+
+def _needs_space(previous, following):
+    """删除两个记号之间的空白后是否会改变含义"""
+    a, b = previous[-1], following[0]
+    if _is_word_char(a) and _is_word_char(b):
+        return True
+    if a in '+-' and b in '+-':
+        return True
+    if a == '/' or b == '/':
+        return True
+    # 1 .toString() 不能写成 1.toString()
+    return a.isdigit() and b == '.'
+
+
+def _minify_js(source):
+    out = []
+    last_token = ''
+    pending_space = False
+    pending_newline = False
+    i = 0
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c in _HORIZONTAL_SPACE:
+            pending_space = True
+            i += 1
+            continue
+        if c in '\n\u2028\u2029':
+            pending_newline = True
+            i += 1
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end < 0:
+                raise _ParseError("注释未闭合")
+            token = source[i:end + 2]
+            if not (token.startswith('/*!') or '@license' in token or '@preserve' in token):
+                if '\n' in token:
+                    pending_newline = True
+                else:
+                    pending_space = True
+                i = end + 2
+                continue
+        elif c in '"\'':
+            token = source[i:_scan_string(source, i)]
+        elif c == '`':
+            token = source[i:_scan_template(source, i)]
+        elif c == '/' and _regex_allowed(last_token):
+            token = source[i:_scan_regex(source, i)]
+        elif _is_word_char(c):
+            j = i + 1
+            while j < n and _is_word_char(source[j]):
+                j += 1
+            token = source[i:j]
+        else:
+            token = c
+
+        if out:
+            if pending_newline:
+                out.append('\n')
+            elif pending_space and _needs_space(out[-1], token):
+                out.append(' ')
+        out.append(token)
+        i += len(token)
+        pending_space = pending_newline = False
+        if not token.startswith('/*'):
+            last_token = token
+    return ''.join(out) + ('\n' if out else '')
+
+
+def minify_js(source):
+    """压缩 JS，无法解析时原样返回"""
+    try:
+        return _minify_js(source)
+    except _ParseError:
+        return source
+
+
+_CSS_TOKEN_PATTERN = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|/\*.*?\*/', re.DOTALL)
+_CSS_SPACE_PATTERN = re.compile(r'\s+')
+_CSS_PUNCTUATION_PATTERN = re.compile(r' ?([{};,>]) ?')
+_CSS_COLON_PATTERN = re.compile(r': ')
+_CSS_EMPTY_DECLARATION_PATTERN = re.compile(r';+}')
+
+
+def _minify_css_code(code):
+    code = _CSS_SPACE_PATTERN.sub(' ', code)
+    code = _CSS_PUNCTUATION_PATTERN.sub(r'\1', code)
+    code = _CSS_COLON_PATTERN.sub(':', code)
+    return _CSS_EMPTY_DECLARATION_PATTERN.sub('}', code)
+
+
+def minify_css(source):
+    """压缩 CSS"""
+    # 字符串和保留的注释原样输出；删除的注释并入两侧的代码一起压缩
+    parts = []
+    code = ''
+    position = 0
+    for match in _CSS_TOKEN_PATTERN.finditer(source):
+        code += source[position:match.start()]
+        token = match.group(0)
+        if token.startswith('/*') and not token.startswith('/*!'):
+            code += ' '
+        else:
+            parts.append(_minify_css_code(code))
+            parts.append(token)
+            code = ''
+        position = match.end()
+    parts.append(_minify_css_code(code + source[position:]))
+    return ''.join(parts).strip() + '\n'
+
+
+def minify_json(source):
+    """压缩 JSON，无法解析时原样返回"""
+    try:
+        return json.dumps(json.loads(source), ensure_ascii=False, separators=(',', ':'))
+    except ValueError:
+        return source
+
+
+_HTML_TOKEN_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style|pre|textarea)\b[^>]*>.*?</\1\s*>'
+    r'|<[A-Za-z!/?][^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*>',
+    re.IGNORECASE | re.DOTALL
+)
+_HTML_SPACE_PATTERN = re.compile(r'\s+')
+_RAW_ELEMENT_PATTERN = re.compile(r'(<(\w+)\b([^>]*)>)(.*?)(</\2\s*>)$', re.IGNORECASE | re.DOTALL)
+_TYPE_PATTERN = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+_JS_TYPES = {"", "text/javascript", "application/javascript", "module"}
+_JSON_TYPES = {"application/json", "application/ld+json", "importmap"}
+
+
+def _collapse_text(text):
+    return _HTML_SPACE_PATTERN.sub(lambda m: '\n' if '\n' in m.group(0) else ' ', text)
+
+
+def _minify_raw_element(element):
+    match = _RAW_ELEMENT_PATTERN.match(element)
+    if not match:
+        return element
+    start_tag, name, attributes, content, end_tag = match.groups()
+    name = name.lower()
+    if name == "style":
+        content = minify_css(content).strip()
+    elif name == "script" and content.strip():
+        type_match = _TYPE_PATTERN.search(attributes)
+        script_type = type_match.group(1).lower() if type_match else ""
+        if script_type in _JS_TYPES:
+            content = minify_js(content).strip()
+        elif script_type in _JSON_TYPES:
+            content = minify_json(content)
+    return f"{start_tag}{content}{end_tag}"
+
+
+def minify_html(source):
+    """压缩 HTML"""
+    parts = []
+    position = 0
+    for match in _HTML_TOKEN_PATTERN.finditer(source):
+        parts.append(_collapse_text(source[position:match.start()]))
+        token = match.group(0)
+        if token.startswith('<!--'):
+            # 保留条件注释
+            if token.startswith('<!--[if'):
+                parts.append(token)
+        elif match.group(1):
+            parts.append(_minify_raw_element(token))
+        else:
+            parts.append(token)
+        position = match.end()
+    parts.append(_collapse_text(source[position:]))
+    return ''.join(parts).strip() + '\n'
+
+
+MINIFIERS = {
+    "html": minify_html,
+    "css": minify_css,
+    "js": minify_js,
+    "json": minify_json,
+}
+
+
+def minify(path, content):
+    """按文件扩展名压缩内容，不支持的类型原样返回"""
+    kind = MINIFY_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    return MINIFIERS[kind](content) if kind else content
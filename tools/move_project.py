@@ -7,6 +7,8 @@ import sys
 import shutil
 import argparse
 
+from metadata_transaction import MetadataTransaction
+
 def read_site_config():
     """读取站点配置文件"""
     if os.path.exists('tools/site_config_simplified.json'):
@@ -18,27 +20,23 @@ def read_site_config():
             return None
     return None
 
-def move_project(source_path, target_category):
-    """将项目移动到新分类，并更新元数据"""
+def move_project(source_path, target_category, transaction=None):
+    """将项目移动到新分类，并更新元数据
+
+    先移动目录，再修改移动后的 project.json。传入 transaction 时元数据修改加入事务，
+    由调用方统一提交；否则立即写回。
+    """
     if not os.path.isdir(source_path):
         print(f"错误: 源项目路径 '{source_path}' 不存在或不是目录")
         return False
     
-    # 读取项目元数据
-    json_path = os.path.join(source_path, "project.json")
-    if not os.path.exists(json_path):
+    # 检查项目元数据
+    if not os.path.exists(os.path.join(source_path, "project.json")):
         print(f"错误: 项目 '{source_path}' 缺少 project.json 文件")
         return False
     
-    try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            project_data = json.load(f)
-    except Exception as e:
-        print(f"错误: 读取项目元数据时出错: {e}")
-        return False
-    
     # 获取项目名称
-    project_dir = os.path.basename(source_path)
+    project_dir = os.path.basename(os.path.normpath(source_path))
     
     # 创建目标路径
     target_path = os.path.join("projects", target_category, project_dir)
@@ -48,25 +46,6 @@ def move_project(source_path, target_category):
         print(f"错误: 目标路径 '{target_path}' 已存在")
         return False
     
-    # 更新项目元数据
-    old_category = project_data.get("primary_category", "")
-    project_data["primary_category"] = target_category
-    
-    # 如果旧分类不为空且不等于新分类，将其添加到次要分类中
-    if old_category and old_category != target_category:
-        secondary_categories = project_data.get("secondary_categories", [])
-        if old_category not in secondary_categories:
-            secondary_categories.append(old_category)
-            project_data["secondary_categories"] = secondary_categories
-    
-    # 保存更新后的元数据
-    try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(project_data, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        print(f"错误: 保存项目元数据时出错: {e}")
-        return False
-    
     # 移动项目文件
     try:
         # 创建目标目录
@@ -74,13 +53,36 @@ def move_project(source_path, target_category):
         
         # 移动项目
         shutil.move(source_path, target_path)
-        
         print(f"项目已成功移动到 '{target_path}'")
-        print(f"项目元数据已更新，primary_category 从 '{old_category}' 更改为 '{target_category}'")
-        return True
     except Exception as e:
         print(f"错误: 移动项目时出错: {e}")
         return False
+    
+    def edit(project_data):
+        # 更新项目元数据
+        old_category = project_data.get("primary_category", "")
+        project_data["primary_category"] = target_category
+        
+        # 如果旧分类不为空且不等于新分类，将其添加到次要分类中
+        if old_category and old_category != target_category:
+            secondary_categories = project_data.get("secondary_categories", [])
+            if old_category not in secondary_categories:
+                secondary_categories.append(old_category)
+                project_data["secondary_categories"] = secondary_categories
+        print(f"项目元数据已更新，primary_category 从 '{old_category}' 更改为 '{target_category}'")
+    
+    json_path = os.path.join(target_path, "project.json")
+    if transaction is not None:
+        transaction.add(json_path, edit, f"移动到分类 {target_category}")
+        return True
+    
+    # 单独调用时立即提交
+    standalone = MetadataTransaction()
+    standalone.add(json_path, edit, f"移动到分类 {target_category}")
+    if standalone.commit()[0]["error"]:
+        print(f"错误: 项目已移动，但元数据没有更新，请手动修改 '{json_path}'")
+        return False
+    return True
 
 def main():
     parser = argparse.ArgumentParser(description='将项目移动到新分类')
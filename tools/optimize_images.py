@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片优化
+
+在发布目录（默认 dist/，见 site_dist.py）中查找项目使用的位图（PNG/JPEG），
+按若干宽度生成 WebP（以及可选的 AVIF）版本，并改写发布目录中的引用:
+  - HTML 中的 <img> 包裹为 <picture>，按格式提供 <source srcset>，原图作为回退
+  - CSS（以及 HTML 内联样式）中的 background-image: url(...) 之后追加 image-set() 声明，
+    不支持 image-set 的浏览器继续使用原图
+
+生成的图片按源文件内容哈希缓存在 tools/.cache/images/ 中，源图片不变时直接复用，不重新编码。
+需要 Pillow（pip install Pillow）；AVIF 需要 Pillow 支持 AVIF 编码（Pillow 11.3+ 或 pillow-avif-plugin）。
+
+用法:
+  python tools/optimize_images.py                    # 镜像站点到 dist/ 并优化图片
+  python tools/optimize_images.py --avif             # 同时生成 AVIF
+  python tools/optimize_images.py --widths 640 1280  # 自定义宽度
+  python tools/optimize_images.py --jobs 4           # 使用4个进程编码
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote, unquote
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+from fingerprint_assets import FINGERPRINTED_PATTERN
+from project_catalog import CACHE_DIR
+from site_dist import DIST_DIR, mirror_site, iter_dist_files, file_sha256
+from utils import write_file_if_changed
+
+# 需要优化的位图格式
+RASTER_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# 默认生成的宽度（不会超过原图宽度，原图宽度本身总会生成一份）
+DEFAULT_WIDTHS = [480, 960, 1600]
+
+# 小于该大小的图片（图标等）不做处理
+DEFAULT_MIN_BYTES = 20 * 1024
+
+# 编码质量
+QUALITY = {"webp": 80, "avif": 55}
+
+# 各格式的 MIME 类型，<source> 按此顺序输出（越靠前越优先）
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+FALLBACK_MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+
+# 编码结果缓存目录
+IMAGE_CACHE_DIR = os.path.join(CACHE_DIR, "images")
+
+# 引用改写
+IMG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+PICTURE_PATTERN = re.compile(r'<picture\b.*?</picture>', re.IGNORECASE | re.DOTALL)
+SRC_PATTERN = re.compile(r'\bsrc\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+SIZES_PATTERN = re.compile(r'\bsizes\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+CSS_BACKGROUND_PATTERN = re.compile(
+    r'(?P<indent>[ \t]*)background-image\s*:\s*url\(\s*(?P<quote>["\']?)(?P<url>[^"\')]+)(?P=quote)\s*\)'
+    r'\s*(?P<important>!important)?\s*;'
+)
+IMAGE_SET_PATTERN = re.compile(r'\s*background-image\s*:\s*image-set\(', re.IGNORECASE)
+
+
+def avif_supported():
+    """当前 Pillow 是否支持 AVIF 编码"""
+    try:
+        return bool(features.check("avif"))
+    except Exception:
+        return ".avif" in Image.registered_extensions()
+
+
+def variant_path(source, width, fmt):
+    """生成图片在发布目录中的路径，例如 木鱼.png -> 木鱼-480w.webp"""
+    stem = os.path.splitext(source)[0]
+    return f"{stem}-{width}w.{fmt}"
+
+
+def _cache_path(source_hash, width, fmt):
+    return os.path.join(IMAGE_CACHE_DIR, source_hash[:2], f"{source_hash}-{width}-q{QUALITY[fmt]}.{fmt}")
+
+
+def _load_meta(source_hash):
+    """读取缓存的原图尺寸"""
+    meta_path = os.path.join(IMAGE_CACHE_DIR, source_hash[:2], f"{source_hash}.json")
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cache_file(path, data):
+    """写入缓存文件（先写临时文件再替换）"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _encode(image, width, fmt):
+    """把图片缩放到指定宽度并编码"""
+    if width < image.width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=QUALITY[fmt])
+    return buffer.getvalue()
+
+
+def optimize_image(task):
+    """生成单张图片的各个版本（进程池任务）
+
+    返回 {"source", "width", "height", "variants": {格式: [(宽度, 路径), ...]}, "encoded", "error"}。
+    """
+    source, widths, formats = task
+    result = {"source": source, "variants": {}, "encoded": 0, "error": None}
+    try:
+        source_hash = file_sha256(source)
+        meta = _load_meta(source_hash)
+        image = None
+        if meta is None:
+            with Image.open(source) as opened:
+                meta = {"width": opened.width, "height": opened.height}
+            _save_cache_file(
+                os.path.join(IMAGE_CACHE_DIR, source_hash[:2], f"{source_hash}.json"),
+                json.dumps(meta).encode('utf-8')
+            )
+        result["width"] = meta["width"]
+        result["height"] = meta["height"]
+
+        target_widths = sorted({w for w in widths if w < meta["width"]} | {meta["width"]})
+        for fmt in formats:
+            variants = []
+            for width in target_widths:
+                cache_path = _cache_path(source_hash, width, fmt)
+                if not os.path.exists(cache_path):
+                    if image is None:
+                        image = Image.open(source)
+                        image.load()
+                        # 保留透明通道，其余模式统一转换为 RGB
+                        if image.mode not in ("RGB", "RGBA"):
+                            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+                    _save_cache_file(cache_path, _encode(image, width, fmt))
+                    result["encoded"] += 1
+                target = variant_path(source, width, fmt)
+                shutil.copyfile(cache_path, target)
+                variants.append((width, target))
+
+            # 原尺寸的新格式并不比原图小时（例如已经高度压缩的小图），不使用该格式
+            if variants and os.path.getsize(variants[-1][1]) >= os.path.getsize(source):
+                for _, target in variants:
+                    os.remove(target)
+                continue
+            result["variants"][fmt] = variants
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def _resolve_reference(document_path, url):
+    """把文档中的相对引用解析为发布目录中的路径，外部链接和绝对路径返回 None"""
+    if url.startswith(('http:', 'https:', '//', 'data:', '/', '#')):
+        return None
+    path = unquote(url.split('#')[0].split('?')[0])
+    return os.path.normpath(os.path.join(os.path.dirname(document_path), path))
+
+
+def _variant_url(url, variant):
+    """按原引用的目录部分拼出生成图片的 URL"""
+    base = url.rsplit('/', 1)[0] + '/' if '/' in url else ''
+    return base + quote(os.path.basename(variant))
+
+
+def rewrite_img_tags(html, document_path, optimized):
+    """把引用了已优化图片的 <img> 包裹为 <picture>（已在 <picture> 中的不处理）"""
+    pictures = [(m.start(), m.end()) for m in PICTURE_PATTERN.finditer(html)]
+
+    def replace(match):
+        if any(start <= match.start() < end for start, end in pictures):
+            return match.group(0)
+        src_match = SRC_PATTERN.search(match.group(0))
+        if not src_match:
+            return match.group(0)
+        url = src_match.group(2)
+        info = optimized.get(_resolve_reference(document_path, url))
+        if not info:
+            return match.group(0)
+
+        sizes_match = SIZES_PATTERN.search(match.group(0))
+        sizes = sizes_match.group(2) if sizes_match else "100vw"
+        sources = []
+        for fmt in MIME_TYPES:
+            if fmt in info["variants"]:
+                srcset = ", ".join(f"{_variant_url(url, path)} {width}w" for width, path in info["variants"][fmt])
+                sources.append(f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset}" sizes="{sizes}">')
+        # display: contents 使 <picture> 不产生布局盒子，<img> 在 flex/grid 布局中的表现保持不变
+        return f'<picture style="display: contents">{"".join(sources)}{match.group(0)}</picture>'
+
+    return IMG_PATTERN.sub(replace, html)
+
+
+def rewrite_css_backgrounds(css, document_path, optimized):
+    """在引用了已优化图片的 background-image 声明后追加 image-set() 声明"""
+
+    def replace(match):
+        url = match.group("url").strip()
+        info = optimized.get(_resolve_reference(document_path, url))
+        if not info or IMAGE_SET_PATTERN.match(css, match.end()):
+            return match.group(0)
+
+        candidates = []
+        for fmt in MIME_TYPES:
+            if fmt in info["variants"]:
+                _, path = info["variants"][fmt][-1]
+                candidates.append(f'url("{_variant_url(url, path)}") type("{MIME_TYPES[fmt]}")')
+        fallback_type = FALLBACK_MIME_TYPES[os.path.splitext(info["source"])[1].lower()]
+        candidates.append(f'url("{url}") type("{fallback_type}")')
+        important = " !important" if match.group("important") else ""
+        return f'{match.group(0)}\n{match.group("indent")}background-image: image-set({", ".join(candidates)}){important};'
+
+    return CSS_BACKGROUND_PATTERN.sub(replace, css)
+
+
+def rewrite_references(dist_dir, optimized):
+    """改写发布目录中 HTML 和 CSS 对已优化图片的引用，返回改写的文件数"""
+    rewritten = 0
+    for path in iter_dist_files(dist_dir, ('.html', '.css')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"读取文件 {path} 时出错: {e}")
+            continue
+
+        updated = rewrite_css_backgrounds(content, path, optimized)
+        if path.lower().endswith('.html'):
+            updated = rewrite_img_tags(updated, path, optimized)
+        if updated != content and write_file_if_changed(path, updated):
+            rewritten += 1
+    return rewritten
+
+
+def find_images(dist_dir, min_bytes):
+    """查找发布目录中需要优化的位图"""
+    images = []
+    seen_stems = set()
+    for path in iter_dist_files(os.path.join(dist_dir, "projects"), RASTER_EXTENSIONS):
+        # 上次发布留下的指纹副本（fingerprint_assets.py 生成）不是源图片，重新编码只会生成多余的文件
+        if FINGERPRINTED_PATTERN.search(os.path.basename(path)):
+            continue
+        if os.path.getsize(path) < min_bytes:
+            continue
+        # 同一目录下同名不同扩展名的图片会生成相同的文件名，只处理第一张
+        stem = os.path.splitext(path)[0]
+        if stem in seen_stems:
+            print(f"警告: {path} 与同名图片的生成文件冲突，跳过")
+            continue
+        seen_stems.add(stem)
+        images.append(path)
+    return images
+
+
+def optimize_images(dist_dir=DIST_DIR, widths=None, formats=("webp",), jobs=1,
+                    min_bytes=DEFAULT_MIN_BYTES, mirror=True):
+    """优化发布目录中的图片并改写引用，返回是否成功"""
+    if Image is None:
+        print("图片优化需要 Pillow，请先安装: pip install Pillow")
+        return False
+    if "avif" in formats and not avif_supported():
+        print("当前 Pillow 不支持 AVIF 编码，只生成 WebP")
+        formats = tuple(fmt for fmt in formats if fmt != "avif")
+
+    if mirror:
+        stats = mirror_site(dist_dir)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+
+    images = find_images(dist_dir, min_bytes)
+    tasks = [(path, widths or DEFAULT_WIDTHS, formats) for path in images]
+
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(optimize_image, tasks))
+    else:
+        results = [optimize_image(task) for task in tasks]
+
+    optimized = {}
+    original_bytes = 0
+    optimized_bytes = 0
+    encoded = 0
+    failed = 0
+    for result in results:
+        if result["error"]:
+            print(f"处理图片 {result['source']} 时出错: {result['error']}")
+            failed += 1
+            continue
+        encoded += result["encoded"]
+        if not result["variants"]:
+            continue
+        optimized[os.path.normpath(result["source"])] = result
+        size = os.path.getsize(result["source"])
+        best = min(os.path.getsize(variants[-1][1]) for variants in result["variants"].values())
+        original_bytes += size
+        optimized_bytes += best
+        print(f"  {result['source']}: {size / 1024:.0f} KB -> {best / 1024:.0f} KB "
+              f"({', '.join(result['variants'])}, {len(next(iter(result['variants'].values())))} 种宽度)")
+
+    rewritten = rewrite_references(dist_dir, optimized)
+
+    print(f"处理完成! 图片: {len(images)}, 已优化: {len(optimized)}, 新编码: {encoded}, 失败: {failed}, "
+          f"改写引用的文件: {rewritten}")
+    if original_bytes:
+        print(f"原图共 {original_bytes / 1024:.0f} KB，优化后（原尺寸）共 {optimized_bytes / 1024:.0f} KB，"
+              f"减少 {(1 - optimized_bytes / original_bytes) * 100:.0f}%")
+    return failed == 0
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='生成 WebP/AVIF 图片并改写发布目录中的引用')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--widths', type=int, nargs='+',
+                        help=f"生成的宽度（默认: {' '.join(map(str, DEFAULT_WIDTHS))}）")
+    parser.add_argument('--avif', action='store_true', help='同时生成 AVIF')
+    parser.add_argument('--min-size', type=int, default=DEFAULT_MIN_BYTES // 1024,
+                        help=f'小于该大小（KB）的图片不处理（默认: {DEFAULT_MIN_BYTES // 1024}）')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='并发编码的进程数，0 表示使用全部CPU核心（默认: 1）')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    args = parser.parse_args()
+
+    if args.jobs < 0:
+        parser.error("--jobs 不能为负数")
+    if args.widths and min(args.widths) <= 0:
+        parser.error("--widths 必须为正数")
+
+    formats = ("avif", "webp") if args.avif else ("webp",)
+    ok = optimize_images(args.output, args.widths, formats, args.jobs,
+                         args.min_size * 1024, mirror=not args.no_mirror)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目页面体积预算
+
+分析每个项目的首页（index.html）加载时的开销:
+  - 传输字节数：页面及其引用的本地文件（含 CSS url()、JS 中的资源路径，按引用关系递归），
+    以及外部资源（CDN 库、Google Fonts）按 KNOWN_TRANSFER_SIZES 估算的压缩后大小
+  - 请求数、最大的几个文件
+  - <head> 中阻塞渲染的脚本（没有 async/defer 的外链脚本）
+  - 重量级 API：WebGL、getImageData、shadowBlur（只扫描项目自己的代码，不扫描库文件）
+
+根据这些数据推导 compatibility.performance_impact（low/medium/high），使用 --write 写回
+project.json（只改动这一个字段的文本，文件其余部分的格式保持不变），详情页和主页显示的就是
+实际测得的性能影响。超出预算的项目会被列出，并以非零退出码结束，可以直接用于 CI。
+
+传输量只包含能静态找到引用的文件。脚本按运行时拼接的路径加载的资源（例如按用户选择加载的
+纹理）无法被发现；资源目录（ASSET_DIRS）中没有被引用的文件会在报告中单独列出，不计入传输量
+和性能影响。
+
+用法:
+  python tools/page_weight.py                         # 报告所有项目并检查预算
+  python tools/page_weight.py <项目路径>               # 只分析单个项目
+  python tools/page_weight.py --write                 # 把推导出的 performance_impact 写回 project.json
+  python tools/page_weight.py --budget-kb 800 --json page-weight.json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from fnmatch import fnmatch
+from urllib.parse import unquote, urlsplit, parse_qs
+
+from fingerprint_assets import ProjectFingerprinter
+from project_catalog import get_catalog
+from metadata_transaction import MetadataTransaction
+from utils import load_project_config, AtomicFileWriter
+from vendor_libraries import parse_cdn_url
+
+# 外部资源的估算传输大小（压缩后，字节）。键为 "库名/文件路径" 的通配模式（库名见 vendor_libraries.NAME_ALIASES）
+# 或主机名，按顺序匹配第一个
+KNOWN_TRANSFER_SIZES = [
+    ("three/examples/*", 6000),
+    ("three/*three.min.js", 155000),
+    ("three/*three.module.js", 160000),
+    ("p5/*/p5.sound.min.js", 60000),
+    ("p5/p5.min.js", 260000),
+    ("p5/p5.js", 900000),
+    ("tone/Tone.js", 95000),
+    ("gsap/gsap.min.js", 28000),
+    ("gif.js/*", 6000),
+    ("font-awesome/*.css", 100000),   # 含默认加载的图标字体
+    ("animate.css/*", 5000),
+    ("tailwindcss/*", 110000),
+    ("vue/dist/vue.global.js", 130000),
+    ("vue/dist/vue.global.prod.js", 50000),
+    ("cdn.tailwindcss.com", 110000),
+]
+
+# Google Fonts：样式表本身很小，字体文件按字体族和字重数量估算
+GOOGLE_FONTS_CSS_SIZE = 1500
+CJK_FONT_SIZE = 150000      # 中文字体每个字重（按需加载的分片）
+LATIN_FONT_SIZE = 20000     # 西文字体每个字重
+CJK_FONT_PATTERN = re.compile(r'\b(SC|TC|JP|KR|HK)\b|Ma Shan Zheng|ZCOOL|Zhi Mang Xing|Long Cang', re.IGNORECASE)
+
+# 报告中列出的最大文件数
+TOP_ASSETS = 3
+
+# 默认预算
+DEFAULT_BUDGET_KB = 1500
+DEFAULT_MAX_REQUESTS = 40
+DEFAULT_MAX_BLOCKING = 3
+
+# 重量级 API
+HEAVY_APIS = {
+    "webgl": re.compile(r'getContext\(\s*[\'"](?:webgl2?|experimental-webgl)[\'"]|\bWebGL(?:1|2)?Renderer\b|\bWEBGL\b'),
+    "getImageData": re.compile(r'\.getImageData\s*\('),
+    "shadowBlur": re.compile(r'\.shadowBlur\s*='),
+}
+
+# 第三方库文件不参与重量级 API 检测（库里总会出现这些名字）
+LIBRARY_FILE_PATTERN = re.compile(r'(^|/)(lib|libs|vendor)/|\.min\.js$')
+
+# 性能影响评分：传输量和重量级 API 各自加分，按总分分级
+IMPACT_BYTE_STEPS = [(1024 * 1024, 2), (300 * 1024, 1)]
+IMPACT_API_SCORES = {"webgl": 2, "getImageData": 1, "shadowBlur": 1}
+IMPACT_LEVELS = [(4, "high"), (2, "medium"), (0, "low")]
+
+SCRIPT_TAG_PATTERN = re.compile(r'<script\b([^>]*)>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+LINK_TAG_PATTERN = re.compile(r'<link\b([^>]*)>', re.IGNORECASE)
+ATTR_PATTERN = re.compile(r'([\w-]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+HEAD_END_PATTERN = re.compile(r'</head\s*>|<body\b', re.IGNORECASE)
+
+# 不会在页面加载时请求的文件
+NON_PAGE_NAMES = {"service-worker.js", "sw.js"}
+
+# 项目中存放资源的顶层目录，其中没有被静态引用的文件可能由脚本动态加载
+ASSET_DIRS = ("assets", "images", "img", "textures", "audio", "sounds", "media", "models", "fonts")
+
+# --write 时在原文件中定位 performance_impact 的值，或 compatibility 对象的第一个字段
+IMPACT_VALUE_PATTERN = re.compile(r'("performance_impact"\s*:\s*)"[^"\\]*"')
+COMPATIBILITY_PATTERN = re.compile(r'("compatibility"\s*:\s*\{)(\s*)(?=")')
+
+
+def parse_attributes(text):
+    """解析标签属性，返回 {名称: 值}（没有值的属性为空字符串）"""
+    attrs = {}
+    for match in ATTR_PATTERN.finditer(text):
+        value = next((v for v in match.group(2, 3, 4) if v is not None), "")
+        attrs[match.group(1).lower()] = value
+    return attrs
+
+
+def estimate_external_size(url):
+    """估算外部资源的传输大小，未知时返回 None"""
+    parts = urlsplit(url)
+    if parts.netloc == "fonts.googleapis.com":
+        size = GOOGLE_FONTS_CSS_SIZE
+        for family in parse_qs(parts.query).get("family", []):
+            name, _, axes = family.partition(":")
+            weights = axes.partition("@")[2].split(";") if "@" in axes else [""]
+            # 可变字体（100..800）只下载一个文件
+            count = 1 if any(".." in weight for weight in weights) else len(weights)
+            size += count * (CJK_FONT_SIZE if CJK_FONT_PATTERN.search(name.replace("+", " ")) else LATIN_FONT_SIZE)
+        return size
+
+    parsed = parse_cdn_url(url)
+    key = f"{parsed['name']}/{parsed['path']}" if parsed else parts.netloc
+    for pattern, size in KNOWN_TRANSFER_SIZES:
+        if fnmatch(key, pattern):
+            return size
+    return None
+
+
+class PageWeightAnalyzer(ProjectFingerprinter):
+    """分析单个项目首页的加载开销"""
+
+    def __init__(self, project_dir, page="index.html"):
+        super().__init__(project_dir)
+        self.page = page
+
+    def local_files(self):
+        """页面加载的项目内文件（按引用关系递归）"""
+        loaded = {self.page}
+        pending = [self.page]
+        while pending:
+            document = pending.pop()
+            for target in self.references(document):
+                if target not in loaded and os.path.basename(target) not in NON_PAGE_NAMES:
+                    loaded.add(target)
+                    pending.append(target)
+        return loaded
+
+    def page_tags(self):
+        """页面中的外链脚本和样式，返回 [(地址, 是否阻塞渲染)]"""
+        html = self.texts.get(self.page, "")
+        head_end = HEAD_END_PATTERN.search(html)
+        head_end = head_end.start() if head_end else len(html)
+
+        tags = []
+        for match in SCRIPT_TAG_PATTERN.finditer(html):
+            attrs = parse_attributes(match.group(1))
+            if attrs.get("src"):
+                blocking = (match.start() < head_end and "async" not in attrs and "defer" not in attrs
+                            and attrs.get("type", "").lower() != "module")
+                tags.append((attrs["src"], blocking))
+        for match in LINK_TAG_PATTERN.finditer(html):
+            attrs = parse_attributes(match.group(1))
+            rel = attrs.get("rel", "").lower().split()
+            if attrs.get("href") and ("stylesheet" in rel or "icon" in rel):
+                tags.append((attrs["href"], False))
+        return tags
+
+    def heavy_apis(self, files):
+        """项目代码（内联脚本和非库文件）中用到的重量级 API"""
+        sources = [match.group(2) for match in SCRIPT_TAG_PATTERN.finditer(self.texts.get(self.page, ""))]
+        sources += [self.texts[rel] for rel in files
+                    if rel.endswith(('.js', '.mjs')) and rel in self.texts and not LIBRARY_FILE_PATTERN.search(rel)]
+        return sorted(name for name, pattern in HEAVY_APIS.items()
+                      if any(pattern.search(source) for source in sources))
+
+    def unreferenced_assets(self, files):
+        """资源目录中没有被静态引用的文件，返回 {路径: 字节数}"""
+        return {rel: os.path.getsize(os.path.join(self.project_dir, rel)) for rel in self.files
+                if rel not in files and rel.split("/", 1)[0].lower() in ASSET_DIRS}
+
+    def analyze(self):
+        """返回分析结果"""
+        files = self.local_files()
+        sizes = {rel: os.path.getsize(os.path.join(self.project_dir, rel)) for rel in files}
+
+        external = []
+        unknown = []
+        blocking = []
+        for url, is_blocking in self.page_tags():
+            if is_blocking:
+                blocking.append(url)
+            if url.startswith(('http:', 'https:', '//')):
+                size = estimate_external_size(url if not url.startswith('//') else f"https:{url}")
+                if size is None:
+                    unknown.append(url)
+                external.append({"url": url, "bytes": size or 0})
+            elif not url.startswith(('data:', '/')):
+                # 项目外的共享文件（例如 ../../js/back-link-fix.js）
+                path = os.path.normpath(os.path.join(self.project_dir, unquote(url.split('?')[0])))
+                rel = os.path.relpath(path, self.project_dir).replace(os.sep, "/")
+                if rel not in sizes and os.path.isfile(path):
+                    sizes[rel] = os.path.getsize(path)
+
+        local_bytes = sum(sizes.values())
+        external_bytes = sum(item["bytes"] for item in external)
+        largest = list(sizes.items()) + [(item["url"], item["bytes"]) for item in external]
+        largest.sort(key=lambda item: (-item[1], item[0]))
+
+        apis = self.heavy_apis(files)
+        unreferenced = self.unreferenced_assets(files)
+        result = {
+            "transfer_bytes": local_bytes + external_bytes,
+            "local_bytes": local_bytes,
+            "external_bytes": external_bytes,
+            "requests": len(sizes) + len(external),
+            "largest": [{"path": path, "bytes": size} for path, size in largest[:TOP_ASSETS]],
+            "blocking_scripts": blocking,
+            "heavy_apis": apis,
+            "unknown_external": unknown,
+            # 可能动态加载、未计入传输量的资源
+            "unreferenced_asset_bytes": sum(unreferenced.values()),
+            "unreferenced_assets": sorted(unreferenced),
+        }
+        result["performance_impact"] = derive_performance_impact(result)
+        return result
+
+
+def derive_performance_impact(result):
+    """根据分析结果推导性能影响等级"""
+    score = next((points for limit, points in IMPACT_BYTE_STEPS if result["transfer_bytes"] > limit), 0)
+    score += sum(IMPACT_API_SCORES.get(api, 0) for api in result["heavy_apis"])
+    return next(level for minimum, level in IMPACT_LEVELS if score >= minimum)
+
+
+def analyze_project(project_path):
+    """分析项目首页，项目没有 index.html 时返回 None"""
+    if not os.path.isfile(os.path.join(project_path, "index.html")):
+        return None
+    return PageWeightAnalyzer(project_path).analyze()
+
+
+def estimate_performance_impact(project_path, default="medium"):
+    """推导项目的 performance_impact，无法分析时返回 default"""
+    result = analyze_project(project_path)
+    return result["performance_impact"] if result else default
+
+
+def check_budget(result, budget_kb=DEFAULT_BUDGET_KB, max_requests=DEFAULT_MAX_REQUESTS,
+                 max_blocking=DEFAULT_MAX_BLOCKING):
+    """检查预算，返回超出预算的说明列表"""
+    violations = []
+    if result["transfer_bytes"] > budget_kb * 1024:
+        violations.append(f"传输量 {_format_size(result['transfer_bytes'])} 超过 {budget_kb} KB")
+    if result["requests"] > max_requests:
+        violations.append(f"请求数 {result['requests']} 超过 {max_requests}")
+    if len(result["blocking_scripts"]) > max_blocking:
+        violations.append(f"阻塞渲染的脚本 {len(result['blocking_scripts'])} 个，超过 {max_blocking}")
+    return violations
+
+
+def _set_impact(config, impact):
+    config.setdefault("compatibility", {})["performance_impact"] = impact
+
+
+def _edit_impact_text(content, impact):
+    """在原文本中只替换（或插入）performance_impact 一个字段，无法定位时返回 None"""
+    values = IMPACT_VALUE_PATTERN.findall(content)
+    if len(values) == 1:
+        return IMPACT_VALUE_PATTERN.sub(lambda m: f'{m.group(1)}"{impact}"', content)
+    if not values and len(COMPATIBILITY_PATTERN.findall(content)) == 1:
+        return COMPATIBILITY_PATTERN.sub(
+            lambda m: f'{m.group(1)}{m.group(2)}"performance_impact": "{impact}",{m.group(2)}', content)
+    return None
+
+
+def write_performance_impact(project_path, impact):
+    """把 performance_impact 写回 project.json，返回是否有变化
+
+    只改动这一个字段的文本并原子写入，文件其余部分的格式保持不变；文本中无法可靠定位该字段时
+    通过 MetadataTransaction 整体重写。
+    """
+    config_path = os.path.join(project_path, "project.json")
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        config = json.loads(content)
+    except Exception as e:
+        print(f"读取项目配置文件时出错: {e}")
+        return False
+    if not isinstance(config, dict):
+        return False
+    compatibility = config.get("compatibility")
+    if isinstance(compatibility, dict) and compatibility.get("performance_impact") == impact:
+        return False
+
+    _set_impact(config, impact)
+    updated = _edit_impact_text(content, impact)
+    try:
+        valid = updated is not None and json.loads(updated) == config
+    except ValueError:
+        valid = False
+    if not valid:
+        transaction = MetadataTransaction()
+        transaction.add(config_path, lambda item: _set_impact(item, impact), "更新 performance_impact")
+        return transaction.commit()[0]["changed"]
+
+    try:
+        with AtomicFileWriter(config_path) as writer:
+            writer.write(updated)
+    except OSError as e:
+        print(f"保存项目配置文件时出错: {e}")
+        return False
+    return writer.changed
+
+
+def _format_size(size):
+    return f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
+
+
+def run(project_paths, budget, write=False):
+    """分析项目并打印报告，返回 (报告数据, 超出预算的项目数)"""
+    report = {}
+    over_budget = 0
+    updated = 0
+    for project_path in project_paths:
+        result = analyze_project(project_path)
+        if result is None:
+            print(f"跳过没有 index.html 的项目: {project_path}")
+            continue
+
+        config = None
+        if os.path.isfile(os.path.join(project_path, "project.json")):
+            config, _ = load_project_config(project_path)
+        current = ((config or {}).get("compatibility") or {}).get("performance_impact")
+        result["violations"] = check_budget(result, **budget)
+        report[project_path] = result
+
+        impact = result["performance_impact"]
+        impact_text = impact if current in (None, impact) else f"{current} -> {impact}"
+        print(f"{project_path}: {_format_size(result['transfer_bytes'])}, {result['requests']} 个请求, "
+              f"阻塞脚本 {len(result['blocking_scripts'])} 个, 性能影响 {impact_text}")
+        print("  最大的文件: " + ", ".join(f"{item['path']} ({_format_size(item['bytes'])})"
+                                          for item in result["largest"]))
+        if result["heavy_apis"]:
+            print(f"  重量级 API: {', '.join(result['heavy_apis'])}")
+        if result["unknown_external"]:
+            print(f"  未知大小的外部资源: {', '.join(result['unknown_external'])}")
+        if result["unreferenced_assets"]:
+            print(f"  未被静态引用的资源（可能动态加载，未计入传输量）: "
+                  f"{len(result['unreferenced_assets'])} 个, {_format_size(result['unreferenced_asset_bytes'])}")
+        for violation in result["violations"]:
+            print(f"  超出预算: {violation}")
+        if result["violations"]:
+            over_budget += 1
+
+        if write and config and write_performance_impact(project_path, impact):
+            updated += 1
+
+    print(f"处理完成! 分析 {len(report)} 个项目, 超出预算 {over_budget} 个" + (f", 更新 {updated} 个" if write else ""))
+    return report, over_budget
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='分析项目页面体积并检查性能预算')
+    parser.add_argument('project', nargs='?', help='项目路径（默认分析所有项目）')
+    parser.add_argument('--write', action='store_true', help='把推导出的 performance_impact 写回 project.json')
+    parser.add_argument('--budget-kb', type=int, default=DEFAULT_BUDGET_KB,
+                        help=f'传输量预算，单位KB（默认: {DEFAULT_BUDGET_KB}）')
+    parser.add_argument('--max-requests', type=int, default=DEFAULT_MAX_REQUESTS,
+                        help=f'请求数预算（默认: {DEFAULT_MAX_REQUESTS}）')
+    parser.add_argument('--max-blocking', type=int, default=DEFAULT_MAX_BLOCKING,
+                        help=f'<head> 中阻塞渲染的脚本数预算（默认: {DEFAULT_MAX_BLOCKING}）')
+    parser.add_argument('--json', metavar='FILE', help='保存 JSON 格式的报告')
+    args = parser.parse_args()
+
+    if args.project:
+        project_paths = [args.project]
+    else:
+        project_paths = [entry["path"] for entry in get_catalog().entries(include_missing=True)]
+    budget = {"budget_kb": args.budget_kb, "max_requests": args.max_requests, "max_blocking": args.max_blocking}
+    report, over_budget = run(project_paths, budget, write=args.write)
+
+    if args.json:
+        try:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"报告已保存到 {args.json}")
+        except Exception as e:
+            print(f"保存报告时出错: {e}")
+            return 1
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Service Worker 预缓存清单
+
+扫描项目目录中实际存在的文件，生成 {url, revision} 形式的预缓存清单（revision 为内容哈希），
+写入项目 Service Worker 中由标记包围的 PRECACHE_MANIFEST 常量:
+
+  // precache-manifest:start（由 tools/precache_manifest.py 生成，请勿手动修改）
+  const PRECACHE_MANIFEST = [
+    {"url": "./index.html", "revision": "0123456789"},
+    ...
+  ];
+  // precache-manifest:end
+
+Service Worker 按 url + revision 缓存文件，更新时只下载 revision 变化的文件，清单中不存在的
+文件不会被请求（参见 create_project_template.py 生成的 Service Worker）。Service Worker 中还没有
+标记时，替换已有的 PRECACHE_MANIFEST 定义，或者插入在 CACHE_NAME 定义之后；没有读取
+PRECACHE_MANIFEST 的 Service Worker 会被跳过。
+
+预缓存的文件只按 revision 更新，修改项目文件后必须重新生成清单：tools/build.py 的 precache 阶段
+在项目文件变化时自动运行，dist_build.py 的 precache 阶段处理发布目录。
+
+在发布目录中，资源指纹等构建阶段会改写文件内容，应在这些阶段之后用 --dist 重新生成清单；
+已有带指纹副本的原文件（见 asset-manifest.json）不再预缓存。
+
+用法:
+  python tools/precache_manifest.py                      # 更新所有带 Service Worker 的项目
+  python tools/precache_manifest.py <项目路径>            # 更新单个项目
+  python tools/precache_manifest.py --dist --no-mirror   # 更新发布目录中的清单
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from urllib.parse import quote
+
+from project_catalog import get_catalog
+from site_dist import DIST_DIR, IGNORED_NAMES, PRECOMPRESSED_EXTENSIONS, mirror_site, file_sha256
+from utils import write_file_if_changed
+
+# Service Worker 的位置（与 manage_versions.update_service_worker_version 一致）
+SERVICE_WORKER_PATHS = ["service-worker.js", os.path.join("js", "service-worker.js"), "sw.js"]
+
+# revision 长度（十六进制字符数）
+REVISION_LENGTH = 10
+
+# 不预缓存的文件
+EXCLUDED_NAMES = {"project.json", "asset-manifest.json"} | IGNORED_NAMES
+EXCLUDED_EXTENSIONS = ('.md',) + PRECOMPRESSED_EXTENSIONS
+
+# 超过该大小的文件不预缓存（与 Workbox 的默认值相同），访问时由运行时缓存处理
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+
+BLOCK_START = "// precache-manifest:start（由 tools/precache_manifest.py 生成，请勿手动修改）"
+BLOCK_END = "// precache-manifest:end"
+BLOCK_PATTERN = re.compile(r'// precache-manifest:start.*?// precache-manifest:end\n?', re.DOTALL)
+DECLARATION_PATTERN = re.compile(r'^const\s+PRECACHE_MANIFEST\s*=\s*\[.*?\];[ \t]*\n?', re.MULTILINE | re.DOTALL)
+# 移除清单块时连同插入时添加的空行一起去掉
+REMOVE_PATTERN = re.compile(r'\n?// precache-manifest:start.*?// precache-manifest:end\n\n?', re.DOTALL)
+CACHE_NAME_PATTERN = re.compile(r'^const\s+CACHE_NAME\s*=.*\n', re.MULTILINE)
+
+
+def find_service_worker(project_path):
+    """查找项目的 Service Worker 文件"""
+    for name in SERVICE_WORKER_PATHS:
+        path = os.path.join(project_path, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def uses_manifest(content):
+    """Service Worker 是否读取 PRECACHE_MANIFEST（不计生成的清单块本身）"""
+    return "PRECACHE_MANIFEST" in BLOCK_PATTERN.sub("", content)
+
+
+def precache_files(project_path, sw_path, max_bytes=DEFAULT_MAX_BYTES):
+    """返回需要预缓存的文件路径（排序），构建流水线用它们计算预缓存阶段的输入指纹"""
+    # 资源指纹阶段保留的原文件，页面引用的是带指纹的副本
+    fingerprinted = set()
+    try:
+        with open(os.path.join(project_path, "asset-manifest.json"), 'r', encoding='utf-8') as f:
+            fingerprinted = {os.path.normpath(os.path.join(project_path, rel)) for rel in json.load(f)["assets"]}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    paths = []
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if (name in EXCLUDED_NAMES or name.lower().endswith(EXCLUDED_EXTENSIONS)
+                    or os.path.normpath(path) in fingerprinted
+                    or os.path.samefile(path, sw_path) or os.path.getsize(path) > max_bytes):
+                continue
+            paths.append(path)
+    return paths
+
+
+def build_manifest(project_path, sw_path, max_bytes=DEFAULT_MAX_BYTES):
+    """扫描项目文件，返回按 url 排序的 [{"url", "revision"}]，url 相对于 Service Worker"""
+    sw_dir = os.path.dirname(sw_path)
+    entries = []
+    for path in precache_files(project_path, sw_path, max_bytes):
+        rel = os.path.relpath(path, sw_dir).replace(os.sep, "/")
+        url = quote(rel if rel.startswith('../') else f"./{rel}", safe="/.-_~")
+        revision = file_sha256(path)[:REVISION_LENGTH]
+        entries.append({"url": url, "revision": revision})
+        # 页面目录本身（./）对应 index.html
+        if rel == "index.html":
+            entries.append({"url": "./", "revision": revision})
+    entries.sort(key=lambda entry: entry["url"])
+    return entries
+
+
+def render_block(entries):
+    """生成写入 Service Worker 的清单代码"""
+    lines = [BLOCK_START, "const PRECACHE_MANIFEST = ["]
+    lines += [f"  {json.dumps(entry, ensure_ascii=False)}," for entry in entries]
+    if len(lines) > 2:
+        lines[-1] = lines[-1].rstrip(',')
+    lines += ["];", BLOCK_END]
+    return "\n".join(lines) + "\n"
+
+
+def inject_manifest(content, entries):
+    """把清单写入 Service Worker 源码，返回新的源码"""
+    block = render_block(entries)
+    if BLOCK_PATTERN.search(content):
+        return BLOCK_PATTERN.sub(lambda m: block, content, count=1)
+    if DECLARATION_PATTERN.search(content):
+        return DECLARATION_PATTERN.sub(lambda m: block, content, count=1)
+    match = CACHE_NAME_PATTERN.search(content)
+    if match:
+        return f"{content[:match.end()]}\n{block}{content[match.end():]}"
+    return f"{block}\n{content}"
+
+
+def update_precache_manifest(project_path, max_bytes=DEFAULT_MAX_BYTES):
+    """更新项目 Service Worker 中的预缓存清单，返回是否写入了新内容（没有 Service Worker 时返回 None）
+
+    不读取 PRECACHE_MANIFEST 的 Service Worker 不写入清单，以前写入的清单块会被移除。
+    """
+    sw_path = find_service_worker(project_path)
+    if sw_path is None:
+        return None
+    try:
+        with open(sw_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except Exception as e:
+        print(f"读取Service Worker时出错: {e}")
+        return False
+
+    if not uses_manifest(content):
+        print(f"  跳过: {sw_path} 没有使用 PRECACHE_MANIFEST")
+        return write_file_if_changed(sw_path, REMOVE_PATTERN.sub("", content, count=1))
+
+    entries = build_manifest(project_path, sw_path, max_bytes)
+    new_content = inject_manifest(content, entries)
+    if write_file_if_changed(sw_path, new_content):
+        print(f"已更新预缓存清单: {sw_path} ({len(entries)} 个文件)")
+        return True
+    return False
+
+
+def update_all(root_dir=".", max_bytes=DEFAULT_MAX_BYTES):
+    """更新所有项目的预缓存清单"""
+    updated = 0
+    unchanged = 0
+    for entry in get_catalog().entries(include_missing=True):
+        result = update_precache_manifest(os.path.join(root_dir, entry["path"]), max_bytes)
+        if result:
+            updated += 1
+        elif result is not None:
+            unchanged += 1
+    print(f"处理完成! 更新: {updated}, 未变化: {unchanged}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='为项目 Service Worker 生成预缓存清单')
+    parser.add_argument('project', nargs='?', help='项目路径（默认处理所有项目）')
+    parser.add_argument('--dist', action='store_true', help='处理发布目录中的项目')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    parser.add_argument('--max-size', type=int, default=DEFAULT_MAX_BYTES // 1024,
+                        help=f'预缓存的最大文件大小，单位KB（默认: {DEFAULT_MAX_BYTES // 1024}）')
+    args = parser.parse_args()
+
+    max_bytes = args.max_size * 1024
+    if args.project:
+        if update_precache_manifest(args.project, max_bytes) is None:
+            print(f"项目中没有 Service Worker: {args.project}")
+            return 1
+        return 0
+
+    root_dir = "."
+    if args.dist:
+        if not args.no_mirror:
+            stats = mirror_site(args.output)
+            print(f"已镜像站点到 {args.output}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+        root_dir = args.output
+    update_all(root_dir, max_bytes)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
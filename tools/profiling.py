@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建性能剖析
+
+记录各阶段和各项目的耗时（扫描、JSON解析、渲染、写入），以及读写的文件数和字节数。
+剖析结束后打印汇总表，并可选地导出 Chrome trace-event JSON（可在 chrome://tracing
+或 https://ui.perfetto.dev 中打开）和 cProfile 统计文件（可用 pstats/snakeviz 查看）。
+
+未启用剖析时 get_profiler() 返回空实现，埋点的开销可以忽略。
+
+在工具中使用:
+  from profiling import get_profiler
+
+  profiler = get_profiler()
+  with profiler.span("render", project=project_path):
+      ...
+  profiler.count_write(path, len(data))
+
+命令行参数（generate_homepage_simplified.py、generate_project_details.py、
+update_project_metadata.py 均支持）:
+  --profile                    打印耗时汇总表
+  --profile-trace <文件>        导出 Chrome trace-event JSON（隐含 --profile）
+  --profile-cprofile <文件>     同时运行 cProfile 并保存统计（隐含 --profile）
+"""
+
+import os
+import json
+import time
+import cProfile
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+# 汇总表中列出的最慢项目数
+TOP_PROJECTS = 10
+
+
+def _now_us():
+    """单调时钟（微秒）。Linux 上各进程共享同一时钟，工作进程的事件可以直接合并"""
+    return time.perf_counter_ns() // 1000
+
+
+class Profiler:
+    """收集耗时区间和文件读写计数"""
+
+    enabled = True
+
+    def __init__(self, origin_us=None):
+        self.origin_us = _now_us() if origin_us is None else origin_us
+        self.events = []
+        self.counters = defaultdict(int)
+        self.pid = os.getpid()
+
+    @contextmanager
+    def span(self, name, category="stage", **args):
+        """记录一个耗时区间，args 会作为事件参数写入 trace（project 参数用于按项目汇总）"""
+        start = _now_us()
+        try:
+            yield
+        finally:
+            self.events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start - self.origin_us,
+                "dur": _now_us() - start,
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": args
+            })
+
+    def count_read(self, path, nbytes):
+        """记录一次文件读取"""
+        self.counters["files_read"] += 1
+        self.counters["bytes_read"] += nbytes
+
+    def count_write(self, path, nbytes):
+        """记录一次文件写入"""
+        self.counters["files_written"] += 1
+        self.counters["bytes_written"] += nbytes
+
+    def count_unchanged(self, path):
+        """记录一次因内容未变化而跳过的写入"""
+        self.counters["writes_skipped"] += 1
+
+    def reset(self):
+        """清空已记录的事件和计数（保留时间原点）"""
+        self.events = []
+        self.counters = defaultdict(int)
+
+    def export(self):
+        """导出事件和计数，供工作进程把结果交回主进程"""
+        return {"events": self.events, "counters": dict(self.counters)}
+
+    def merge(self, data):
+        """合并工作进程导出的事件和计数"""
+        self.events.extend(data["events"])
+        for key, value in data["counters"].items():
+            self.counters[key] += value
+
+    def summary(self, wall_us=None):
+        """打印耗时汇总表"""
+        if wall_us is None:
+            wall_us = _now_us() - self.origin_us
+
+        stats = {}
+        project_spans = defaultdict(list)
+        for event in self.events:
+            item = stats.setdefault(event["name"], {"count": 0, "total": 0, "max": 0})
+            item["count"] += 1
+            item["total"] += event["dur"]
+            item["max"] = max(item["max"], event["dur"])
+            project = event["args"].get("project")
+            if project:
+                project_spans[project].append((event["ts"], event["ts"] + event["dur"]))
+
+        # 项目耗时取其所有区间的并集，嵌套的区间（如 metadata 中的 parse）不重复计算
+        per_project = {project: _union_length(spans) for project, spans in project_spans.items()}
+
+        print(f"\n性能剖析汇总（总耗时 {wall_us / 1000:.1f} ms）")
+        print(f"{'阶段':<20}{'次数':>8}{'总计(ms)':>12}{'平均(ms)':>12}{'最大(ms)':>12}{'占比':>8}")
+        for name, item in sorted(stats.items(), key=lambda kv: kv[1]["total"], reverse=True):
+            share = item["total"] / wall_us * 100 if wall_us else 0
+            print(f"{name:<20}{item['count']:>8}{item['total'] / 1000:>12.2f}"
+                  f"{item['total'] / item['count'] / 1000:>12.3f}{item['max'] / 1000:>12.2f}{share:>7.1f}%")
+
+        if per_project:
+            print(f"\n最慢的 {min(TOP_PROJECTS, len(per_project))} 个项目:")
+            slowest = sorted(per_project.items(), key=lambda kv: kv[1], reverse=True)[:TOP_PROJECTS]
+            for project, total in slowest:
+                print(f"  {total / 1000:>10.2f} ms  {project}")
+
+        counters = self.counters
+        print(f"\n读取文件: {counters['files_read']} 个 ({counters['bytes_read']} 字节), "
+              f"写入文件: {counters['files_written']} 个 ({counters['bytes_written']} 字节), "
+              f"内容未变化跳过写入: {counters['writes_skipped']} 个")
+
+    def write_trace(self, path):
+        """导出 Chrome trace-event JSON"""
+        trace = {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {key: value for key, value in self.counters.items()}
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(trace, f, ensure_ascii=False)
+            print(f"trace 已保存到 {path}")
+        except Exception as e:
+            print(f"保存 trace 文件时出错: {e}")
+
+
+def _union_length(spans):
+    """计算若干区间并集的总长度"""
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+class NullProfiler:
+    """未启用剖析时使用的空实现"""
+
+    enabled = False
+
+    @contextmanager
+    def span(self, name, category="stage", **args):
+        yield
+
+    def count_read(self, path, nbytes):
+        pass
+
+    def count_write(self, path, nbytes):
+        pass
+
+    def count_unchanged(self, path):
+        pass
+
+
+_null_profiler = NullProfiler()
+_active_profiler = _null_profiler
+
+
+def get_profiler():
+    """获取当前进程中生效的剖析器"""
+    return _active_profiler
+
+
+def set_profiler(profiler):
+    """设置当前进程中生效的剖析器（None 表示关闭剖析）"""
+    global _active_profiler
+    _active_profiler = profiler or _null_profiler
+
+
+@contextmanager
+def profile_session(enabled=False, trace_path=None, cprofile_path=None):
+    """剖析一次运行：结束时打印汇总表并按需保存 trace 和 cProfile 统计
+
+    trace_path 或 cprofile_path 非空时自动启用剖析。
+    """
+    if not (enabled or trace_path or cprofile_path):
+        yield None
+        return
+
+    profiler = Profiler()
+    set_profiler(profiler)
+    c_profile = cProfile.Profile() if cprofile_path else None
+    if c_profile:
+        c_profile.enable()
+    try:
+        with profiler.span("total"):
+            yield profiler
+    finally:
+        if c_profile:
+            c_profile.disable()
+        set_profiler(None)
+        profiler.summary()
+        if trace_path:
+            profiler.write_trace(trace_path)
+        if c_profile:
+            try:
+                c_profile.dump_stats(cprofile_path)
+                print(f"cProfile 统计已保存到 {cprofile_path}")
+            except Exception as e:
+                print(f"保存 cProfile 统计时出错: {e}")
+
+
+def add_profile_arguments(parser):
+    """为 argparse 解析器添加剖析参数"""
+    parser.add_argument('--profile', action='store_true', help='打印各阶段和各项目的耗时汇总')
+    parser.add_argument('--profile-trace', metavar='FILE', help='导出 Chrome trace-event JSON（隐含 --profile）')
+    parser.add_argument('--profile-cprofile', metavar='FILE', help='保存 cProfile 统计（隐含 --profile）')
+
+
+def profile_options_from_argv(argv):
+    """从未使用 argparse 的命令行参数中解析剖析参数
+
+    返回 (启用剖析, trace文件, cProfile文件, 去掉剖析参数后的参数列表)。
+    """
+    enabled = False
+    trace_path = None
+    cprofile_path = None
+    rest = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--profile':
+            enabled = True
+        elif arg in ('--profile-trace', '--profile-cprofile'):
+            value = next(args, None)
+            if not value:
+                raise ValueError(f"{arg} 需要指定文件路径")
+            if arg == '--profile-trace':
+                trace_path = value
+            else:
+                cprofile_path = value
+        else:
+            rest.append(arg)
+    return enabled, trace_path, cprofile_path, rest
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目目录缓存
+
+扫描 projects/<分类>/<项目>/project.json，并把解析结果持久化到磁盘缓存。
+再次运行时只对 stat 签名（mtime/size）发生变化的 project.json 重新读取和解析，
+其余条目直接复用缓存，使全量构建的开销与改动的文件数成正比。
+
+缓存条目字段:
+  name          项目目录名
+  path          项目目录路径（相对于运行目录，例如 projects/creative-tools/光绘）
+  category_dir  所在分类目录名
+  config_path   project.json 路径，项目没有配置文件时为 None
+  config        解析后的配置，缺失或无效时为 None
+  error         读取/解析失败的原因，正常时为 None
+  hash          project.json 内容的 sha256
+  mtime_ns      project.json 的修改时间（纳秒）
+  size          project.json 的字节数
+
+用法:
+  python tools/project_catalog.py           # 刷新缓存并打印统计
+  python tools/project_catalog.py --rebuild # 丢弃缓存后全量重建
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+from profiling import get_profiler
+
+# 缓存格式版本，结构变化时递增以丢弃旧缓存
+CACHE_VERSION = 1
+
+# 默认缓存文件位置
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "project_catalog.json")
+
+# mtime 与缓存写入时间相差小于该值的条目视为不可信，下次仍重新读取
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+def hash_bytes(data):
+    """计算内容哈希"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ProjectCatalog:
+    """带磁盘缓存的项目目录"""
+
+    def __init__(self, projects_root="projects", cache_path=DEFAULT_CACHE_PATH, use_cache=True):
+        self.projects_root = projects_root
+        self.cache_path = cache_path
+        self.use_cache = use_cache
+        self._entries = None
+        self._cached = {}
+        self._cache_saved_ns = 0
+        # 最近一次刷新的统计
+        self.stats = {"projects": 0, "parsed": 0, "reused": 0, "missing": 0, "invalid": 0}
+
+    def _load_cache(self):
+        """读取磁盘缓存"""
+        self._cached = {}
+        self._cache_saved_ns = 0
+        if not self.use_cache or not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"读取项目目录缓存时出错，将全量重建: {e}")
+            return
+
+        # 版本或项目根目录不一致时缓存作废
+        if data.get("version") != CACHE_VERSION:
+            return
+        if data.get("root") != os.path.abspath(self.projects_root):
+            return
+
+        self._cache_saved_ns = data.get("saved_ns", 0)
+        for entry in data.get("entries", []):
+            if entry.get("config_path"):
+                self._cached[entry["config_path"]] = entry
+
+    def _save_cache(self):
+        """写入磁盘缓存（先写临时文件再替换）"""
+        if not self.use_cache:
+            return
+
+        data = {
+            "version": CACHE_VERSION,
+            "root": os.path.abspath(self.projects_root),
+            "saved_ns": time.time_ns(),
+            "entries": [e for e in self._entries if e["config_path"]]
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"保存项目目录缓存时出错: {e}")
+
+    def _is_fresh(self, cached, st):
+        """判断缓存条目是否仍然有效"""
+        if cached is None:
+            return False
+        if cached.get("mtime_ns") != st.st_mtime_ns or cached.get("size") != st.st_size:
+            return False
+        # 在缓存写入前后极短时间内修改的文件，mtime 不足以区分，需要重新读取
+        if st.st_mtime_ns >= self._cache_saved_ns - RACY_WINDOW_NS:
+            return False
+        return True
+
+    def _read_entry(self, entry, st):
+        """读取并解析 project.json"""
+        profiler = get_profiler()
+        try:
+            with open(entry["config_path"], 'rb') as f:
+                raw = f.read()
+        except Exception as e:
+            entry["error"] = f"读取配置文件时出错: {e}"
+            return entry
+        profiler.count_read(entry["config_path"], len(raw))
+
+        entry["hash"] = hash_bytes(raw)
+        entry["mtime_ns"] = st.st_mtime_ns
+        entry["size"] = st.st_size
+
+        # 内容未变（例如只是 touch 过），沿用已解析的配置
+        cached = self._cached.get(entry["config_path"])
+        if cached and cached.get("hash") == entry["hash"]:
+            entry["config"] = cached.get("config")
+            entry["error"] = cached.get("error")
+            self.stats["reused"] += 1
+            return entry
+
+        self.stats["parsed"] += 1
+        with profiler.span("parse", project=entry["path"]):
+            try:
+                entry["config"] = json.loads(raw.decode('utf-8'))
+            except Exception as e:
+                entry["error"] = f"配置文件格式无效: {e}"
+        return entry
+
+    def refresh(self):
+        """扫描项目目录，只重新解析发生变化的 project.json"""
+        with get_profiler().span("scan"):
+            return self._refresh()
+
+    def _refresh(self):
+        self.stats = {"projects": 0, "parsed": 0, "reused": 0, "missing": 0, "invalid": 0}
+        self._load_cache()
+        entries = []
+
+        if not os.path.exists(self.projects_root):
+            print("找不到项目目录")
+            self._entries = entries
+            return entries
+
+        # 遍历分类目录（排序保证输出稳定）
+        with os.scandir(self.projects_root) as category_iter:
+            category_dirs = sorted((d for d in category_iter if d.is_dir()), key=lambda d: d.name)
+
+        for category in category_dirs:
+            category_path = os.path.join(self.projects_root, category.name)
+            with os.scandir(category_path) as project_iter:
+                project_dirs = sorted((d for d in project_iter if d.is_dir()), key=lambda d: d.name)
+
+            # 遍历该分类下的所有项目
+            for project in project_dirs:
+                project_path = os.path.join(category_path, project.name)
+                config_path = os.path.join(project_path, "project.json")
+                entry = {
+                    "name": project.name,
+                    "path": project_path,
+                    "category_dir": category.name,
+                    "config_path": None,
+                    "config": None,
+                    "error": None,
+                    "hash": None,
+                    "mtime_ns": None,
+                    "size": None
+                }
+
+                try:
+                    st = os.stat(config_path)
+                except OSError:
+                    entry["error"] = "缺少 project.json 文件"
+                    self.stats["missing"] += 1
+                    entries.append(entry)
+                    continue
+
+                entry["config_path"] = config_path
+                cached = self._cached.get(config_path)
+                if self._is_fresh(cached, st):
+                    entry.update({
+                        "config": cached.get("config"),
+                        "error": cached.get("error"),
+                        "hash": cached.get("hash"),
+                        "mtime_ns": cached.get("mtime_ns"),
+                        "size": cached.get("size")
+                    })
+                    self.stats["reused"] += 1
+                else:
+                    self._read_entry(entry, st)
+
+                if entry["config"] is None:
+                    self.stats["invalid"] += 1
+                self.stats["projects"] += 1
+                entries.append(entry)
+
+        self._entries = entries
+        self._save_cache()
+        return entries
+
+    def entries(self, include_missing=False):
+        """返回项目条目列表，首次调用时自动刷新"""
+        if self._entries is None:
+            self.refresh()
+        if include_missing:
+            return list(self._entries)
+        return [e for e in self._entries if e["config_path"]]
+
+    def valid_entries(self):
+        """返回配置文件存在且可解析的项目条目"""
+        return [e for e in self.entries() if e["config"] is not None]
+
+    def get(self, project_path):
+        """按项目路径查找条目"""
+        project_path = os.path.normpath(project_path)
+        for entry in self.entries(include_missing=True):
+            if os.path.normpath(entry["path"]) == project_path:
+                return entry
+        return None
+
+    def find(self, project_name):
+        """按项目目录名查找条目（返回第一个匹配项）"""
+        for entry in self.entries(include_missing=True):
+            if entry["name"] == project_name:
+                return entry
+        return None
+
+    def invalidate(self, project_path=None):
+        """丢弃内存中的快照，下一次访问时重新校验"""
+        self._entries = None
+
+
+# 进程内共享的目录实例，同一进程中的多个工具复用同一次扫描结果
+_shared_catalog = None
+
+
+def get_catalog(projects_root="projects"):
+    """获取进程内共享的项目目录"""
+    global _shared_catalog
+    if _shared_catalog is None or _shared_catalog.projects_root != projects_root:
+        _shared_catalog = ProjectCatalog(projects_root)
+    return _shared_catalog
+
+
+def find_all_config_paths(projects_root="projects"):
+    """所有 project.json 的路径（供根目录的批量元数据脚本使用）
+
+    目录只收录 <分类>/<项目>/project.json；其他深度的配置文件（嵌套项目等）原来也由这些脚本处理，
+    因此再遍历一次目录树补充，遍历只列出文件名，不读取内容。
+    """
+    paths = [entry["config_path"] for entry in get_catalog(projects_root).entries()]
+    known = {os.path.normpath(path) for path in paths}
+    for root, dirs, files in os.walk(projects_root):
+        dirs.sort()
+        if "project.json" in files:
+            path = os.path.join(root, "project.json")
+            if os.path.normpath(path) not in known:
+                paths.append(path)
+    return paths
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='刷新项目目录缓存')
+    parser.add_argument('--rebuild', action='store_true', help='丢弃已有缓存后全量重建')
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(DEFAULT_CACHE_PATH):
+        os.remove(DEFAULT_CACHE_PATH)
+
+    catalog = ProjectCatalog()
+    start = time.perf_counter()
+    catalog.refresh()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    stats = catalog.stats
+    print(f"项目数: {stats['projects']}, 重新解析: {stats['parsed']}, 复用缓存: {stats['reused']}, "
+          f"缺少配置: {stats['missing']}, 配置无效: {stats['invalid']}")
+    print(f"耗时: {elapsed:.1f} ms, 缓存文件: {catalog.cache_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
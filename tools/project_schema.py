@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+project.json 的结构定义
+
+PROJECT_SCHEMA 以声明的方式描述 project.json 的字段：类型、必要字段、枚举值（status、
+compatibility.performance_impact、分类 ID）、日期格式、语义化版本号以及更新日志的结构。
+compile_schema 把结构定义预编译为嵌套的检查函数，验证时不再解释结构定义，
+成千上万个项目也只需一次线性遍历。
+
+问题以 {"path", "level", "message"} 表示:
+  path     字段路径，例如 changelog[0].date，整个配置为空字符串
+  level    error（类型、枚举、格式错误）或 warning（缺少必要字段）
+  message  说明
+
+分类 ID 来自 site_config_simplified.json，编译时填入结构定义，分类变化后重新编译。
+读取到的分类按站点配置的 stat 签名缓存，批量验证时站点配置只读取一次。
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from datetime import datetime
+
+from project_catalog import RACY_WINDOW_NS
+
+# 结构定义变化时递增，使已缓存的验证结果失效
+SCHEMA_VERSION = 1
+
+SITE_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_config_simplified.json")
+
+STATUSES = ["stable", "beta", "deprecated"]
+PERFORMANCE_IMPACTS = ["low", "medium", "high"]
+SEMVER_PATTERN = r"^\d+\.\d+\.\d+(?:-[0-9A-Za-z.-]+)?(?:\+[0-9A-Za-z.-]+)?$"
+
+# "enum": "categories" 在编译时替换为站点配置中的分类 ID
+PROJECT_SCHEMA = {
+    "type": "object",
+    "required": ["title", "description", "status", "primary_category", "version", "author"],
+    "properties": {
+        "title": {"type": "string", "min_length": 1},
+        "description": {"type": "string"},
+        "status": {"type": "string", "enum": STATUSES},
+        "primary_category": {"type": "string", "enum": "categories"},
+        "secondary_categories": {"type": "array", "items": {"type": "string", "enum": "categories"}},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "order": {"type": "integer"},
+        "version": {"type": "string", "pattern": SEMVER_PATTERN, "pattern_name": "语义化版本号（x.y.z）"},
+        "creation_date": {"type": "string", "format": "date"},
+        "last_updated": {"type": "string", "format": "date"},
+        "changelog": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["version", "date", "changes"],
+                "properties": {
+                    "version": {"type": "string", "pattern": SEMVER_PATTERN, "pattern_name": "语义化版本号（x.y.z）"},
+                    "date": {"type": "string", "format": "date"},
+                    "changes": {"type": "array", "items": {"type": "string"}},
+                },
+            },
+        },
+        "compatibility": {
+            "type": "object",
+            "properties": {
+                "mobile": {"type": "boolean"},
+                "desktop": {"type": "boolean"},
+                "tablet": {"type": "boolean"},
+                "min_screen_width": {"type": "integer", "minimum": 0},
+                "performance_impact": {"type": "string", "enum": PERFORMANCE_IMPACTS},
+            },
+        },
+        "author": {
+            "type": "object",
+            "required": ["creator"],
+            "properties": {
+                "name": {"type": "string"},
+                "contact": {"type": "string"},
+                "creator": {"type": "string"},
+                "contributors": {"type": "array", "items": {"type": "string"}},
+            },
+        },
+        "features": {"type": "array", "items": {"type": "string"}},
+        "dependencies": {"type": "array", "items": {"type": "string"}},
+    },
+}
+
+# 结构定义中的类型名 -> (Python 类型, 中文名)
+TYPES = {
+    "object": (dict, "对象"),
+    "array": (list, "数组"),
+    "string": (str, "字符串"),
+    "integer": (int, "整数"),
+    "boolean": (bool, "布尔值"),
+}
+
+TYPE_NAMES = {dict: "对象", list: "数组", str: "字符串", int: "整数", float: "数字", bool: "布尔值", type(None): "null"}
+
+
+def _child_path(path, key):
+    return f"{path}.{key}" if path else key
+
+
+def _describe(value):
+    return TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def _is_date(value):
+    if not re.match(r"^\d{4}-\d{2}-\d{2}$", value):
+        return False
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
+def compile_schema(schema, categories=()):
+    """把结构定义编译为检查函数 check(value, path, problems)"""
+    expected, type_name = TYPES[schema["type"]]
+    checks = []
+
+    def type_ok(value):
+        # bool 是 int 的子类，整数字段需要排除布尔值
+        return isinstance(value, expected) and not (expected is int and isinstance(value, bool))
+
+    enum = schema.get("enum")
+    if enum == "categories":
+        # 读取不到站点配置时不检查分类
+        enum = list(categories) or None
+    if enum is not None:
+        allowed = frozenset(enum)
+        shown = "、".join(enum)
+
+        def check_enum(value, path, problems):
+            if value not in allowed:
+                problems.append({"path": path, "level": "error", "message": f"'{value}' 不是有效值（可选: {shown}）"})
+        checks.append(check_enum)
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+        pattern_name = schema.get("pattern_name", schema["pattern"])
+
+        def check_pattern(value, path, problems):
+            if not pattern.match(value):
+                problems.append({"path": path, "level": "error", "message": f"'{value}' 不是{pattern_name}"})
+        checks.append(check_pattern)
+
+    if schema.get("format") == "date":
+        def check_date(value, path, problems):
+            if not _is_date(value):
+                problems.append({"path": path, "level": "error", "message": f"'{value}' 不是有效日期（YYYY-MM-DD）"})
+        checks.append(check_date)
+
+    if "min_length" in schema:
+        min_length = schema["min_length"]
+
+        def check_length(value, path, problems):
+            if len(value.strip()) < min_length:
+                problems.append({"path": path, "level": "error", "message": "不能为空"})
+        checks.append(check_length)
+
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+
+        def check_minimum(value, path, problems):
+            if value < minimum:
+                problems.append({"path": path, "level": "error", "message": f"不能小于 {minimum}"})
+        checks.append(check_minimum)
+
+    if "required" in schema:
+        required = list(schema["required"])
+
+        def check_required(value, path, problems):
+            for key in required:
+                if key not in value:
+                    problems.append({"path": _child_path(path, key), "level": "warning", "message": "缺少必要字段"})
+        checks.append(check_required)
+
+    if "properties" in schema:
+        properties = [(key, compile_schema(child, categories)) for key, child in schema["properties"].items()]
+
+        def check_properties(value, path, problems):
+            for key, check in properties:
+                if key in value:
+                    check(value[key], _child_path(path, key), problems)
+        checks.append(check_properties)
+
+    if "items" in schema:
+        check_item = compile_schema(schema["items"], categories)
+
+        def check_items(value, path, problems):
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]", problems)
+        checks.append(check_items)
+
+    def check(value, path, problems):
+        if not type_ok(value):
+            problems.append({"path": path, "level": "error",
+                             "message": f"应为{type_name}，实际为{_describe(value)}"})
+            return
+        for item_check in checks:
+            item_check(value, path, problems)
+
+    return check
+
+
+# 站点配置路径 -> ((mtime_ns, size), 分类 ID)
+_categories_cache = {}
+
+
+def load_categories(site_config_path=SITE_CONFIG_PATH):
+    """读取站点配置中的分类 ID，stat 签名没有变化时复用上一次的结果"""
+    try:
+        st = os.stat(site_config_path)
+        signature = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        signature = None
+    cached = _categories_cache.get(site_config_path)
+    if signature and cached and cached[0] == signature:
+        return list(cached[1])
+
+    try:
+        with open(site_config_path, 'r', encoding='utf-8') as f:
+            site_config = json.load(f)
+    except Exception as e:
+        print(f"读取站点配置文件时出错，无法检查分类: {e}")
+        return []
+    categories = [category["id"] for category in site_config.get("categories", [])]
+    # 刚修改过的文件，mtime 不足以区分之后的修改，不缓存
+    if signature and signature[0] < time.time_ns() - RACY_WINDOW_NS:
+        _categories_cache[site_config_path] = (signature, categories)
+    return list(categories)
+
+
+def schema_fingerprint(categories):
+    """结构定义与分类的指纹，用于判断缓存的验证结果是否仍然有效"""
+    data = json.dumps([SCHEMA_VERSION, PROJECT_SCHEMA, list(categories)], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+# 已编译的检查函数，按分类缓存（进程池的每个工作进程各自编译一次）
+_compiled = {}
+
+
+def get_validator(categories=None):
+    """获取编译好的检查函数，categories 为 None 时从站点配置读取"""
+    if categories is None:
+        categories = load_categories()
+    key = tuple(categories)
+    if key not in _compiled:
+        _compiled[key] = compile_schema(PROJECT_SCHEMA, key)
+    return _compiled[key]
+
+
+def validate_config(config, categories=None):
+    """按结构定义验证一个项目配置，返回问题列表"""
+    problems = []
+    get_validator(categories)(config, "", problems)
+    return problems
+
+
+def format_problem(problem):
+    """问题的单行描述"""
+    return f"{problem['path']}: {problem['message']}" if problem["path"] else problem["message"]
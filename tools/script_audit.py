@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+脚本加载审计
+
+统计主页和项目页面中的每个 <script>，并按 html_transform.py 的转换改写:
+
+  script-dedupe  删除重复引用的脚本和被取代的修复脚本（back-link-fix.js、back-link-fix-new.js
+                 已被 back-link-fix-mobile.js 取代；页面只引用旧版本时改为引用新版本）
+  script-defer   为可以安全延迟的外部脚本加上 defer；<head> 中不能延迟的外部脚本移到
+                 <body> 中第一个脚本之前，让它之前的内容先渲染
+
+延迟是否安全按文档顺序判断：defer 脚本在解析完成后按顺序执行，所以一个外部脚本只有在它之后的
+所有脚本都是 defer、async、模块脚本或同样可以延迟的外部脚本时才能延迟；之后有普通内联脚本时，
+内联脚本可能在解析时就使用它定义的全局变量。使用 document.write 的本地脚本和运行时生成样式的
+Tailwind CDN 保持原样（后者与其他脚本无关，不影响其他脚本的判断）。
+不使用 async：修复脚本等在 DOMContentLoaded 时初始化，async 脚本可能在该事件之后才执行。
+
+报告列出每个页面改写前后阻塞渲染的脚本数（<head> 中没有 defer/async 的外部脚本）
+和阻塞解析的脚本数（所有没有 defer/async 的外部脚本）。
+
+用法:
+  python tools/script_audit.py              # 改写页面并输出报告
+  python tools/script_audit.py --check      # 只输出报告，不改写
+  python tools/script_audit.py --json       # 以 JSON 输出报告
+  python tools/script_audit.py --dist       # 只改写发布目录（dist_build.py 的 scripts 阶段）
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from urllib.parse import unquote
+
+from fix_navigation import ROOT_DIR, HOMEPAGE, BACK_LINK_SCRIPT, find_project_pages
+from html_transform import Transform, TransformEngine
+from site_dist import DIST_DIR, mirror_site, iter_dist_files
+from utils import write_file_if_changed
+
+# 被取代的脚本（文件名 -> 取代它的文件名）
+SUPERSEDED_SCRIPTS = {
+    "back-link-fix.js": BACK_LINK_SCRIPT,
+    "back-link-fix-new.js": BACK_LINK_SCRIPT,
+}
+
+# 保持原位置和加载方式的脚本（运行时生成样式，延迟会导致无样式内容闪烁）
+KEEP_IN_PLACE_PATTERN = re.compile(r'cdn\.tailwindcss\.com|tailwind(\.min)?\.js', re.IGNORECASE)
+
+# 作为 JavaScript 执行的 type
+CLASSIC_TYPES = {"", "text/javascript", "application/javascript"}
+MODULE_TYPE = "module"
+
+SCRIPT_PATTERN = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.DOTALL)
+HEAD_END_PATTERN = re.compile(r'</head\s*>|<body\b', re.IGNORECASE)
+ATTR_PATTERN = re.compile(r'([\w:-]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+
+
+def parse_scripts(content):
+    """列出页面中的脚本（注释中的除外），返回按文档顺序排列的字典列表
+
+    字段: start/end（整个元素的位置）、tag_end（开始标签结束位置）、src、kind（classic/module/other）、
+    inline、defer、async、in_head
+    """
+    comments = [(m.start(), m.end()) for m in COMMENT_PATTERN.finditer(content)]
+    head_end = len(content)
+    for match in HEAD_END_PATTERN.finditer(content):
+        if not any(start <= match.start() < end for start, end in comments):
+            head_end = match.start()
+            break
+
+    scripts = []
+    for match in SCRIPT_PATTERN.finditer(content):
+        if any(start <= match.start() < end for start, end in comments):
+            continue
+        attrs = {}
+        for attr in ATTR_PATTERN.finditer(match.group(1)):
+            attrs.setdefault(attr.group(1).lower(), next((v for v in attr.group(2, 3, 4) if v is not None), ""))
+        script_type = attrs.get("type", "").strip().lower()
+        kind = "module" if script_type == MODULE_TYPE else "classic" if script_type in CLASSIC_TYPES else "other"
+        scripts.append({
+            "start": match.start(),
+            "end": match.end(),
+            "tag_end": match.end(1) + 1,
+            "src": attrs.get("src"),
+            "kind": kind,
+            "inline": "src" not in attrs,
+            "defer": "defer" in attrs,
+            "async": "async" in attrs,
+            "in_head": match.start() < head_end,
+        })
+    return scripts
+
+
+def is_blocking(script):
+    """没有 defer/async 的普通外部脚本会阻塞解析"""
+    return script["kind"] == "classic" and not script["inline"] and not script["defer"] and not script["async"]
+
+
+def count_blocking(content):
+    """返回 (阻塞渲染的脚本数, 阻塞解析的脚本数)"""
+    blocking = [script for script in parse_scripts(content) if is_blocking(script)]
+    return sum(script["in_head"] for script in blocking), len(blocking)
+
+
+def _script_name(src):
+    return unquote(src.split('?')[0].split('#')[0]).rstrip('/').rsplit('/', 1)[-1]
+
+
+def _line_span(content, start, end):
+    """元素独占一行时，扩展为整行（含换行）"""
+    line_start = content.rfind('\n', 0, start) + 1
+    line_end = content.find('\n', end)
+    line_end = len(content) if line_end < 0 else line_end + 1
+    if content[line_start:start].strip() or content[end:line_end].strip():
+        return start, end
+    return line_start, line_end
+
+
+def _apply_edits(content, edits):
+    """按 (start, end, replacement) 改写内容（位置互不重叠）"""
+    for start, end, replacement in sorted(edits, key=lambda edit: (edit[0], edit[1]), reverse=True):
+        content = f"{content[:start]}{replacement}{content[end:]}"
+    return content
+
+
+def dedupe_scripts(content, page):
+    """删除重复引用和被取代的脚本"""
+    scripts = [s for s in parse_scripts(content) if s["src"] and s["kind"] != "other"]
+    names = {_script_name(script["src"]) for script in scripts}
+    seen = set()
+    edits = []
+    for script in scripts:
+        src = script["src"].strip()
+        name = _script_name(src)
+        replacement = SUPERSEDED_SCRIPTS.get(name)
+        if replacement and replacement not in names:
+            # 只引用了旧版本：改为引用新版本
+            new_src = src[:len(src) - len(name)] + replacement if src.endswith(name) else None
+            if new_src and new_src not in seen:
+                tag = content[script["start"]:script["end"]].replace(src, new_src, 1)
+                edits.append((script["start"], script["end"], tag))
+                names.add(replacement)
+                seen.add(new_src)
+                continue
+        if replacement or src in seen:
+            edits.append((*_line_span(content, script["start"], script["end"]), ""))
+            continue
+        seen.add(src)
+    return _apply_edits(content, edits)
+
+
+def _uses_document_write(page, src):
+    """本地脚本是否使用 document.write（无法读取的脚本按不使用处理）"""
+    if src.startswith(('http:', 'https:', '//', 'data:')):
+        return False
+    path = os.path.join(ROOT_DIR, os.path.dirname(page), unquote(src.split('?')[0].split('#')[0]))
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return 'document.write' in f.read()
+    except OSError:
+        return False
+
+
+def defer_scripts(content, page):
+    """为可以安全延迟的外部脚本加上 defer，<head> 中不能延迟的外部脚本移到 <body> 中"""
+    scripts = [s for s in parse_scripts(content) if s["kind"] != "other"]
+
+    def can_change(script):
+        return (is_blocking(script) and not KEEP_IN_PLACE_PATTERN.search(script["src"])
+                and not _uses_document_write(page, script["src"]))
+
+    def transparent(script):
+        # 不阻塞其他脚本执行顺序的脚本
+        return (script["kind"] == "module" or script["defer"] or script["async"]
+                or (not script["inline"] and KEEP_IN_PLACE_PATTERN.search(script["src"])))
+
+    # 从后往前：之后的脚本全部会在解析完成后执行时，这个脚本才能延迟
+    deferrable = set()
+    for index in range(len(scripts) - 1, -1, -1):
+        script = scripts[index]
+        if transparent(script):
+            continue
+        if not can_change(script):
+            break
+        deferrable.add(index)
+
+    # <head> 中剩下的阻塞脚本：之后的 <head> 脚本都可以一起移动时，移到 <body> 中第一个脚本之前
+    movable = []
+    for index in range(len(scripts) - 1, -1, -1):
+        script = scripts[index]
+        if not script["in_head"] or index in deferrable:
+            continue
+        if transparent(script):
+            continue
+        if not can_change(script):
+            break
+        movable.insert(0, index)
+    anchor = next((s for s in scripts if not s["in_head"]), None)
+    if anchor is None:
+        movable = []
+
+    edits = []
+    for index in deferrable:
+        script = scripts[index]
+        start_tag = content[script["start"]:script["tag_end"]]
+        edits.append((script["start"], script["tag_end"], f"{start_tag[:-1].rstrip()} defer>"))
+    if movable:
+        line_start = content.rfind('\n', 0, anchor["start"]) + 1
+        indent = content[line_start:anchor["start"]]
+        if indent.strip():
+            line_start, indent = anchor["start"], ""
+        moved = "".join(f"{indent}{content[scripts[i]['start']:scripts[i]['end']]}\n" for i in movable)
+        for index in movable:
+            edits.append((*_line_span(content, scripts[index]["start"], scripts[index]["end"]), ""))
+        edits.append((line_start, line_start, moved))
+    return _apply_edits(content, edits)
+
+
+def _is_audited_page(page):
+    return page == HOMEPAGE or (page.startswith("projects/") and 'backup' not in page.lower())
+
+
+# 脚本加载的转换（按顺序应用），修改转换逻辑时递增版本号
+SCRIPT_TRANSFORMS = [
+    Transform("script-dedupe", 1, dedupe_scripts, _is_audited_page, "删除重复和被取代的脚本"),
+    Transform("script-defer", 1, defer_scripts, _is_audited_page, "延迟或移动阻塞渲染的脚本"),
+]
+
+
+def audit_page(before, page):
+    """统计并改写单个页面，返回 (改写前后的脚本数和阻塞数, 改写后的内容)"""
+    after = before
+    for transform in SCRIPT_TRANSFORMS:
+        after = transform.apply(after, page)
+    scripts_before = [s for s in parse_scripts(before) if s["kind"] != "other"]
+    scripts_after = [s for s in parse_scripts(after) if s["kind"] != "other"]
+    render_before, parser_before = count_blocking(before)
+    render_after, parser_after = count_blocking(after)
+    return {
+        "page": page,
+        "scripts": len(scripts_before),
+        "external": sum(not s["inline"] for s in scripts_before),
+        "removed": len(scripts_before) - len(scripts_after),
+        "render_blocking": [render_before, render_after],
+        "parser_blocking": [parser_before, parser_after],
+    }, after
+
+
+def rewrite_dist(dist_dir=DIST_DIR, mirror=True):
+    """改写发布目录中页面的脚本加载方式，返回每个页面的统计（发布目录每次镜像后重新改写，不使用清单）"""
+    if mirror:
+        stats = mirror_site(dist_dir)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+
+    results = []
+    for path in iter_dist_files(dist_dir, ('.html',)):
+        if not _is_audited_page(os.path.relpath(path, dist_dir).replace(os.sep, "/")):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"读取文件 {path} 时出错: {e}")
+            continue
+        # 相对于仓库根目录的路径，本地脚本从发布目录中读取
+        result, updated = audit_page(content, os.path.relpath(path, ROOT_DIR).replace(os.sep, "/"))
+        write_file_if_changed(path, updated)
+        results.append(result)
+    return results
+
+
+def print_report(results, verbose=True):
+    """输出审计报告（verbose 为 False 时只输出汇总）"""
+    if verbose:
+        print(f"{'页面':<52} {'脚本':>4} {'删除':>4} {'阻塞渲染':>8} {'阻塞解析':>8}")
+        for result in results:
+            render = "{} -> {}".format(*result["render_blocking"])
+            parser = "{} -> {}".format(*result["parser_blocking"])
+            print(f"{result['page'][:52]:<52} {result['scripts']:>4} {result['removed']:>4} {render:>10} {parser:>10}")
+        print()
+    totals = [sum(result[key][i] for result in results) for key in ("render_blocking", "parser_blocking") for i in (0, 1)]
+    print(f"页面: {len(results)}, 删除脚本引用: {sum(result['removed'] for result in results)}, "
+          f"阻塞渲染: {totals[0]} -> {totals[1]}, 阻塞解析: {totals[2]} -> {totals[3]}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='审计并改写页面的脚本加载方式')
+    parser.add_argument('--check', action='store_true', help='只输出报告，不改写页面')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出报告')
+    parser.add_argument('--dist', action='store_true', help='改写发布目录中的页面（不修改源文件）')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='并发改写的进程数，0 表示使用全部CPU核心（默认: 1）')
+    args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs 不能为负数")
+
+    if args.dist:
+        results = rewrite_dist(args.output, mirror=not args.no_mirror)
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+        else:
+            print_report(results)
+        return 0
+
+    paths = [ROOT_DIR / HOMEPAGE] + find_project_pages(all_pages=True)
+    engine = TransformEngine(SCRIPT_TRANSFORMS, ROOT_DIR, jobs=args.jobs)
+    results = []
+    for path in paths:
+        page = engine.page_name(path)
+        if not _is_audited_page(page):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                results.append(audit_page(f.read(), page)[0])
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"读取文件 {page} 时出错: {e}")
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_report(results)
+
+    if args.check:
+        return 0
+    engine.run(paths)
+    stats = engine.stats
+    if not args.json:
+        print(f"已改写 {stats['changed']} 个页面（跳过已是最新的 {stats['skipped']} 个，失败 {stats['failed']} 个）")
+    return 0 if stats["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
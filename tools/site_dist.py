@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站点发布目录
+
+把站点需要发布的文件（index.html、assets/、common/、js/、projects/）镜像到发布目录（默认 dist/），
+图片优化等构建阶段只改写发布目录中的文件，仓库中的源文件保持不变。
+
+镜像是增量的：只复制发布目录中不存在、或大小/修改时间与源文件不同的文件（复制时保留修改时间）。
+被构建阶段改写过的文件在下一次镜像时会恢复为源文件，再由构建阶段重新改写，结果可以重复。
+构建阶段额外生成的文件（例如 .webp）不会被镜像删除，需要时用 --clean 清空发布目录。
+
+用法:
+  python tools/site_dist.py            # 增量镜像到 dist/
+  python tools/site_dist.py --clean    # 清空 dist/ 后重新镜像
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+import argparse
+
+# 默认发布目录
+DIST_DIR = "dist"
+
+# 需要发布的站点文件和目录（相对于仓库根目录）
+SITE_ENTRIES = ["index.html", "assets", "common", "js", "projects"]
+
+# 不发布的文件
+IGNORED_NAMES = {".DS_Store", ".gitkeep", "Thumbs.db"}
+
+# 预压缩副本（dist_build.py 生成的 main.js.gz 等），其他构建阶段不把它们当作资源处理
+PRECOMPRESSED_EXTENSIONS = ('.gz', '.br')
+
+
+def file_sha256(path):
+    """计算文件内容哈希"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_site_files():
+    """遍历需要发布的源文件，返回相对路径"""
+    for entry in SITE_ENTRIES:
+        if os.path.isfile(entry):
+            yield entry
+        elif os.path.isdir(entry):
+            for root, dirs, files in os.walk(entry):
+                dirs.sort()
+                for name in sorted(files):
+                    if name not in IGNORED_NAMES:
+                        yield os.path.join(root, name)
+
+
+def iter_dist_files(dist_dir=DIST_DIR, extensions=None):
+    """遍历发布目录中的文件，extensions 为小写扩展名元组，例如 ('.html', '.css')"""
+    for root, dirs, files in os.walk(dist_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if extensions is None or name.lower().endswith(extensions):
+                yield os.path.join(root, name)
+
+
+def _is_same_file(source, target):
+    """按大小和修改时间判断目标文件是否与源文件一致"""
+    try:
+        source_stat = os.stat(source)
+        target_stat = os.stat(target)
+    except OSError:
+        return False
+    return (source_stat.st_size == target_stat.st_size
+            and source_stat.st_mtime_ns == target_stat.st_mtime_ns)
+
+
+def mirror_site(dist_dir=DIST_DIR, clean=False):
+    """把站点文件增量镜像到发布目录，返回 {"copied": 数量, "unchanged": 数量}"""
+    if clean and os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+
+    stats = {"copied": 0, "unchanged": 0}
+    for path in iter_site_files():
+        target = os.path.join(dist_dir, path)
+        if _is_same_file(path, target):
+            stats["unchanged"] += 1
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # 去重阶段创建的硬链接先断开，避免复制时改写链接到同一数据的其他文件
+        if os.path.exists(target) and os.stat(target).st_nlink > 1:
+            os.remove(target)
+        shutil.copy2(path, target)
+        stats["copied"] += 1
+    return stats
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='把站点文件镜像到发布目录')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--clean', action='store_true', help='清空发布目录后重新镜像')
+    args = parser.parse_args()
+
+    stats = mirror_site(args.output, args.clean)
+    print(f"镜像完成! 复制: {stats['copied']}, 未变化: {stats['unchanged']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
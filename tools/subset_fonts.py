@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自托管的 Noto Sans SC 子集字体
+
+主页、项目详情页和部分项目从 Google Fonts 加载 Noto Sans SC，中文字体会按 unicode-range
+拆成上百个分片，每个字重都要从第三方下载。本工具在发布目录（默认 dist/，见 site_dist.py）中:
+
+  1. 找出通过 <link> 加载 Noto Sans SC 的页面，以及页面用到的字重
+  2. 收集这些页面实际用到的字符（页面本身和页面引用的本地 JS/CSS 中的文字，另加 ASCII 和常用标点）
+  3. 用本地的 Noto Sans SC 字体文件按字重生成只包含这些字形的 WOFF2，写入 common/fonts/，
+     并生成带 font-display: swap 的 @font-face 样式表
+  4. 把页面中的 Google Fonts 链接改为本地样式表（链接中还有其他字体族时只去掉 Noto Sans SC），
+     页面不再使用 Google Fonts 时删除对应的 preconnect；Service Worker 中缓存的同一地址一并改写
+
+本地字体文件放在 tools/fonts/（或用 --font-dir 指定），可以是按字重拆分的静态字体
+（NotoSansSC-Regular.otf、NotoSansSC-Bold.otf 等，缺少的字重使用最接近的字重），
+也可以是可变字体（NotoSansSC[wght].ttf 或 NotoSansSC-VariableFont_wght.ttf，生成一个覆盖全部字重的文件）。
+子集结果按「字体文件 + 字符集」的哈希缓存在 tools/.cache/fonts/ 中。
+
+需要 fontTools 和 brotli（pip install fonttools brotli）；没有 brotli 时生成 WOFF。
+
+用法:
+  python tools/subset_fonts.py                  # 镜像站点到 dist/ 并生成子集字体
+  python tools/subset_fonts.py --no-mirror      # 在已有的 dist/ 上处理
+  python tools/subset_fonts.py --font-dir ~/fonts/NotoSansSC
+"""
+
+import os
+import re
+import sys
+import glob
+import hashlib
+import argparse
+from urllib.parse import unquote
+
+try:
+    from fontTools import subset
+except ImportError:
+    subset = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from project_catalog import CACHE_DIR
+from site_dist import DIST_DIR, mirror_site, iter_dist_files, file_sha256
+from utils import write_file_if_changed
+
+# 字体族
+FAMILY = "Noto Sans SC"
+FAMILY_PARAM = FAMILY.replace(" ", "+")
+FILE_PREFIX = "NotoSansSC"
+OUTPUT_PREFIX = "noto-sans-sc"
+
+# 本地字体文件目录
+DEFAULT_FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+
+# 输出目录（相对于发布目录）
+FONTS_DIR = os.path.join("common", "fonts")
+
+# 子集结果缓存目录
+FONT_CACHE_DIR = os.path.join(CACHE_DIR, "fonts")
+
+# 子集化规则变化时递增，使缓存失效
+SUBSET_VERSION = 1
+
+# 静态字体文件名中的字重
+WEIGHT_NAMES = {
+    100: "Thin", 200: "ExtraLight", 300: "Light", 400: "Regular", 500: "Medium",
+    600: "SemiBold", 700: "Bold", 800: "ExtraBold", 900: "Black",
+}
+FONT_EXTENSIONS = ("otf", "ttf", "woff2", "woff")
+VARIABLE_PATTERNS = [f"{FILE_PREFIX}[[]wght[]].*", f"{FILE_PREFIX}-VariableFont_wght.*"]
+
+# 总是包含的字符：可打印 ASCII 和常用中文标点
+BASE_CHARACTERS = ''.join(chr(code) for code in range(0x20, 0x7f)) + "，。！？、：；“”‘’（）《》【】…—·～「」"
+
+GOOGLE_FONTS_LINK_PATTERN = re.compile(
+    r'<link\b[^>]*href\s*=\s*(["\'])(https://fonts\.googleapis\.com/css2?\?[^"\']*)\1[^>]*>', re.IGNORECASE
+)
+PRECONNECT_PATTERN = re.compile(
+    r'[ \t]*<link\b[^>]*rel\s*=\s*["\']?(?:preconnect|dns-prefetch)["\']?[^>]*'
+    r'href\s*=\s*["\']https://fonts\.(?:googleapis|gstatic)\.com/?["\'][^>]*>[ \t]*\n?',
+    re.IGNORECASE
+)
+LOCAL_REFERENCE_PATTERN = re.compile(r'<(?:script|link)\b[^>]*(?:src|href)\s*=\s*["\']([^"\':]+?)["\']', re.IGNORECASE)
+
+
+def parse_family_query(url):
+    """拆分 Google Fonts 地址，返回 (地址前缀, [family 参数], [其他参数])"""
+    base, _, query = url.partition("?")
+    families = []
+    others = []
+    for param in query.replace("&amp;", "&").split("&"):
+        if param.startswith("family="):
+            families.append(param[len("family="):])
+        elif param:
+            others.append(param)
+    return base, families, others
+
+
+def family_weights(family_param):
+    """Noto+Sans+SC:wght@400;700 -> [400, 700]（没有指定字重时为 [400]）"""
+    _, _, axes = family_param.partition(":")
+    if "@" not in axes:
+        return [400]
+    weights = set()
+    for value in axes.partition("@")[2].split(";"):
+        value = value.split(",")[-1]
+        if ".." in value:
+            start, end = (int(v) for v in value.split(".."))
+            weights.update(weight for weight in WEIGHT_NAMES if start <= weight <= end)
+        elif value.isdigit():
+            weights.add(int(value))
+    return sorted(weights) or [400]
+
+
+def find_font_files(font_dir):
+    """查找本地字体文件，返回 ("variable", 路径) 或 ("static", {字重: 路径})，找不到时返回 None"""
+    for pattern in VARIABLE_PATTERNS:
+        matches = sorted(glob.glob(os.path.join(font_dir, pattern)))
+        if matches:
+            return "variable", matches[0]
+    static = {}
+    for weight, name in WEIGHT_NAMES.items():
+        for ext in FONT_EXTENSIONS:
+            path = os.path.join(font_dir, f"{FILE_PREFIX}-{name}.{ext}")
+            if os.path.isfile(path):
+                static[weight] = path
+                break
+    return ("static", static) if static else None
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return ""
+
+
+def find_font_pages(dist_dir):
+    """找出加载 Noto Sans SC 的页面，返回 {页面路径: [字重]}"""
+    pages = {}
+    for path in iter_dist_files(dist_dir, ('.html', '.htm')):
+        weights = set()
+        for match in GOOGLE_FONTS_LINK_PATTERN.finditer(_read_text(path)):
+            for family in parse_family_query(match.group(2))[1]:
+                if family.split(":")[0] == FAMILY_PARAM:
+                    weights.update(family_weights(family))
+        if weights:
+            pages[path] = sorted(weights)
+    return pages
+
+
+def collect_characters(pages):
+    """收集页面及其引用的本地 JS/CSS 中出现的字符"""
+    characters = set(BASE_CHARACTERS)
+    for page in pages:
+        html = _read_text(page)
+        characters.update(html)
+        for url in LOCAL_REFERENCE_PATTERN.findall(html):
+            path = os.path.join(os.path.dirname(page), unquote(url.split("?")[0].split("#")[0]))
+            if path.lower().endswith(('.js', '.mjs', '.css')) and os.path.isfile(path):
+                characters.update(_read_text(path))
+    return ''.join(sorted(c for c in characters if c.isprintable() or c == ' '))
+
+
+def subset_font(source, characters, cache_dir=FONT_CACHE_DIR):
+    """生成子集字体，返回 (字体数据, 格式)"""
+    flavor = "woff2" if brotli is not None else "woff"
+    key = f"{SUBSET_VERSION}\0{file_sha256(source)}\0{flavor}\0{characters}"
+    cache_path = os.path.join(cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + f".{flavor}")
+    if os.path.isfile(cache_path):
+        with open(cache_path, 'rb') as f:
+            return f.read(), flavor
+
+    options = subset.Options()
+    options.flavor = flavor
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    font = subset.load_font(source, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=characters)
+    subsetter.subset(font)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    subset.save_font(font, tmp_path, options)
+    os.replace(tmp_path, cache_path)
+    with open(cache_path, 'rb') as f:
+        return f.read(), flavor
+
+
+def build_font_files(dist_dir, fonts, weights, characters):
+    """生成子集字体和样式表，返回样式表路径"""
+    output_dir = os.path.join(dist_dir, FONTS_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    kind, files = fonts
+    if kind == "variable":
+        faces = [(f"{min(weights)} {max(weights)}" if len(weights) > 1 else str(weights[0]), files, "variable")]
+    else:
+        # 缺少的字重使用最接近的静态字体
+        faces = []
+        for weight in weights:
+            nearest = min(files, key=lambda available: (abs(available - weight), available))
+            faces.append((str(weight), files[nearest], str(nearest)))
+
+    written = set()
+    rules = []
+    for weight, source, label in faces:
+        data, flavor = subset_font(source, characters)
+        name = f"{OUTPUT_PREFIX}-{label}.{hashlib.sha256(data).hexdigest()[:10]}.{flavor}"
+        target = os.path.join(output_dir, name)
+        if name not in written and not os.path.isfile(target):
+            with open(target, 'wb') as f:
+                f.write(data)
+        written.add(name)
+        rules.append(
+            "@font-face {\n"
+            f"  font-family: '{FAMILY}';\n"
+            "  font-style: normal;\n"
+            f"  font-weight: {weight};\n"
+            "  font-display: swap;\n"
+            f"  src: url('{name}') format('{flavor}');\n"
+            "}\n"
+        )
+
+    css = "".join(rules)
+    css_name = f"{OUTPUT_PREFIX}.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]}.css"
+    write_file_if_changed(os.path.join(output_dir, css_name), css)
+    written.add(css_name)
+
+    # 删除上一次生成、本次不再使用的文件
+    for name in os.listdir(output_dir):
+        if name.startswith(f"{OUTPUT_PREFIX}") and name not in written:
+            os.remove(os.path.join(output_dir, name))
+    return os.path.join(output_dir, css_name)
+
+
+def _local_url(target, document):
+    return os.path.relpath(target, os.path.dirname(document)).replace(os.sep, "/")
+
+
+def rewrite_page(path, stylesheet):
+    """把页面中的 Noto Sans SC 链接改为本地样式表，返回 {原地址: 新地址}（只包含整体替换的地址）"""
+    html = _read_text(path)
+    local = _local_url(stylesheet, path)
+    replaced = {}
+
+    def replace_link(match):
+        url = match.group(2)
+        base, families, others = parse_family_query(url)
+        remaining = [family for family in families if family.split(":")[0] != FAMILY_PARAM]
+        if len(remaining) == len(families):
+            return match.group(0)
+        if not remaining:
+            replaced[url] = local
+            return match.group(0).replace(url, local)
+        # 链接中还有其他字体族：保留 Google Fonts 链接，另外加载本地样式表
+        separator = "&amp;" if "&amp;" in url else "&"
+        reduced = f"{base}?" + separator.join([f"family={family}" for family in remaining] + others)
+        return f'{match.group(0).replace(url, reduced)}\n    <link rel="stylesheet" href="{local}">'
+
+    new_html = GOOGLE_FONTS_LINK_PATTERN.sub(replace_link, html)
+    if "fonts.googleapis.com/css" not in PRECONNECT_PATTERN.sub("", new_html):
+        new_html = PRECONNECT_PATTERN.sub("", new_html)
+    write_file_if_changed(path, new_html)
+    return replaced
+
+
+def rewrite_scripts(page, replaced):
+    """改写页面所在目录中 JS（Service Worker 等）里缓存的同一地址"""
+    rewritten = 0
+    for path in iter_dist_files(os.path.dirname(page), ('.js', '.mjs')):
+        content = _read_text(path)
+        new_content = content
+        for url, local in replaced.items():
+            if url in new_content:
+                target = os.path.normpath(os.path.join(os.path.dirname(page), local))
+                new_content = new_content.replace(url, _local_url(target, path))
+        if new_content != content and write_file_if_changed(path, new_content):
+            rewritten += 1
+    return rewritten
+
+
+def subset_fonts(dist_dir=DIST_DIR, font_dir=DEFAULT_FONT_DIR, mirror=True):
+    """生成子集字体并改写页面，返回是否成功"""
+    if subset is None:
+        print("字体子集化需要 fontTools，请先安装: pip install fonttools brotli")
+        return False
+    fonts = find_font_files(font_dir)
+    if fonts is None:
+        print(f"找不到 {FAMILY} 字体文件: 请把 {FILE_PREFIX}-Regular.otf 等静态字体或 {FILE_PREFIX}[wght].ttf 放到 {font_dir}")
+        return False
+    if brotli is None:
+        print("生成 WOFF2 需要 brotli，请先安装: pip install brotli（本次生成 WOFF）")
+
+    if mirror:
+        stats = mirror_site(dist_dir)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+
+    pages = find_font_pages(dist_dir)
+    if not pages:
+        print(f"处理完成! 没有页面从 Google Fonts 加载 {FAMILY}")
+        return True
+
+    weights = sorted({weight for page_weights in pages.values() for weight in page_weights})
+    characters = collect_characters(pages)
+    try:
+        stylesheet = build_font_files(dist_dir, fonts, weights, characters)
+    except Exception as e:
+        print(f"生成子集字体时出错: {e}")
+        return False
+
+    scripts = 0
+    for page in sorted(pages):
+        replaced = rewrite_page(page, stylesheet)
+        if replaced:
+            scripts += rewrite_scripts(page, replaced)
+
+    output_dir = os.path.join(dist_dir, FONTS_DIR)
+    font_bytes = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir)
+                     if name.startswith(OUTPUT_PREFIX) and not name.endswith(".css"))
+    print(f"处理完成! 页面: {len(pages)}, 字符: {len(characters)}, 字重: {', '.join(map(str, weights))}, "
+          f"字体文件共 {font_bytes / 1024:.0f} KB, 改写脚本: {scripts}")
+    return True
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description=f'为发布目录生成自托管的 {FAMILY} 子集字体')
+    parser.add_argument('--font-dir', default=DEFAULT_FONT_DIR, help=f'本地字体文件目录（默认: {DEFAULT_FONT_DIR}）')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    args = parser.parse_args()
+
+    ok = subset_fonts(args.output, args.font_dir, mirror=not args.no_mirror)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
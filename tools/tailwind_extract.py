@@ -0,0 +1,893 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tailwind 工具类构建时提取
+
+部分项目页面通过 <script src="https://cdn.tailwindcss.com"> 在浏览器中实时编译 Tailwind，
+每次打开页面都要下载体积很大的编译器并在首次渲染前生成样式。本工具在构建时完成这一步:
+扫描页面 HTML 和项目 JS 中出现的类名，为其中的 Tailwind 工具类生成静态 CSS（包含 Tailwind 的
+基础样式 Preflight），写入项目目录下的 tailwind.css，并把发布目录（默认 dist/，见 site_dist.py）
+中页面的 CDN 脚本替换为 <link>。
+
+只实现了本仓库用到的 Tailwind v3 工具类子集（间距、尺寸、Flex/Grid、排版、颜色、边框、阴影、
+渐变、透明度、光标等，支持 hover:/focus:/sm: 等变体、!important、/透明度 和 [任意值]）。
+页面的 class 中出现无法生成、也不是页面自定义样式的工具类，或者页面使用了 tailwind.config /
+<style type="text/tailwindcss"> 时，该页面保留 CDN 脚本并在输出中列出原因。
+
+生成的 <link> 插入在 </head> 之前，与 CDN 脚本注入 <style> 的位置一致，页面自身样式与
+Tailwind 样式的层叠顺序保持不变。
+
+用法:
+  python tools/tailwind_extract.py               # 镜像站点到 dist/ 并替换 Tailwind CDN
+  python tools/tailwind_extract.py --no-mirror   # 在已有的 dist/ 上处理
+"""
+
+import os
+import re
+import sys
+import argparse
+
+from project_catalog import get_catalog
+from site_dist import DIST_DIR, mirror_site
+from utils import write_file_if_changed
+
+# 生成的样式文件名（位于项目目录下）
+OUTPUT_NAME = "tailwind.css"
+
+# Tailwind CDN 脚本
+CDN_SCRIPT_PATTERN = re.compile(
+    r'[ \t]*<script\b[^>]*\bsrc\s*=\s*["\']https?://cdn\.tailwindcss\.com[^"\']*["\'][^>]*>\s*</script>[ \t]*\n?',
+    re.IGNORECASE
+)
+UNSUPPORTED_CONFIG_PATTERN = re.compile(r'tailwind\.config\s*=|type\s*=\s*["\']text/tailwindcss["\']')
+
+# 类名候选（与 Tailwind 扫描源文件的方式相同：按引号、空白和尖括号切分）
+CANDIDATE_PATTERN = re.compile(r'[^<>"\'`\s]*[^<>"\'`\s:]')
+CLASS_ATTRIBUTE_PATTERN = re.compile(
+    r'\bclass(?:Name)?\s*=\s*(["\'`])(.*?)\1|classList\.(?:add|remove|toggle)\(([^)]*)\)', re.DOTALL
+)
+CSS_CLASS_PATTERN = re.compile(r'\.(-?[_a-zA-Z][_a-zA-Z0-9-]*)')
+
+# Preflight（Tailwind v3 基础样式）
+PREFLIGHT = """*, ::before, ::after {
+  box-sizing: border-box;
+  border-width: 0;
+  border-style: solid;
+  border-color: #e5e7eb;
+}
+::before, ::after {
+  --tw-content: '';
+}
+html, :host {
+  line-height: 1.5;
+  -webkit-text-size-adjust: 100%;
+  -moz-tab-size: 4;
+  tab-size: 4;
+  font-family: ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";
+  font-feature-settings: normal;
+  font-variation-settings: normal;
+  -webkit-tap-highlight-color: transparent;
+}
+body {
+  margin: 0;
+  line-height: inherit;
+}
+hr {
+  height: 0;
+  color: inherit;
+  border-top-width: 1px;
+}
+abbr:where([title]) {
+  text-decoration: underline dotted;
+}
+h1, h2, h3, h4, h5, h6 {
+  font-size: inherit;
+  font-weight: inherit;
+}
+a {
+  color: inherit;
+  text-decoration: inherit;
+}
+b, strong {
+  font-weight: bolder;
+}
+code, kbd, samp, pre {
+  font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace;
+  font-size: 1em;
+}
+small {
+  font-size: 80%;
+}
+sub, sup {
+  font-size: 75%;
+  line-height: 0;
+  position: relative;
+  vertical-align: baseline;
+}
+sub {
+  bottom: -0.25em;
+}
+sup {
+  top: -0.5em;
+}
+table {
+  text-indent: 0;
+  border-color: inherit;
+  border-collapse: collapse;
+}
+button, input, optgroup, select, textarea {
+  font-family: inherit;
+  font-feature-settings: inherit;
+  font-variation-settings: inherit;
+  font-size: 100%;
+  font-weight: inherit;
+  line-height: inherit;
+  letter-spacing: inherit;
+  color: inherit;
+  margin: 0;
+  padding: 0;
+}
+button, select {
+  text-transform: none;
+}
+button, input:where([type='button']), input:where([type='reset']), input:where([type='submit']) {
+  -webkit-appearance: button;
+  background-color: transparent;
+  background-image: none;
+}
+:-moz-focusring {
+  outline: auto;
+}
+:-moz-ui-invalid {
+  box-shadow: none;
+}
+progress {
+  vertical-align: baseline;
+}
+::-webkit-inner-spin-button, ::-webkit-outer-spin-button {
+  height: auto;
+}
+[type='search'] {
+  -webkit-appearance: textfield;
+  outline-offset: -2px;
+}
+::-webkit-search-decoration {
+  -webkit-appearance: none;
+}
+::-webkit-file-upload-button {
+  -webkit-appearance: button;
+  font: inherit;
+}
+summary {
+  display: list-item;
+}
+blockquote, dl, dd, h1, h2, h3, h4, h5, h6, hr, figure, p, pre {
+  margin: 0;
+}
+fieldset {
+  margin: 0;
+  padding: 0;
+}
+legend {
+  padding: 0;
+}
+ol, ul, menu {
+  list-style: none;
+  margin: 0;
+  padding: 0;
+}
+dialog {
+  padding: 0;
+}
+textarea {
+  resize: vertical;
+}
+input::placeholder, textarea::placeholder {
+  opacity: 1;
+  color: #9ca3af;
+}
+button, [role="button"] {
+  cursor: pointer;
+}
+:disabled {
+  cursor: default;
+}
+img, svg, video, canvas, audio, iframe, embed, object {
+  display: block;
+  vertical-align: middle;
+}
+img, video {
+  max-width: 100%;
+  height: auto;
+}
+[hidden] {
+  display: none;
+}
+"""
+
+# 调色板（Tailwind v3 默认值的子集）
+COLORS = {
+    "slate": {"50": "#f8fafc", "100": "#f1f5f9", "200": "#e2e8f0", "300": "#cbd5e1", "400": "#94a3b8",
+              "500": "#64748b", "600": "#475569", "700": "#334155", "800": "#1e293b", "900": "#0f172a",
+              "950": "#020617"},
+    "gray": {"50": "#f9fafb", "100": "#f3f4f6", "200": "#e5e7eb", "300": "#d1d5db", "400": "#9ca3af",
+             "500": "#6b7280", "600": "#4b5563", "700": "#374151", "800": "#1f2937", "900": "#111827",
+             "950": "#030712"},
+    "red": {"50": "#fef2f2", "100": "#fee2e2", "200": "#fecaca", "300": "#fca5a5", "400": "#f87171",
+            "500": "#ef4444", "600": "#dc2626", "700": "#b91c1c", "800": "#991b1b", "900": "#7f1d1d",
+            "950": "#450a0a"},
+    "sky": {"50": "#f0f9ff", "100": "#e0f2fe", "200": "#bae6fd", "300": "#7dd3fc", "400": "#38bdf8",
+            "500": "#0ea5e9", "600": "#0284c7", "700": "#0369a1", "800": "#075985", "900": "#0c4a6e",
+            "950": "#082f49"},
+    "blue": {"50": "#eff6ff", "100": "#dbeafe", "200": "#bfdbfe", "300": "#93c5fd", "400": "#60a5fa",
+             "500": "#3b82f6", "600": "#2563eb", "700": "#1d4ed8", "800": "#1e40af", "900": "#1e3a8a",
+             "950": "#172554"},
+    "purple": {"50": "#faf5ff", "100": "#f3e8ff", "200": "#e9d5ff", "300": "#d8b4fe", "400": "#c084fc",
+               "500": "#a855f7", "600": "#9333ea", "700": "#7e22ce", "800": "#6b21a8", "900": "#581c87",
+               "950": "#3b0764"},
+}
+SPECIAL_COLORS = {"white": "#ffffff", "black": "#000000", "transparent": "transparent",
+                  "current": "currentColor", "inherit": "inherit"}
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"), "sm": ("0.875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem"), "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"), "7xl": ("4.5rem", "1"), "8xl": ("6rem", "1"), "9xl": ("8rem", "1"),
+}
+FONT_WEIGHTS = {"thin": "100", "extralight": "200", "light": "300", "normal": "400", "medium": "500",
+                "semibold": "600", "bold": "700", "extrabold": "800", "black": "900"}
+FONT_FAMILIES = {
+    "sans": 'ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", '
+            '"Noto Color Emoji"',
+    "serif": 'ui-serif, Georgia, Cambria, "Times New Roman", Times, serif',
+    "mono": 'ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace',
+}
+TRACKING = {"tighter": "-0.05em", "tight": "-0.025em", "normal": "0em", "wide": "0.025em",
+            "wider": "0.05em", "widest": "0.1em"}
+LEADING = {"none": "1", "tight": "1.25", "snug": "1.375", "normal": "1.5", "relaxed": "1.625", "loose": "2"}
+RADIUS = {"none": "0px", "sm": "0.125rem", "": "0.25rem", "md": "0.375rem", "lg": "0.5rem", "xl": "0.75rem",
+          "2xl": "1rem", "3xl": "1.5rem", "full": "9999px"}
+RADIUS_SIDES = {"": ["border-radius"],
+                "t": ["border-top-left-radius", "border-top-right-radius"],
+                "r": ["border-top-right-radius", "border-bottom-right-radius"],
+                "b": ["border-bottom-right-radius", "border-bottom-left-radius"],
+                "l": ["border-top-left-radius", "border-bottom-left-radius"],
+                "tl": ["border-top-left-radius"], "tr": ["border-top-right-radius"],
+                "br": ["border-bottom-right-radius"], "bl": ["border-bottom-left-radius"]}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "inner": "inset 0 2px 4px 0 rgb(0 0 0 / 0.05)",
+    "none": "0 0 #0000",
+}
+MAX_WIDTHS = {"none": "none", "xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem",
+              "2xl": "42rem", "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem",
+              "full": "100%", "min": "min-content", "max": "max-content", "fit": "fit-content",
+              "prose": "65ch", "screen-sm": "640px", "screen-md": "768px", "screen-lg": "1024px",
+              "screen-xl": "1280px", "screen-2xl": "1536px"}
+GRADIENT_DIRECTIONS = {"t": "to top", "tr": "to top right", "r": "to right", "br": "to bottom right",
+                       "b": "to bottom", "bl": "to bottom left", "l": "to left", "tl": "to top left"}
+EASINGS = {"linear": "linear", "in": "cubic-bezier(0.4, 0, 1, 1)", "out": "cubic-bezier(0, 0, 0.2, 1)",
+           "in-out": "cubic-bezier(0.4, 0, 0.2, 1)"}
+TRANSITION_PROPERTIES = {
+    "": "color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, "
+        "transform, filter, backdrop-filter",
+    "all": "all",
+    "colors": "color, background-color, border-color, text-decoration-color, fill, stroke",
+    "opacity": "opacity",
+    "shadow": "box-shadow",
+    "transform": "transform",
+    "none": "none",
+}
+
+# 没有参数的工具类
+STATIC_UTILITIES = {
+    # 显示和定位
+    "block": "display: block", "inline-block": "display: inline-block", "inline": "display: inline",
+    "flex": "display: flex", "inline-flex": "display: inline-flex", "grid": "display: grid",
+    "inline-grid": "display: inline-grid", "table": "display: table", "contents": "display: contents",
+    "hidden": "display: none",
+    "static": "position: static", "fixed": "position: fixed", "absolute": "position: absolute",
+    "relative": "position: relative", "sticky": "position: sticky",
+    "visible": "visibility: visible", "invisible": "visibility: hidden",
+    "overflow-auto": "overflow: auto", "overflow-hidden": "overflow: hidden",
+    "overflow-visible": "overflow: visible", "overflow-scroll": "overflow: scroll",
+    "overflow-x-auto": "overflow-x: auto", "overflow-x-hidden": "overflow-x: hidden",
+    "overflow-x-scroll": "overflow-x: scroll", "overflow-y-auto": "overflow-y: auto",
+    "overflow-y-hidden": "overflow-y: hidden", "overflow-y-scroll": "overflow-y: scroll",
+    "isolate": "isolation: isolate",
+    # Flex 和 Grid
+    "flex-row": "flex-direction: row", "flex-row-reverse": "flex-direction: row-reverse",
+    "flex-col": "flex-direction: column", "flex-col-reverse": "flex-direction: column-reverse",
+    "flex-wrap": "flex-wrap: wrap", "flex-wrap-reverse": "flex-wrap: wrap-reverse",
+    "flex-nowrap": "flex-wrap: nowrap",
+    "flex-1": "flex: 1 1 0%", "flex-auto": "flex: 1 1 auto", "flex-initial": "flex: 0 1 auto",
+    "flex-none": "flex: none",
+    "flex-grow": "flex-grow: 1", "flex-grow-0": "flex-grow: 0", "grow": "flex-grow: 1", "grow-0": "flex-grow: 0",
+    "flex-shrink": "flex-shrink: 1", "flex-shrink-0": "flex-shrink: 0", "shrink": "flex-shrink: 1",
+    "shrink-0": "flex-shrink: 0",
+    "items-start": "align-items: flex-start", "items-end": "align-items: flex-end",
+    "items-center": "align-items: center", "items-baseline": "align-items: baseline",
+    "items-stretch": "align-items: stretch",
+    "justify-start": "justify-content: flex-start", "justify-end": "justify-content: flex-end",
+    "justify-center": "justify-content: center", "justify-between": "justify-content: space-between",
+    "justify-around": "justify-content: space-around", "justify-evenly": "justify-content: space-evenly",
+    "self-auto": "align-self: auto", "self-start": "align-self: flex-start", "self-end": "align-self: flex-end",
+    "self-center": "align-self: center", "self-stretch": "align-self: stretch",
+    "place-items-center": "place-items: center", "place-content-center": "place-content: center",
+    # 排版
+    "text-left": "text-align: left", "text-center": "text-align: center", "text-right": "text-align: right",
+    "text-justify": "text-align: justify",
+    "italic": "font-style: italic", "not-italic": "font-style: normal",
+    "uppercase": "text-transform: uppercase", "lowercase": "text-transform: lowercase",
+    "capitalize": "text-transform: capitalize", "normal-case": "text-transform: none",
+    "underline": "text-decoration-line: underline", "line-through": "text-decoration-line: line-through",
+    "no-underline": "text-decoration-line: none",
+    "truncate": "overflow: hidden; text-overflow: ellipsis; white-space: nowrap",
+    "whitespace-normal": "white-space: normal", "whitespace-nowrap": "white-space: nowrap",
+    "whitespace-pre": "white-space: pre", "whitespace-pre-line": "white-space: pre-line",
+    "whitespace-pre-wrap": "white-space: pre-wrap",
+    "break-words": "overflow-wrap: break-word", "break-all": "word-break: break-all",
+    "list-none": "list-style-type: none", "list-disc": "list-style-type: disc",
+    "list-decimal": "list-style-type: decimal", "list-inside": "list-style-position: inside",
+    "list-outside": "list-style-position: outside",
+    "antialiased": "-webkit-font-smoothing: antialiased; -moz-osx-font-smoothing: grayscale",
+    "select-none": "user-select: none", "select-text": "user-select: text", "select-all": "user-select: all",
+    # 边框
+    "border-solid": "border-style: solid", "border-dashed": "border-style: dashed",
+    "border-dotted": "border-style: dotted", "border-none": "border-style: none",
+    # 交互
+    "pointer-events-none": "pointer-events: none", "pointer-events-auto": "pointer-events: auto",
+    "outline-none": "outline: 2px solid transparent; outline-offset: 2px",
+    "object-cover": "object-fit: cover", "object-contain": "object-fit: contain",
+    "bg-cover": "background-size: cover", "bg-contain": "background-size: contain",
+    "bg-center": "background-position: center", "bg-no-repeat": "background-repeat: no-repeat",
+}
+
+# 带参数的工具类根名（用于识别页面中无法生成的工具类）
+UTILITY_ROOTS = (
+    "p", "px", "py", "pt", "pr", "pb", "pl", "m", "mx", "my", "mt", "mr", "mb", "ml", "space", "gap",
+    "w", "h", "min", "max", "inset", "top", "right", "bottom", "left", "z", "text", "font", "tracking",
+    "leading", "bg", "from", "via", "to", "border", "rounded", "shadow", "opacity", "cursor", "transition",
+    "duration", "ease", "delay", "grid", "col", "row", "order", "drop", "blur", "scale", "rotate",
+    "translate", "backdrop", "ring", "outline", "aspect", "object", "overflow", "flex", "items", "justify",
+    "self", "place", "list", "whitespace", "decoration", "fill", "stroke", "animate", "select",
+)
+
+# 变体：状态伪类和响应式断点
+PSEUDO_VARIANTS = {
+    "hover": ":hover", "focus": ":focus", "focus-within": ":focus-within", "focus-visible": ":focus-visible",
+    "active": ":active", "visited": ":visited", "disabled": ":disabled", "checked": ":checked",
+    "first": ":first-child", "last": ":last-child", "odd": ":nth-child(odd)", "even": ":nth-child(even)",
+    "placeholder": "::placeholder",
+}
+GROUP_VARIANTS = {"group-hover": ":hover", "group-focus": ":focus"}
+SCREENS = {"sm": "640px", "md": "768px", "lg": "1024px", "xl": "1280px", "2xl": "1536px"}
+
+
+def _arbitrary(value):
+    """[...] 任意值，下划线表示空格"""
+    if value.startswith('[') and value.endswith(']') and len(value) > 2:
+        return value[1:-1].replace('_', ' ')
+    return None
+
+
+def _number(value):
+    """把数值格式化为 CSS 中的简洁写法"""
+    return f"{value:g}"
+
+
+def spacing(value, negative=False, allow_auto=False, allow_fraction=False):
+    """间距值：数字按 0.25rem 递增，px、auto、分数和任意值"""
+    result = _arbitrary(value)
+    if result is None:
+        if value == "px":
+            result = "1px"
+        elif value == "0":
+            result = "0px"
+        elif re.fullmatch(r'\d+(\.5)?', value):
+            result = f"{_number(float(value) * 0.25)}rem"
+        elif value == "auto" and allow_auto and not negative:
+            return "auto"
+        elif value == "full" and allow_fraction:
+            result = "100%"
+        elif allow_fraction and re.fullmatch(r'\d+/\d+', value):
+            numerator, denominator = value.split('/')
+            if int(denominator) == 0:
+                return None
+            result = f"{_number(round(int(numerator) / int(denominator) * 100, 6))}%"
+        else:
+            return None
+    if negative:
+        return f"calc({result} * -1)" if result.startswith(('var(', 'calc(')) else f"-{result}"
+    return result
+
+
+def _hex_to_rgb(color):
+    color = color.lstrip('#')
+    if len(color) in (3, 4):
+        color = ''.join(c * 2 for c in color[:3])
+    if len(color) not in (6, 8) or not re.fullmatch(r'[0-9a-fA-F]+', color):
+        return None
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def color(value):
+    """颜色值，支持 调色板-色阶、特殊颜色、/透明度 和 [任意值]"""
+    value, _, opacity = value.partition('/')
+    alpha = None
+    if opacity:
+        alpha = _arbitrary(opacity)
+        if alpha is None:
+            if not opacity.isdigit():
+                return None
+            alpha = _number(int(opacity) / 100)
+
+    base = _arbitrary(value)
+    if base is None:
+        if value in SPECIAL_COLORS:
+            base = SPECIAL_COLORS[value]
+        else:
+            name, _, shade = value.rpartition('-')
+            base = COLORS.get(name, {}).get(shade)
+            if base is None:
+                return None
+    elif not re.match(r'#|rgb|hsl|var\(', base):
+        return None
+
+    if alpha is None:
+        return base
+    rgb = _hex_to_rgb(base) if base.startswith('#') else None
+    if rgb is None:
+        return None
+    return f"rgb({rgb[0]} {rgb[1]} {rgb[2]} / {alpha})"
+
+
+def _is_length(value):
+    return bool(re.fullmatch(r'-?[\d.]+(px|rem|em|%|vh|vw|ch)|(calc|clamp|min|max)\(.*\)', value))
+
+
+SPACING_PROPERTIES = {
+    "p": ["padding"], "px": ["padding-left", "padding-right"], "py": ["padding-top", "padding-bottom"],
+    "pt": ["padding-top"], "pr": ["padding-right"], "pb": ["padding-bottom"], "pl": ["padding-left"],
+    "m": ["margin"], "mx": ["margin-left", "margin-right"], "my": ["margin-top", "margin-bottom"],
+    "mt": ["margin-top"], "mr": ["margin-right"], "mb": ["margin-bottom"], "ml": ["margin-left"],
+    "gap": ["gap"], "gap-x": ["column-gap"], "gap-y": ["row-gap"],
+    "inset": ["inset"], "inset-x": ["left", "right"], "inset-y": ["top", "bottom"],
+    "top": ["top"], "right": ["right"], "bottom": ["bottom"], "left": ["left"],
+}
+SIZE_PROPERTIES = {"w": "width", "h": "height", "min-w": "min-width", "min-h": "min-height",
+                   "max-h": "max-height"}
+SIZE_KEYWORDS = {"screen": None, "min": "min-content", "max": "max-content", "fit": "fit-content"}
+
+
+def _utility_declarations(utility, negative):
+    """生成单个工具类（不含变体）的 (声明列表, 选择器后缀)，无法生成时返回 None"""
+    if not negative and utility in STATIC_UTILITIES:
+        return [tuple(part.split(': ', 1)) for part in STATIC_UTILITIES[utility].split('; ')], ""
+
+    # 间距、定位
+    match = re.fullmatch(r'(px|py|pt|pr|pb|pl|p|mx|my|mt|mr|mb|ml|m|gap-x|gap-y|gap|inset-x|inset-y|inset|'
+                         r'top|right|bottom|left)-(.+)', utility)
+    if match:
+        prefix, value = match.groups()
+        is_margin = prefix.startswith('m')
+        is_position = prefix in ("inset", "inset-x", "inset-y", "top", "right", "bottom", "left")
+        if negative and not (is_margin or is_position):
+            return None
+        length = spacing(value, negative, allow_auto=is_margin or is_position, allow_fraction=is_position)
+        if length is None:
+            return None
+        return [(prop, length) for prop in SPACING_PROPERTIES[prefix]], ""
+
+    match = re.fullmatch(r'space-(x|y)-(.+)', utility)
+    if match:
+        axis, value = match.groups()
+        length = spacing(value, negative)
+        if length is None:
+            return None
+        if axis == "y":
+            declarations = [("margin-top", length), ("margin-bottom", "0px")]
+        else:
+            declarations = [("margin-left", length), ("margin-right", "0px")]
+        return declarations, " > :not([hidden]) ~ :not([hidden])"
+
+    # 尺寸
+    match = re.fullmatch(r'(min-w|min-h|max-h|w|h)-(.+)', utility)
+    if match and not negative:
+        prefix, value = match.groups()
+        prop = SIZE_PROPERTIES[prefix]
+        if value == "screen":
+            length = "100vw" if prop.endswith("width") else "100vh"
+        elif value in SIZE_KEYWORDS:
+            length = SIZE_KEYWORDS[value]
+        else:
+            length = spacing(value, allow_auto=prefix in ("w", "h"), allow_fraction=True)
+        if length is None:
+            return None
+        return [(prop, length)], ""
+
+    match = re.fullmatch(r'max-w-(.+)', utility)
+    if match and not negative:
+        value = match.group(1)
+        length = MAX_WIDTHS.get(value) or _arbitrary(value)
+        return ([("max-width", length)], "") if length else None
+
+    match = re.fullmatch(r'z-(\d+|auto|\[.+\])', utility)
+    if match:
+        value = _arbitrary(match.group(1)) or match.group(1)
+        return [("z-index", f"-{value}" if negative else value)], ""
+
+    match = re.fullmatch(r'grid-cols-(\d+|none)', utility)
+    if match and not negative:
+        value = match.group(1)
+        return [("grid-template-columns",
+                 "none" if value == "none" else f"repeat({value}, minmax(0, 1fr))")], ""
+
+    match = re.fullmatch(r'col-span-(\d+|full)', utility)
+    if match and not negative:
+        value = match.group(1)
+        return [("grid-column", "1 / -1" if value == "full" else f"span {value} / span {value}")], ""
+
+    if negative:
+        # 其余工具类中只有 tracking 支持负值
+        match = re.fullmatch(r'tracking-(\[.+\])', utility)
+        if match:
+            return [("letter-spacing", f"-{_arbitrary(match.group(1))}")], ""
+        return None
+
+    # 排版
+    match = re.fullmatch(r'text-(.+)', utility)
+    if match:
+        value = match.group(1)
+        if value in FONT_SIZES:
+            size, line_height = FONT_SIZES[value]
+            return [("font-size", size), ("line-height", line_height)], ""
+        arbitrary = _arbitrary(value)
+        if arbitrary is not None and _is_length(arbitrary):
+            return [("font-size", arbitrary)], ""
+        css_color = color(value)
+        return ([("color", css_color)], "") if css_color else None
+
+    match = re.fullmatch(r'font-(.+)', utility)
+    if match:
+        value = match.group(1)
+        if value in FONT_WEIGHTS:
+            return [("font-weight", FONT_WEIGHTS[value])], ""
+        if value in FONT_FAMILIES:
+            return [("font-family", FONT_FAMILIES[value])], ""
+        return None
+
+    match = re.fullmatch(r'tracking-(.+)', utility)
+    if match:
+        value = TRACKING.get(match.group(1)) or _arbitrary(match.group(1))
+        return ([("letter-spacing", value)], "") if value else None
+
+    match = re.fullmatch(r'leading-(.+)', utility)
+    if match:
+        value = match.group(1)
+        if value in LEADING:
+            return [("line-height", LEADING[value])], ""
+        if value.isdigit():
+            return [("line-height", f"{_number(int(value) * 0.25)}rem")], ""
+        arbitrary = _arbitrary(value)
+        return ([("line-height", arbitrary)], "") if arbitrary else None
+
+    # 背景和渐变
+    match = re.fullmatch(r'bg-gradient-to-(t|tr|r|br|b|bl|l|tl)', utility)
+    if match:
+        direction = GRADIENT_DIRECTIONS[match.group(1)]
+        return [("background-image", f"linear-gradient({direction}, var(--tw-gradient-stops))")], ""
+
+    match = re.fullmatch(r'bg-(.+)', utility)
+    if match:
+        css_color = color(match.group(1))
+        return ([("background-color", css_color)], "") if css_color else None
+
+    match = re.fullmatch(r'(from|via|to)-(.+)', utility)
+    if match:
+        position, value = match.groups()
+        css_color = color(value)
+        if css_color is None:
+            return None
+        rgb = _hex_to_rgb(css_color) if css_color.startswith('#') else None
+        transparent = f"rgb({rgb[0]} {rgb[1]} {rgb[2]} / 0)" if rgb else "transparent"
+        if position == "from":
+            return [("--tw-gradient-from", css_color), ("--tw-gradient-to", transparent),
+                    ("--tw-gradient-stops", "var(--tw-gradient-from), var(--tw-gradient-to)")], ""
+        if position == "via":
+            return [("--tw-gradient-to", transparent),
+                    ("--tw-gradient-stops", f"var(--tw-gradient-from), {css_color}, var(--tw-gradient-to)")], ""
+        return [("--tw-gradient-to", css_color)], ""
+
+    # 边框
+    match = re.fullmatch(r'border(?:-([trblxy]))?(?:-(\d+))?', utility)
+    if match:
+        side, width = match.groups()
+        width = f"{width or 1}px"
+        properties = {None: ["border-width"], "t": ["border-top-width"], "r": ["border-right-width"],
+                      "b": ["border-bottom-width"], "l": ["border-left-width"],
+                      "x": ["border-left-width", "border-right-width"],
+                      "y": ["border-top-width", "border-bottom-width"]}[side]
+        return [(prop, width) for prop in properties], ""
+
+    match = re.fullmatch(r'border-(.+)', utility)
+    if match:
+        css_color = color(match.group(1))
+        return ([("border-color", css_color)], "") if css_color else None
+
+    match = re.fullmatch(r'rounded(?:-(t|r|b|l|tl|tr|br|bl))?(?:-(none|sm|md|lg|xl|2xl|3xl|full|\[.+\]))?', utility)
+    if match:
+        side, size = match.groups()
+        radius = RADIUS.get(size or "") or _arbitrary(size or "")
+        if radius is None:
+            return None
+        return [(prop, radius) for prop in RADIUS_SIDES[side or ""]], ""
+
+    # 效果
+    match = re.fullmatch(r'shadow(?:-(sm|md|lg|xl|2xl|inner|none))?', utility)
+    if match:
+        return [("box-shadow", SHADOWS[match.group(1) or ""])], ""
+
+    match = re.fullmatch(r'opacity-(\d+|\[.+\])', utility)
+    if match:
+        value = _arbitrary(match.group(1)) or _number(int(match.group(1)) / 100)
+        return [("opacity", value)], ""
+
+    match = re.fullmatch(r'drop-shadow-(\[.+\])', utility)
+    if match:
+        return [("filter", f"drop-shadow({_arbitrary(match.group(1))})")], ""
+
+    match = re.fullmatch(r'blur(?:-(none|sm|md|lg|xl|2xl|3xl|\[.+\]))?', utility)
+    if match:
+        sizes = {"none": "0", "sm": "4px", None: "8px", "md": "12px", "lg": "16px", "xl": "24px",
+                 "2xl": "40px", "3xl": "64px"}
+        value = sizes.get(match.group(1)) or _arbitrary(match.group(1) or "")
+        return [("filter", f"blur({value})")], ""
+
+    # 交互和过渡
+    match = re.fullmatch(r'cursor-([a-z-]+)', utility)
+    if match:
+        return [("cursor", match.group(1))], ""
+
+    match = re.fullmatch(r'transition(?:-(all|colors|opacity|shadow|transform|none))?', utility)
+    if match:
+        declarations = [("transition-property", TRANSITION_PROPERTIES[match.group(1) or ""])]
+        if match.group(1) != "none":
+            declarations += [("transition-timing-function", EASINGS["in-out"]), ("transition-duration", "150ms")]
+        return declarations, ""
+
+    match = re.fullmatch(r'duration-(\d+)', utility)
+    if match:
+        return [("transition-duration", f"{match.group(1)}ms")], ""
+
+    match = re.fullmatch(r'delay-(\d+)', utility)
+    if match:
+        return [("transition-delay", f"{match.group(1)}ms")], ""
+
+    match = re.fullmatch(r'ease-(linear|in|out|in-out)', utility)
+    if match:
+        return [("transition-timing-function", EASINGS[match.group(1)])], ""
+
+    return None
+
+
+def escape_class(name):
+    """把类名转义为 CSS 选择器"""
+    escaped = re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', name)
+    if escaped[0].isdigit():
+        escaped = f"\\3{escaped[0]} {escaped[1:]}"
+    return escaped
+
+
+# 输出顺序与 Tailwind 的插件顺序一致（按规则的第一个属性排序），冲突的工具类按 Tailwind 的规则覆盖，
+# 例如 text-sm leading-tight 中 leading-tight 生效，px-2 p-4 中 px-2 生效
+PROPERTY_ORDER = [
+    "pointer-events", "visibility", "position", "inset", "top", "right", "bottom", "left", "isolation",
+    "z-index", "grid-column", "margin", "margin-top", "margin-right", "margin-bottom", "margin-left",
+    "display", "height", "max-height", "min-height", "width", "min-width", "max-width", "flex", "flex-shrink",
+    "flex-grow", "cursor", "user-select", "list-style-position", "list-style-type", "grid-template-columns",
+    "flex-direction", "flex-wrap", "place-content", "place-items", "align-items", "justify-content", "gap",
+    "column-gap", "row-gap", "align-self", "overflow", "overflow-x", "overflow-y", "white-space",
+    "overflow-wrap", "word-break", "border-radius", "border-top-left-radius", "border-top-right-radius",
+    "border-bottom-right-radius", "border-bottom-left-radius", "border-width", "border-top-width",
+    "border-right-width", "border-bottom-width", "border-left-width", "border-style", "border-color",
+    "background-color", "background-image", "--tw-gradient-from", "--tw-gradient-to", "background-size",
+    "background-position", "background-repeat", "object-fit", "padding", "padding-top", "padding-right",
+    "padding-bottom", "padding-left", "text-align", "font-family", "font-size", "font-weight",
+    "text-transform", "font-style", "line-height", "letter-spacing", "color", "text-decoration-line",
+    "-webkit-font-smoothing", "opacity", "box-shadow", "outline", "filter", "transition-property",
+    "transition-delay", "transition-duration", "transition-timing-function",
+]
+_PROPERTY_RANK = {prop: index for index, prop in enumerate(PROPERTY_ORDER)}
+
+
+def generate_rule(class_name):
+    """为类名生成 CSS 规则，返回 (排序键, CSS 文本)，不是可生成的工具类时返回 None"""
+    *variants, utility = class_name.split(':')
+    important = utility.startswith('!')
+    if important:
+        utility = utility[1:]
+    negative = utility.startswith('-')
+    if negative:
+        utility = utility[1:]
+    if not utility:
+        return None
+
+    result = _utility_declarations(utility, negative)
+    if result is None:
+        return None
+    declarations, selector_suffix = result
+
+    selector = f".{escape_class(class_name)}"
+    pseudo = ""
+    media = None
+    variant_rank = 0
+    for variant in variants:
+        if variant in PSEUDO_VARIANTS:
+            pseudo += PSEUDO_VARIANTS[variant]
+            variant_rank = max(variant_rank, 1)
+        elif variant in GROUP_VARIANTS:
+            selector = f".group{GROUP_VARIANTS[variant]} {selector}"
+            variant_rank = max(variant_rank, 1)
+        elif variant in SCREENS and media is None:
+            media = SCREENS[variant]
+        else:
+            return None
+
+    suffix = " !important" if important else ""
+    body = "".join(f"  {prop}: {value}{suffix};\n" for prop, value in declarations)
+    css = f"{selector}{pseudo}{selector_suffix} {{\n{body}}}\n"
+    screen_rank = list(SCREENS.values()).index(media) + 1 if media else 0
+    if media:
+        css = f"@media (min-width: {media}) {{\n" + re.sub(r'(?m)^(?=.)', '  ', css) + "}\n"
+    # 无变体的规则在前，状态变体其次，响应式断点最后；同一属性中简写（声明更多）的在前
+    rank = _PROPERTY_RANK.get(declarations[0][0], len(_PROPERTY_RANK))
+    return (screen_rank, variant_rank, rank, -len(declarations), class_name), css
+
+
+def extract_candidates(text):
+    """从源文件中提取可能的类名"""
+    return set(CANDIDATE_PATTERN.findall(text))
+
+
+def declared_classes(text):
+    """HTML/JS 中以 class 属性、className 或 classList 使用的类名"""
+    classes = set()
+    for match in CLASS_ATTRIBUTE_PATTERN.finditer(text):
+        if match.group(2) is not None:
+            classes.update(token for token in match.group(2).split() if '${' not in token and '{' not in token)
+        else:
+            classes.update(re.findall(r'["\']([^"\'\s]+)["\']', match.group(3)))
+    return classes
+
+
+def looks_like_utility(class_name):
+    """类名是否像 Tailwind 工具类（用于报告无法生成的类名）"""
+    utility = class_name.split(':')[-1].lstrip('!-')
+    return utility.split('-')[0] in UTILITY_ROOTS and '-' in utility or utility in STATIC_UTILITIES
+
+
+def build_stylesheet(classes):
+    """为类名集合生成样式表（Preflight + 工具类）"""
+    rules = [rule for rule in (generate_rule(name) for name in classes) if rule]
+    rules.sort(key=lambda rule: rule[0])
+    return PREFLIGHT + "".join(css for _, css in rules)
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return ""
+
+
+def process_project(project_dir):
+    """处理单个项目，返回 (替换的页面列表, {保留 CDN 的页面: 原因})"""
+    pages = []
+    for root, dirs, files in os.walk(project_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(('.html', '.htm')):
+                path = os.path.join(root, name)
+                content = _read_text(path)
+                if CDN_SCRIPT_PATTERN.search(content):
+                    pages.append((path, content))
+    if not pages:
+        return [], {}
+
+    # 项目内的 JS 和 CSS：JS 中可能动态添加类名，CSS 中定义的类不是 Tailwind 工具类
+    scripts = []
+    custom_classes = set()
+    for root, dirs, files in os.walk(project_dir):
+        for name in files:
+            lower = name.lower()
+            if lower.endswith(('.js', '.mjs')):
+                scripts.append(_read_text(os.path.join(root, name)))
+            elif lower.endswith('.css') and name != OUTPUT_NAME:
+                custom_classes.update(CSS_CLASS_PATTERN.findall(_read_text(os.path.join(root, name))))
+    script_text = "\n".join(scripts)
+
+    candidates = extract_candidates(script_text)
+    converted = []
+    skipped = {}
+    for path, content in pages:
+        if UNSUPPORTED_CONFIG_PATTERN.search(content):
+            skipped[path] = "使用了 tailwind.config 或 text/tailwindcss 样式"
+            continue
+
+        page_classes = declared_classes(content) | declared_classes(script_text)
+        page_custom = custom_classes | set(CSS_CLASS_PATTERN.findall(
+            "".join(re.findall(r'<style[^>]*>(.*?)</style>', content, re.DOTALL | re.IGNORECASE))))
+        unsupported = sorted(name for name in page_classes
+                             if name not in page_custom and looks_like_utility(name) and not generate_rule(name))
+        if unsupported:
+            skipped[path] = f"无法生成的工具类: {' '.join(unsupported)}"
+            continue
+
+        candidates |= extract_candidates(content)
+        converted.append((path, content))
+
+    if not converted:
+        return [], skipped
+
+    stylesheet_path = os.path.join(project_dir, OUTPUT_NAME)
+    write_file_if_changed(stylesheet_path, build_stylesheet(candidates))
+
+    for path, content in converted:
+        href = os.path.relpath(stylesheet_path, os.path.dirname(path)).replace(os.sep, "/")
+        content = CDN_SCRIPT_PATTERN.sub("", content, count=1)
+        content = re.sub(r'(?i)([ \t]*)</head>', lambda m: f'{m.group(1)}    <link rel="stylesheet" href="{href}">\n'
+                         f'{m.group(1)}</head>', content, count=1)
+        write_file_if_changed(path, content)
+    return [path for path, _ in converted], skipped
+
+
+def extract_tailwind(dist_dir=DIST_DIR, mirror=True):
+    """替换发布目录中所有页面的 Tailwind CDN，返回是否成功"""
+    if mirror:
+        stats = mirror_site(dist_dir)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+
+    converted_count = 0
+    skipped_count = 0
+    fail_count = 0
+    for entry in get_catalog().entries(include_missing=True):
+        project_dir = os.path.join(dist_dir, entry["path"])
+        if not os.path.isdir(project_dir):
+            continue
+        try:
+            converted, skipped = process_project(project_dir)
+        except Exception as e:
+            print(f"处理项目 {entry['path']} 时出错: {e}")
+            fail_count += 1
+            continue
+        for path in converted:
+            print(f"  已替换: {os.path.relpath(path, dist_dir)}")
+        for path, reason in skipped.items():
+            print(f"  保留 CDN: {os.path.relpath(path, dist_dir)} ({reason})")
+        converted_count += len(converted)
+        skipped_count += len(skipped)
+
+    print(f"处理完成! 替换页面: {converted_count}, 保留 CDN: {skipped_count}, 失败: {fail_count}")
+    return fail_count == 0
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='在构建时生成 Tailwind 工具类样式，替换运行时 CDN 编译')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    args = parser.parse_args()
+
+    return 0 if extract_tailwind(args.output, mirror=not args.no_mirror) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预编译模板引擎
+
+兼容 Mustache 的常用语法，用于渲染项目详情页和README模板:
+  {{name}}            输出变量，支持点号路径，例如 {{compatibility.min_screen_width}}
+  {{{name}}} {{&name}} 同 {{name}}
+  {{.}}               输出当前列表项
+  {{#name}}...{{/name}} 区块：列表逐项渲染，字典进入其作用域，真值渲染一次
+  {{^name}}...{{/name}} 反向区块：值为假或空列表时渲染
+  {{!注释}}            注释，不输出
+
+列表支持 .length 属性，例如 {{#features.length}}...{{/features.length}}。
+
+与标准 Mustache 的差异（与原有的替换式渲染函数保持一致）:
+  - 变量按原样输出，不做 HTML 转义
+  - 不裁剪只包含区块标签的独立行
+
+模板只在第一次使用时解析为节点树并缓存，之后每次渲染都是对节点树的单次线性遍历，
+耗时与模板长度加上输出长度成正比，与上下文中的键数量无关。
+"""
+
+import re
+
+# 标签匹配：{{{name}}} 或 {{<类型>name}}
+TAG_PATTERN = re.compile(r'\{\{\{\s*(.+?)\s*\}\}\}|\{\{([#^/&!]?)\s*(.*?)\s*\}\}', re.DOTALL)
+
+# 节点类型
+TEXT = 0
+VARIABLE = 1
+SECTION = 2
+INVERTED = 3
+
+# 已编译模板缓存，键为模板字符串
+_compiled_cache = {}
+
+
+class TemplateSyntaxError(ValueError):
+    """模板语法错误"""
+
+
+class Template:
+    """已编译的模板"""
+
+    def __init__(self, source):
+        self.source = source
+        self.nodes = parse(source)
+
+    def render(self, context):
+        """渲染模板"""
+        parts = []
+        _render_nodes(self.nodes, [context], parts)
+        return ''.join(parts)
+
+
+def parse(source):
+    """把模板解析为节点树
+
+    节点为元组:
+      (TEXT, 文本)
+      (VARIABLE, 路径)
+      (SECTION, 路径, 子节点) / (INVERTED, 路径, 子节点)
+    路径为按点号拆分后的元组，{{.}} 的路径为空元组。
+    """
+    root = []
+    stack = [(None, root)]
+    position = 0
+
+    for match in TAG_PATTERN.finditer(source):
+        if match.start() > position:
+            stack[-1][1].append((TEXT, source[position:match.start()]))
+        position = match.end()
+
+        if match.group(1) is not None:
+            stack[-1][1].append((VARIABLE, _split_path(match.group(1))))
+            continue
+
+        kind = match.group(2)
+        name = match.group(3)
+
+        if kind == '!':
+            continue
+        if not name:
+            raise TemplateSyntaxError(f"模板第 {_line_of(source, match.start())} 行存在空标签")
+
+        if kind in ('#', '^'):
+            children = []
+            node_type = SECTION if kind == '#' else INVERTED
+            stack[-1][1].append((node_type, _split_path(name), children))
+            stack.append((name, children))
+        elif kind == '/':
+            if len(stack) == 1 or stack[-1][0] != name:
+                expected = stack[-1][0] if len(stack) > 1 else None
+                raise TemplateSyntaxError(
+                    f"模板第 {_line_of(source, match.start())} 行的结束标签 {{{{/{name}}}}} 与开始标签 {expected!r} 不匹配"
+                )
+            stack.pop()
+        else:
+            stack[-1][1].append((VARIABLE, _split_path(name)))
+
+    if len(stack) > 1:
+        raise TemplateSyntaxError(f"模板区块 {{{{#{stack[-1][0]}}}}} 没有结束标签")
+
+    if position < len(source):
+        root.append((TEXT, source[position:]))
+    return root
+
+
+def compile_template(source):
+    """获取已编译模板（同一模板只解析一次）"""
+    template = _compiled_cache.get(source)
+    if template is None:
+        template = Template(source)
+        _compiled_cache[source] = template
+    return template
+
+
+def render(source, context):
+    """编译（或从缓存中取出）并渲染模板"""
+    return compile_template(source).render(context)
+
+
+def _split_path(name):
+    """把变量名拆分为路径"""
+    if name == '.':
+        return ()
+    return tuple(name.split('.'))
+
+
+def _line_of(source, offset):
+    """计算偏移量所在的行号"""
+    return source.count('\n', 0, offset) + 1
+
+
+def _get_attr(value, key):
+    """从字典、列表或对象中取值"""
+    if isinstance(value, dict):
+        return value.get(key)
+    if key == 'length' and isinstance(value, (list, tuple, str)):
+        return len(value)
+    return getattr(value, key, None)
+
+
+def _lookup(stack, path):
+    """在上下文栈中查找变量，第一段从内向外查找，其余各段逐级取值"""
+    if not path:
+        return stack[-1]
+
+    head = path[0]
+    value = None
+    for scope in reversed(stack):
+        if isinstance(scope, dict):
+            if head in scope:
+                value = scope[head]
+                break
+        elif head == 'length' and isinstance(scope, (list, tuple, str)):
+            value = len(scope)
+            break
+        elif hasattr(scope, head) and not isinstance(scope, (str, int, float, bool)):
+            value = getattr(scope, head)
+            break
+    else:
+        return None
+
+    for key in path[1:]:
+        if value is None:
+            return None
+        value = _get_attr(value, key)
+    return value
+
+
+def _render_nodes(nodes, stack, parts):
+    """渲染节点列表"""
+    for node in nodes:
+        node_type = node[0]
+        if node_type == TEXT:
+            parts.append(node[1])
+        elif node_type == VARIABLE:
+            value = _lookup(stack, node[1])
+            if value is not None:
+                parts.append(value if isinstance(value, str) else str(value))
+        else:
+            value = _lookup(stack, node[1])
+            children = node[2]
+            is_list = isinstance(value, (list, tuple))
+            if node_type == INVERTED:
+                if not value:
+                    _render_nodes(children, stack, parts)
+            elif is_list:
+                for item in value:
+                    stack.append(item)
+                    _render_nodes(children, stack, parts)
+                    stack.pop()
+            elif value:
+                stack.append(value)
+                _render_nodes(children, stack, parts)
+                stack.pop()
@@ -1,49 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
 import sys
-import subprocess
 
-def run_command(command):
-    """运行命令并返回结果"""
-    try:
-        result = subprocess.run(command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        return True, result.stdout
-    except subprocess.CalledProcessError as e:
-        return False, e.stderr
+from build import build
 
-def update_all_projects():
-    """更新所有项目的元信息和README"""
-    print("开始更新所有项目的元信息和README...")
-    success, output = run_command("python tools/update_project_metadata.py all --readme")
-    if not success:
-        print("更新项目元信息和README失败:")
-        print(output)
-        return False
+def update_all_projects(force=False):
+    """更新所有项目的元信息、README、详情页和主页
 
-    print(output)
-
-    print("\n开始生成所有项目的详情页...")
-    success, output = run_command("python tools/generate_project_details.py")
-    if not success:
-        print("生成项目详情页失败:")
-        print(output)
-        return False
-
-    print(output)
-
-    print("\n开始更新主页...")
-    success, output = run_command("python tools/generate_homepage_simplified.py")
-    if not success:
-        print("更新主页失败:")
-        print(output)
-        return False
-
-    print(output)
-
-    print("\n所有更新完成!")
-    return True
+    各步骤由构建流水线在同一进程中依次运行，共享一次项目目录扫描，
+    输入没有变化的步骤会被跳过。
+    """
+    return build(force=force)
 
 if __name__ == "__main__":
-    update_all_projects()
+    success = update_all_projects(force="--force" in sys.argv)
+    sys.exit(0 if success else 1)
@@ -8,10 +8,14 @@ from datetime import datetime
 
 # 导入工具模块
 from utils import (
-    read_site_config, load_project_config, save_project_config,
+    read_site_config, load_project_config,
     find_project, extract_features_from_readme, render_template,
     get_today_date
 )
+from project_catalog import get_catalog
+from page_weight import estimate_performance_impact
+from profiling import get_profiler, profile_session, profile_options_from_argv
+from metadata_transaction import MetadataTransaction
 
 def read_readme_template():
     """读取README模板"""
@@ -54,6 +58,7 @@ def generate_readme(project_path, config, force=False):
         'description': config.get('description', ''),
         'version': config.get('version', '1.0.0'),
         'last_updated': config.get('last_updated', get_today_date()),
+        'creation_date': config.get('creation_date', config.get('last_updated', get_today_date())),
         'status': config.get('status', 'beta'),
         'status_text': status_text_map.get(config.get('status', 'beta'), '测试版'),
         'project_dir': project_dir,
@@ -69,6 +74,7 @@ def generate_readme(project_path, config, force=False):
     try:
         with open(readme_path, 'w', encoding='utf-8') as f:
             f.write(rendered_readme)
+        get_profiler().count_write(readme_path, len(rendered_readme.encode('utf-8')))
         print(f"已生成README文件: {readme_path}")
         return True
     except Exception as e:
@@ -110,13 +116,8 @@ def extract_dependencies_from_readme(readme_path):
 
     return []
 
-def update_project_metadata(project_path):
-    """更新项目元信息"""
-    # 加载项目配置
-    config, config_path = load_project_config(project_path)
-    if not config:
-        return False
-
+def complete_metadata(config, project_path):
+    """补全项目配置中缺失的元信息字段（原地修改）"""
     # 获取当前日期
     today = datetime.now().strftime("%Y-%m-%d")
 
@@ -139,12 +140,12 @@ def update_project_metadata(project_path):
             "changes": ["初始版本"]
         }]
 
-    # 添加兼容性信息
+    # 添加兼容性信息（性能影响由页面体积分析推导）
     if "compatibility" not in config:
         config["compatibility"] = {
             "mobile": True,
             "desktop": True,
-            "performance_impact": "medium"
+            "performance_impact": estimate_performance_impact(project_path)
         }
 
     # 添加作者信息
@@ -180,18 +181,46 @@ def update_project_metadata(project_path):
         else:
             config["dependencies"] = []
 
-    # 保存更新后的配置
-    return save_project_config(config, config_path)
+def update_project_metadata(project_path, transaction=None):
+    """更新项目元信息
+
+    传入 transaction 时只把修改加入事务，由调用方统一提交；否则立即写回 project.json。
+    """
+    config_path = os.path.join(project_path, "project.json")
+    if not os.path.exists(config_path):
+        print(f"项目配置文件不存在: {config_path}")
+        return False
+
+    def edit(config):
+        complete_metadata(config, project_path)
+
+    if transaction is not None:
+        transaction.add(config_path, edit, "补全元信息")
+        return True
+
+    # 单独调用时立即提交
+    standalone = MetadataTransaction()
+    standalone.add(config_path, edit, "补全元信息")
+    result = standalone.commit()[0]
+    if result["error"]:
+        return False
+    if result["changed"]:
+        print(f"项目配置已保存到 {config_path}")
+    return True
 
-def update_readme_with_version(project_path):
-    """更新README文件，添加版本信息部分"""
+def update_readme_with_version(project_path, config=None):
+    """更新README文件，添加版本信息部分
+
+    config 为已提交的项目配置，为 None 时从 project.json 读取。
+    """
     readme_path = os.path.join(project_path, "README.md")
     if not os.path.exists(readme_path):
         print(f"README文件不存在: {readme_path}")
         return False
 
     # 加载项目配置
-    config, _ = load_project_config(project_path)
+    if config is None:
+        config, _ = load_project_config(project_path)
     if not config:
         return False
 
@@ -232,6 +261,7 @@ def update_readme_with_version(project_path):
             # 保存更新后的README
             with open(readme_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            get_profiler().count_write(readme_path, len(content.encode('utf-8')))
 
             print(f"已更新README文件: {readme_path}")
             return True
@@ -267,6 +297,7 @@ def update_readme_with_version(project_path):
                 # 保存更新后的README
                 with open(readme_path, 'w', encoding='utf-8') as f:
                     f.write(updated_content)
+                get_profiler().count_write(readme_path, len(updated_content.encode('utf-8')))
 
                 print(f"已更新README文件中的版本信息: {readme_path}")
                 return True
@@ -277,47 +308,55 @@ def update_readme_with_version(project_path):
         print(f"更新README文件时出错: {e}")
         return False
 
-def process_all_projects(generate_readme_flag=False, force_readme=False):
-    """处理所有项目"""
+def process_all_projects(generate_readme_flag=False, force_readme=False, site_config=None):
+    """处理所有项目
+
+    site_config 为 None 时自行读取站点配置；构建流水线会传入已读取的配置。
+    """
     # 读取站点配置
-    site_config = read_site_config()
+    if site_config is None:
+        site_config = read_site_config()
     if not site_config:
         print("无法读取站点配置，更新中止")
-        return
+        return False
 
-    # 项目根目录
-    projects_root = "projects"
+    profiler = get_profiler()
 
     # 成功和失败计数
     success_count = 0
     fail_count = 0
 
-    # 遍历分类目录
-    for category_dir in os.listdir(projects_root):
-        category_path = os.path.join(projects_root, category_dir)
-        if os.path.isdir(category_path):
-            # 遍历该分类下的所有项目
-            for project_dir in os.listdir(category_path):
-                project_path = os.path.join(category_path, project_dir)
-                if os.path.isdir(project_path):
-                    print(f"\n处理项目: {project_dir}")
-
-                    # 更新项目元信息
-                    if update_project_metadata(project_path):
-                        # 更新README文件
-                        if update_readme_with_version(project_path):
-                            # 如果需要，生成完整的README
-                            if generate_readme_flag:
-                                config, _ = load_project_config(project_path)
-                                if config:
-                                    generate_readme(project_path, config, force_readme)
-                            success_count += 1
-                        else:
-                            fail_count += 1
-                    else:
-                        fail_count += 1
+    # 遍历所有项目（来自带缓存的项目目录），元信息修改加入同一个事务，
+    # 每个 project.json 只读取一次，内容有变化时才写回
+    entries = get_catalog().entries(include_missing=True)
+    transaction = MetadataTransaction()
+    queued = [entry for entry in entries if update_project_metadata(entry["path"], transaction=transaction)]
+    fail_count += len(entries) - len(queued)
+    with profiler.span("metadata"):
+        transaction.commit()
+    print(f"项目元信息: {transaction.summary()}")
+
+    for entry in queued:
+        project_path = entry["path"]
+        result = transaction.result(entry["config_path"])
+        if result["error"]:
+            fail_count += 1
+            continue
+        print(f"\n处理项目: {entry['name']}")
+
+        # 更新README文件（直接使用提交后的配置，不再重新读取 project.json）
+        with profiler.span("readme", project=project_path):
+            readme_updated = update_readme_with_version(project_path, result["config"])
+            # 如果需要，生成完整的README
+            if readme_updated and generate_readme_flag:
+                generate_readme(project_path, result["config"], force_readme)
+        if readme_updated:
+            success_count += 1
+        else:
+            fail_count += 1
 
     print(f"\n处理完成! 成功: {success_count}, 失败: {fail_count}")
+    return True
 
 def process_single_project(project_name, generate_readme_flag=False, force_readme=False):
     """处理单个项目"""
@@ -357,17 +396,28 @@ def print_usage():
     print("    更新指定项目的元信息")
     print("    --readme: 同时生成README文件")
     print("    --force: 强制覆盖已有的README文件")
+    print("剖析选项:")
+    print("  --profile: 打印各阶段和各项目的耗时汇总")
+    print("  --profile-trace <文件>: 导出 Chrome trace-event JSON")
+    print("  --profile-cprofile <文件>: 保存 cProfile 统计")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    try:
+        profile, trace_path, cprofile_path, args = profile_options_from_argv(sys.argv[1:])
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+
+    if len(args) < 1:
         print_usage()
         sys.exit(1)
 
-    command = sys.argv[1]
-    generate_readme_flag = "--readme" in sys.argv
-    force_readme = "--force" in sys.argv
+    command = args[0]
+    generate_readme_flag = "--readme" in args
+    force_readme = "--force" in args
 
-    if command == "all":
-        process_all_projects(generate_readme_flag, force_readme)
-    else:
-        process_single_project(command, generate_readme_flag, force_readme)
+    with profile_session(profile, trace_path, cprofile_path):
+        if command == "all":
+            process_all_projects(generate_readme_flag, force_readme)
+        else:
+            process_single_project(command, generate_readme_flag, force_readme)
@@ -4,8 +4,13 @@
 import os
 import json
 import re
+import hashlib
+import tempfile
 from datetime import datetime
 
+import template_engine
+from profiling import get_profiler
+
 def read_site_config():
     """读取站点配置文件"""
     # 首先尝试读取简化版配置文件
@@ -45,9 +50,13 @@ def load_project_config(project_path):
     """加载项目配置"""
     config_path = os.path.join(project_path, "project.json")
     if os.path.exists(config_path):
+        profiler = get_profiler()
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f), config_path
+            with profiler.span("parse", project=project_path):
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                profiler.count_read(config_path, len(content.encode('utf-8')))
+                return json.loads(content), config_path
         except Exception as e:
             print(f"读取项目配置文件时出错: {e}")
     else:
@@ -56,9 +65,13 @@ def load_project_config(project_path):
 
 def save_project_config(config, config_path):
     """保存项目配置"""
+    profiler = get_profiler()
     try:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=4)
+        with profiler.span("write", project=os.path.dirname(config_path)):
+            content = json.dumps(config, ensure_ascii=False, indent=4)
+            with open(config_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        profiler.count_write(config_path, len(content.encode('utf-8')))
         print(f"项目配置已保存到 {config_path}")
         return True
     except Exception as e:
@@ -67,31 +80,19 @@ def save_project_config(config, config_path):
 
 def find_all_projects():
     """查找所有项目"""
+    # 项目列表来自带磁盘缓存的项目目录，只有变化过的 project.json 会被重新解析
+    from project_catalog import get_catalog
+
     projects = []
-    projects_root = "projects"
-    
-    if not os.path.exists(projects_root):
-        print("找不到项目目录")
-        return projects
-    
-    # 遍历分类目录
-    for category_dir in os.listdir(projects_root):
-        category_path = os.path.join(projects_root, category_dir)
-        if os.path.isdir(category_path):
-            # 遍历该分类下的所有项目
-            for project_dir in os.listdir(category_path):
-                project_path = os.path.join(category_path, project_dir)
-                if os.path.isdir(project_path):
-                    # 检查是否有配置文件
-                    config_path = os.path.join(project_path, "project.json")
-                    if os.path.exists(config_path):
-                        projects.append({
-                            "name": project_dir,
-                            "path": project_path,
-                            "config_path": config_path,
-                            "category_dir": category_dir
-                        })
-    
+    for entry in get_catalog().entries():
+        projects.append({
+            "name": entry["name"],
+            "path": entry["path"],
+            "config_path": entry["config_path"],
+            "category_dir": entry["category_dir"],
+            "config": entry["config"]
+        })
+
     return projects
 
 def find_project(project_name):
@@ -109,53 +110,140 @@ def find_project(project_name):
     return None
 
 def render_template(template, context):
-    """简单的模板渲染函数"""
-    # 替换基本变量
-    for key, value in context.items():
-        if isinstance(value, str):
-            template = template.replace(f"{{{{{key}}}}}", value)
-    
-    # 处理条件语句 {{#var}}content{{/var}}
-    for key, value in context.items():
-        if isinstance(value, bool):
-            if value:
-                # 如果条件为真，移除标记但保留内容
-                template = re.sub(r'\{\{#' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}', r'\1', template, flags=re.DOTALL)
-                # 移除否定条件的内容
-                template = re.sub(r'\{\{\^' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}', '', template, flags=re.DOTALL)
-            else:
-                # 如果条件为假，移除标记和内容
-                template = re.sub(r'\{\{#' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}', '', template, flags=re.DOTALL)
-                # 保留否定条件的内容
-                template = re.sub(r'\{\{\^' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}', r'\1', template, flags=re.DOTALL)
-    
-    # 处理列表 {{#items}}{{.}}{{/items}}
-    for key, value in context.items():
-        if isinstance(value, list) and value:
-            # 找到列表模板
-            list_pattern = r'\{\{#' + key + r'\}\}(.*?)\{\{/' + key + r'\}\}'
-            list_matches = re.findall(list_pattern, template, re.DOTALL)
-            
-            if list_matches:
-                list_template = list_matches[0]
-                # 为列表中的每个项目渲染模板
-                rendered_items = []
-                for item in value:
-                    if isinstance(item, dict):
-                        # 如果列表项是字典，递归渲染
-                        item_rendered = list_template
-                        for item_key, item_value in item.items():
-                            if isinstance(item_value, str):
-                                item_rendered = item_rendered.replace(f"{{{{{item_key}}}}}", item_value)
-                        rendered_items.append(item_rendered)
-                    else:
-                        # 如果列表项是简单值，替换 {{.}}
-                        rendered_items.append(list_template.replace("{{.}}", str(item)))
-                
-                # 替换整个列表模板
-                template = re.sub(list_pattern, ''.join(rendered_items), template, flags=re.DOTALL)
-    
-    return template
+    """简单的模板渲染函数
+
+    模板由 template_engine 预编译并缓存，渲染时只对模板做一次线性遍历。
+    """
+    return template_engine.render(template, context)
+
+def write_file_if_changed(path, content):
+    """内容有变化时才写入文件，返回是否发生了写入
+
+    跳过内容相同的写入可以保留文件的修改时间，避免无意义地使浏览器、CDN和构建缓存失效。
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    profiler = get_profiler()
+    try:
+        # 大小不同时无需读取旧内容
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    profiler.count_unchanged(path)
+                    return False
+    except FileNotFoundError:
+        pass
+
+    with open(path, 'wb') as f:
+        f.write(data)
+    profiler.count_write(path, len(data))
+    return True
+
+class AtomicFileWriter:
+    """流式原子写入文件
+
+    内容逐块写入目标文件所在目录中的临时文件，写完并 fsync 后用 os.replace 替换目标文件，
+    并发读取的一方（例如静态服务器）要么读到旧文件，要么读到完整的新文件，不会读到写了
+    一半的文件。写入过程中出错时删除临时文件，原文件保持不变。新内容与原文件完全相同时
+    丢弃临时文件，保留原文件的修改时间，changed 为 False。
+
+    用法:
+        with AtomicFileWriter('index.html') as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self.changed = False
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(self.path)}.", suffix=".tmp"
+        )
+        self._file = os.fdopen(fd, 'wb')
+        return self
+
+    def write(self, content):
+        """写入一块内容"""
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    def write_lines(self, chunks, separator='\n'):
+        """逐块写入，块之间以 separator 连接，结果与 separator.join(chunks) 相同"""
+        first = True
+        for chunk in chunks:
+            if not first:
+                self.write(separator)
+            self.write(chunk)
+            first = False
+
+    def _same_as_existing(self):
+        """判断新内容是否与目标文件完全相同（大小不同时无需读取旧内容）"""
+        try:
+            if os.path.getsize(self.path) != self.size:
+                return False
+            existing = hashlib.sha256()
+            with open(self.path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    existing.update(block)
+            return existing.digest() == self._hash.digest()
+        except FileNotFoundError:
+            return False
+
+    def _target_mode(self):
+        """新文件的权限：沿用原文件的权限，没有原文件时按 umask 计算（mkstemp 默认只有属主可读写）"""
+        try:
+            return os.stat(self.path).st_mode & 0o7777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    def __exit__(self, exc_type, exc, tb):
+        profiler = get_profiler()
+        try:
+            if exc_type is None:
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            self._file.close()
+
+            if exc_type is None:
+                if self._same_as_existing():
+                    profiler.count_unchanged(self.path)
+                else:
+                    os.chmod(self._tmp_path, self._target_mode())
+                    os.replace(self._tmp_path, self.path)
+                    self._tmp_path = None
+                    self.changed = True
+                    profiler.count_write(self.path, self.size)
+                    if self.fsync:
+                        _fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+        finally:
+            if self._tmp_path and os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+        return False
+
+def _fsync_directory(directory):
+    """同步目录项，保证替换操作在断电后仍然生效（不支持的平台上忽略）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 def get_today_date():
     """获取当前日期，格式为YYYY-MM-DD"""
@@ -1,90 +1,226 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+"""
+项目验证工具
+
+按 project_schema.py 中的结构定义验证所有项目的 project.json，并检查文件结构:
+  - 字段类型、必要字段、status / performance_impact 枚举、日期格式、语义化版本号、更新日志结构
+  - primary_category / secondary_categories 是否为站点配置中的分类，primary_category 是否与所在目录一致
+  - 项目是否有 index.html 和 project.json
+  - 跨项目问题：标题重复、同名项目目录出现在多个分类中
+
+项目列表来自带缓存的项目目录（project_catalog.py），只有 stat 签名变化的 project.json 会被重新读取；
+验证结果按内容哈希缓存在 tools/.cache/project_validation.json，内容、所在分类和结构定义都没有变化的
+项目直接复用上一次的结果。需要验证的项目可以用多个进程并行检查。
+
+用法:
+  python tools/validate_projects.py             # 输出验证报告
+  python tools/validate_projects.py --jobs 0    # 使用全部CPU核心并行验证
+  python tools/validate_projects.py --json      # 以 JSON 输出报告
+  python tools/validate_projects.py --no-cache  # 忽略验证缓存，重新检查所有项目
+"""
 
 import os
-import json
 import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from project_catalog import get_catalog, CACHE_DIR
+from project_schema import load_categories, schema_fingerprint, validate_config, format_problem
+from utils import AtomicFileWriter
+
+# 缓存格式版本，结构变化时递增以丢弃旧缓存
+CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "project_validation.json")
+
+
+def _validate_task(task):
+    """验证单个项目配置（进程池任务）"""
+    config, category_dir, categories = task
+    problems = validate_config(config, categories)
+    primary_category = config.get("primary_category") if isinstance(config, dict) else None
+    if isinstance(primary_category, str) and primary_category != category_dir:
+        problems.append({"path": "primary_category", "level": "error",
+                         "message": f"'{primary_category}' 与实际目录 '{category_dir}' 不匹配"})
+    secondary = config.get("secondary_categories") if isinstance(config, dict) else None
+    if isinstance(secondary, list) and primary_category in secondary:
+        problems.append({"path": "secondary_categories", "level": "warning",
+                         "message": f"包含主分类 '{primary_category}'"})
+    return problems
+
+
+def load_cache(cache_path, fingerprint, projects_root):
+    """读取验证缓存，结构定义、分类或项目根目录变化时丢弃"""
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"读取验证缓存时出错，将重新验证所有项目: {e}")
+        return {}
+    if data.get("version") != CACHE_VERSION or data.get("schema") != fingerprint:
+        return {}
+    if data.get("root") != os.path.abspath(projects_root):
+        return {}
+    return data.get("entries", {})
+
+
+def save_cache(cache_path, fingerprint, projects_root, entries):
+    """写入验证缓存"""
+    if not cache_path:
+        return
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    data = {"version": CACHE_VERSION, "schema": fingerprint, "root": os.path.abspath(projects_root),
+            "saved_ns": time.time_ns(), "entries": entries}
+    with AtomicFileWriter(cache_path, fsync=False) as writer:
+        writer.write(json.dumps(data, ensure_ascii=False, sort_keys=True))
+
+
+def find_cross_project_issues(entries):
+    """一次遍历找出跨项目问题：标题重复、同名项目目录出现在多个分类中"""
+    titles = {}
+    names = {}
+    for entry in entries:
+        names.setdefault(entry["name"], []).append(entry["path"])
+        config = entry["config"]
+        title = config.get("title") if isinstance(config, dict) else None
+        if isinstance(title, str) and title.strip():
+            titles.setdefault(title.strip().casefold(), []).append((title, entry["path"]))
+
+    issues = []
+    for found in titles.values():
+        if len(found) > 1:
+            issues.append({"kind": "duplicate_title", "message": f"标题 '{found[0][0]}' 重复",
+                           "projects": [path for _, path in found]})
+    for name, paths in names.items():
+        if len(paths) > 1:
+            issues.append({"kind": "duplicate_directory", "message": f"项目目录 '{name}' 出现在多个分类中",
+                           "projects": paths})
+    return issues
+
+
+def run_validation(jobs=1, use_cache=True, cache_path=DEFAULT_CACHE_PATH, projects_root="projects"):
+    """验证所有项目，返回报告
+
+    报告结构:
+      {"ok", "stats": {"projects", "checked", "cached", "failed"},
+       "projects": [{"project", "problems": [{"path", "level", "message"}]}],  # 只包含有问题的项目
+       "cross": [{"kind", "message", "projects"}]}
+    """
+    categories = load_categories()
+    fingerprint = schema_fingerprint(categories)
+    cached = load_cache(cache_path, fingerprint, projects_root) if use_cache else {}
+    entries = get_catalog(projects_root).entries(include_missing=True)
+
+    problems_by_project = {}
+    tasks = []
+    task_keys = []
+    new_cache = {}
+    stats = {"projects": len(entries), "checked": 0, "cached": 0, "failed": 0}
+    for entry in entries:
+        project_path = entry["path"]
+        problems = []
+        # 文件结构检查每次都做（只需 stat），不进入缓存
+        if not os.path.exists(os.path.join(project_path, "index.html")):
+            problems.append({"path": "", "level": "warning", "message": "缺少 index.html 文件"})
+        problems_by_project[project_path] = problems
+
+        if not entry["config_path"]:
+            problems.append({"path": "", "level": "warning", "message": "缺少 project.json 文件"})
+            continue
+        if entry["config"] is None:
+            problems.append({"path": "", "level": "error", "message": f"project.json 文件格式无效: {entry['error']}"})
+            continue
+
+        key = entry["config_path"]
+        record = cached.get(key)
+        if record and record.get("hash") == entry["hash"] and record.get("category_dir") == entry["category_dir"]:
+            problems.extend(record["problems"])
+            new_cache[key] = record
+            stats["cached"] += 1
+            continue
+        tasks.append((entry["config"], entry["category_dir"], categories))
+        task_keys.append((key, entry))
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_validate_task, tasks, chunksize=32))
+    else:
+        results = [_validate_task(task) for task in tasks]
+    stats["checked"] = len(results)
+
+    for (key, entry), problems in zip(task_keys, results):
+        problems_by_project[entry["path"]].extend(problems)
+        new_cache[key] = {"hash": entry["hash"], "category_dir": entry["category_dir"], "problems": problems}
+
+    if use_cache and (results or set(new_cache) != set(cached)):
+        save_cache(cache_path, fingerprint, projects_root, new_cache)
+
+    projects = [{"project": path, "problems": problems}
+                for path, problems in problems_by_project.items() if problems]
+    stats["failed"] = len(projects)
+    cross = find_cross_project_issues(entries)
+    return {"ok": not projects and not cross, "stats": stats, "projects": projects, "cross": cross}
+
+
+def print_report(report):
+    """打印验证报告"""
+    level_names = {"error": "错误", "warning": "警告"}
+    print("项目元数据验证报告")
+    print("=" * 60)
+    for item in report["projects"]:
+        print(item["project"])
+        for problem in item["problems"]:
+            print(f"  - [{level_names[problem['level']]}] {format_problem(problem)}")
+    if report["cross"]:
+        print("跨项目问题:")
+        for issue in report["cross"]:
+            print(f"  - {issue['message']}: {', '.join(issue['projects'])}")
+    print("=" * 60)
+    stats = report["stats"]
+    problem_count = sum(len(item["problems"]) for item in report["projects"])
+    print(f"共 {stats['projects']} 个项目（检查 {stats['checked']} 个, 复用缓存 {stats['cached']} 个）, "
+          f"有问题的项目 {stats['failed']} 个, 问题 {problem_count} 个, 跨项目问题 {len(report['cross'])} 个")
 
-def validate_projects():
+
+def validate_projects(jobs=1, use_cache=True, json_output=False):
     """验证所有项目的元数据和文件结构"""
     projects_root = "projects"
-    issues_found = False
-    
+
     # 检查项目根目录是否存在
     if not os.path.exists(projects_root):
         print(f"错误: 项目根目录 '{projects_root}' 不存在")
         return False
-    
-    # 遍历所有分类目录
-    for category_dir in os.listdir(projects_root):
-        category_path = os.path.join(projects_root, category_dir)
-        if not os.path.isdir(category_path):
-            continue
-        
-        # 遍历分类下的所有项目
-        for project_dir in os.listdir(category_path):
-            project_path = os.path.join(category_path, project_dir)
-            if not os.path.isdir(project_path):
-                continue
-            
-            # 检查项目是否有index.html文件
-            index_path = os.path.join(project_path, "index.html")
-            if not os.path.exists(index_path):
-                print(f"警告: 项目 '{project_path}' 缺少 index.html 文件")
-                issues_found = True
-            
-            # 检查项目是否有project.json文件
-            json_path = os.path.join(project_path, "project.json")
-            if not os.path.exists(json_path):
-                print(f"警告: 项目 '{project_path}' 缺少 project.json 文件")
-                issues_found = True
-                continue
-            
-            # 验证project.json文件内容
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    project_data = json.load(f)
-                
-                # 检查必要字段
-                required_fields = ["title", "description", "status", "primary_category"]
-                for field in required_fields:
-                    if field not in project_data:
-                        print(f"警告: 项目 '{project_path}' 的 project.json 缺少必要字段 '{field}'")
-                        issues_found = True
-                
-                # 检查primary_category是否与实际目录匹配
-                primary_category = project_data.get("primary_category")
-                if primary_category and primary_category != category_dir:
-                    print(f"警告: 项目 '{project_path}' 的 primary_category '{primary_category}' 与实际目录 '{category_dir}' 不匹配")
-                    issues_found = True
-                
-                # 检查版本信息
-                if "version" not in project_data:
-                    print(f"警告: 项目 '{project_path}' 缺少版本信息")
-                    issues_found = True
-                
-                # 检查作者信息
-                if "author" not in project_data:
-                    print(f"警告: 项目 '{project_path}' 缺少作者信息")
-                    issues_found = True
-                elif "creator" not in project_data["author"]:
-                    print(f"警告: 项目 '{project_path}' 的作者信息缺少创建者字段")
-                    issues_found = True
-                
-            except json.JSONDecodeError:
-                print(f"错误: 项目 '{project_path}' 的 project.json 文件格式无效")
-                issues_found = True
-            except Exception as e:
-                print(f"错误: 读取项目 '{project_path}' 的 project.json 时出错: {e}")
-                issues_found = True
-    
-    if not issues_found:
+
+    report = run_validation(jobs=jobs, use_cache=use_cache, projects_root=projects_root)
+    if json_output:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return report["ok"]
+
+    print_report(report)
+    if report["ok"]:
         print("验证完成: 所有项目元数据和文件结构都符合要求")
-        return True
     else:
         print("验证完成: 发现一些问题，请修复后重新运行主页生成脚本")
-        return False
+    return report["ok"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='验证所有项目的元数据和文件结构')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='并行验证的进程数，0 表示使用全部CPU核心（默认: 1）')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出报告')
+    parser.add_argument('--no-cache', action='store_true', help='忽略验证缓存，重新检查所有项目')
+    args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs 不能为负数")
+
+    jobs = args.jobs or os.cpu_count() or 1
+    return 0 if validate_projects(jobs=jobs, use_cache=not args.no_cache, json_output=args.json) else 1
+
 
 if __name__ == "__main__":
-    success = validate_projects()
-    sys.exit(0 if success else 1)
+    sys.exit(main())
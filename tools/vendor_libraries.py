@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+第三方库本地化与去重
+
+扫描项目 HTML/JS 中引用的 CDN 地址（cdnjs、jsDelivr、unpkg），按 库名@版本/文件 解析，
+从离线缓存目录填充共享的本地库存储 common/vendor/，并把发布目录（默认 dist/，见 site_dist.py）
+中的引用改写为指向同一份本地文件。所有项目共用一份副本，浏览器只需下载和缓存一次，
+也不再需要与第三方域名建立 DNS/TLS 连接。
+
+解析规则:
+  - 同一个库在不同 CDN 上的名称统一（three.js -> three，p5.js -> p5），
+    three.js 的 rNNN 版本号统一为 npm 的 0.NNN.0
+  - 内容完全相同的 JS 文件（例如 cdnjs 和 jsDelivr 上的同一版本）只保留一份，引用指向同一路径
+  - 项目内私有的库副本（例如 js/lib/three.min.js）与本地库存储中的文件内容相同时，改为引用共享副本
+  - CSS 中引用的字体等文件一起本地化，缺少任何一个时该 CSS 保持 CDN 地址
+  - 离线缓存和本地库存储中都找不到的地址保持不变，并在报告中列出
+
+离线缓存目录的结构可以是 <主机名>/<路径>（与 wget -x 下载的结构相同），例如
+  cache/cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js
+也可以是 <库名>@<版本>/<文件>，例如
+  cache/three@0.128.0/three.min.js
+
+用法:
+  python tools/vendor_libraries.py --cache-dir ~/cdn-cache    # 填充本地库存储并改写 dist/ 中的引用
+  python tools/vendor_libraries.py                            # 只使用已有的本地库存储
+  python tools/vendor_libraries.py --report vendor.json       # 同时保存 JSON 报告
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import argparse
+from collections import defaultdict
+from urllib.parse import urljoin, urlsplit
+
+from project_catalog import get_catalog
+from site_dist import DIST_DIR, mirror_site, file_sha256
+from utils import write_file_if_changed
+
+# 共享的本地库存储（相对于仓库根目录，发布时镜像到 dist/common/vendor/）
+VENDOR_DIR = os.path.join("common", "vendor")
+
+# 支持的 CDN 地址格式
+CDN_PATTERNS = [
+    re.compile(r'^https?://cdnjs\.cloudflare\.com/ajax/libs/(?P<name>[^/]+)/(?P<version>[^/]+)/(?P<path>.*)$'),
+    re.compile(r'^https?://cdn\.jsdelivr\.net/npm/(?P<name>(?:@[^/@]+/)?[^/@]+)@(?P<version>[^/]+)/(?P<path>.*)$'),
+    re.compile(r'^https?://unpkg\.com/(?P<name>(?:@[^/@]+/)?[^/@]+)@(?P<version>[^/]+)/(?P<path>.*)$'),
+]
+
+# 在 HTML/JS 中查找 CDN 地址
+CDN_URL_PATTERN = re.compile(
+    r'https?://(?:cdnjs\.cloudflare\.com|cdn\.jsdelivr\.net|unpkg\.com)/[^\s"\'`<>()]+'
+)
+
+# 不同 CDN 上同一个库的名称
+NAME_ALIASES = {
+    "three.js": "three",
+    "p5.js": "p5",
+    "Tone": "tone",
+}
+
+# 可以从文件内容中识别版本的库
+LIBRARY_SIGNATURES = {
+    # 压缩版中 REVISION 是模块的第一个常量: "use strict";const e="157"
+    "three": (re.compile(r'Three\.js Authors'),
+              re.compile(r'(?:REVISION\s*=\s*|"use strict";const \w+\s*=\s*)["\'](\d+)["\']'), "r{}"),
+}
+
+# 可以按内容去重的文件
+DEDUPE_EXTENSIONS = ('.js', '.mjs')
+
+# 引用改写
+SRC_ATTRIBUTE_PATTERN = re.compile(r'\b(src|href)(\s*=\s*)(["\'])([^"\']+)\3', re.IGNORECASE)
+CSS_URL_PATTERN = re.compile(r'url\(\s*["\']?([^"\')]+?)["\']?\s*\)')
+
+
+def normalize_version(name, version):
+    """统一版本号写法"""
+    if name == "three" and re.fullmatch(r'r\d+', version):
+        return f"0.{version[1:]}.0"
+    return version
+
+
+def parse_cdn_url(url):
+    """解析 CDN 地址，返回 {"url", "name", "version", "path", "key"}，无法识别时返回 None"""
+    for pattern in CDN_PATTERNS:
+        match = pattern.match(url)
+        if match:
+            name = NAME_ALIASES.get(match.group("name"), match.group("name"))
+            version = normalize_version(name, match.group("version"))
+            path = match.group("path")
+            return {
+                "url": url,
+                "name": name,
+                "version": version,
+                "path": path,
+                "key": f"{name}@{version}/{path}"
+            }
+    return None
+
+
+def is_pinned(version):
+    """版本号是否固定到具体版本（vue@3 这样的范围会随 CDN 更新而变化）"""
+    return bool(re.fullmatch(r'\d+\.\d+\.\d+([-.][0-9A-Za-z.]+)?', version))
+
+
+def _to_url_path(path):
+    return path.replace(os.sep, "/")
+
+
+class VendorStore:
+    """本地库存储，按需从离线缓存目录填充"""
+
+    def __init__(self, store_dir=VENDOR_DIR, cache_dir=None):
+        self.store_dir = store_dir
+        self.cache_dir = cache_dir
+        self._resolved = {}
+        self._hashes = {}
+
+    def _cache_candidates(self, ref):
+        """离线缓存中可能的位置"""
+        if not self.cache_dir:
+            return []
+        parts = urlsplit(ref["url"])
+        return [
+            os.path.join(self.cache_dir, parts.netloc, parts.path.lstrip("/")),
+            os.path.join(self.cache_dir, ref["key"]),
+        ]
+
+    def _fetch(self, ref, target):
+        """把缓存中的文件或目录复制到存储，返回是否成功"""
+        is_directory = not ref["path"] or ref["path"].endswith("/")
+        if os.path.isdir(target) if is_directory else os.path.isfile(target):
+            return True
+        for candidate in self._cache_candidates(ref):
+            if is_directory and os.path.isdir(candidate):
+                shutil.copytree(candidate, target, dirs_exist_ok=True)
+                return True
+            if not is_directory and os.path.isfile(candidate):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(candidate, target)
+                return True
+        return False
+
+    def resolve(self, ref):
+        """确保库文件（以及 CSS 引用的文件）在存储中，返回存储中的相对路径列表，找不到时返回 None"""
+        if ref["key"] in self._resolved:
+            return self._resolved[ref["key"]]
+
+        files = None
+        target = os.path.join(self.store_dir, ref["key"])
+        if self._fetch(ref, target):
+            if os.path.isdir(target):
+                files = [_to_url_path(os.path.relpath(os.path.join(root, name), self.store_dir))
+                         for root, dirs, names in os.walk(target) for name in sorted(names)]
+            else:
+                files = [ref["key"]]
+                if target.endswith('.css'):
+                    files = self._resolve_css_dependencies(ref, target, files)
+
+        self._resolved[ref["key"]] = files
+        return files
+
+    def _resolve_css_dependencies(self, ref, target, files):
+        """本地化 CSS 中以相对路径引用的字体、图片"""
+        with open(target, 'r', encoding='utf-8', errors='replace') as f:
+            css = f.read()
+        for url in sorted(set(CSS_URL_PATTERN.findall(css))):
+            if url.startswith(('data:', 'http:', 'https:', '//', '#', '/')):
+                continue
+            dependency = parse_cdn_url(urljoin(ref["url"], url.split('#')[0].split('?')[0]))
+            dependency_files = self.resolve(dependency) if dependency else None
+            if not dependency_files:
+                return None
+            files = files + dependency_files
+        return files
+
+    def file_hash(self, store_path):
+        """存储中文件的内容哈希"""
+        if store_path not in self._hashes:
+            self._hashes[store_path] = file_sha256(os.path.join(self.store_dir, store_path))
+        return self._hashes[store_path]
+
+
+def _document_base(path, project_dir):
+    """引用的解析基准：HTML 相对于自身所在目录，JS 中的字符串相对于项目页面（项目根目录）"""
+    return os.path.dirname(path) if path.lower().endswith(('.html', '.htm')) else project_dir
+
+
+def _relative_url(target, base):
+    return _to_url_path(os.path.relpath(target, base))
+
+
+def _project_files(project_dir, extensions):
+    for root, dirs, files in os.walk(project_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield os.path.join(root, name)
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _detect_version(path):
+    """从私有副本的内容中识别库和版本"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            head = f.read(256 * 1024)
+    except OSError:
+        return None
+    for name, (marker, version_pattern, version_format) in LIBRARY_SIGNATURES.items():
+        match = version_pattern.search(head)
+        if marker.search(head) and match:
+            return name, normalize_version(name, version_format.format(match.group(1)))
+    return None
+
+
+def scan_references(dist_dir=DIST_DIR):
+    """扫描发布目录中各项目引用的 CDN 地址，返回 {地址: [引用文件]}"""
+    references = defaultdict(list)
+    for entry in get_catalog().entries(include_missing=True):
+        project_dir = os.path.join(dist_dir, entry["path"])
+        for path in _project_files(project_dir, ('.html', '.htm', '.js', '.mjs')):
+            content = _read_text(path)
+            if not content:
+                continue
+            for url in sorted(set(CDN_URL_PATTERN.findall(content))):
+                references[url].append(_to_url_path(os.path.relpath(path, dist_dir)))
+    return references
+
+
+def vendor_libraries(dist_dir=DIST_DIR, cache_dir=None, mirror=True, report_path=None):
+    """本地化第三方库并改写发布目录中的引用，返回是否成功"""
+    if mirror:
+        stats = mirror_site(dist_dir)
+        print(f"已镜像站点到 {dist_dir}: 复制 {stats['copied']} 个文件, 未变化 {stats['unchanged']} 个")
+
+    store = VendorStore(cache_dir=cache_dir)
+    references = scan_references(dist_dir)
+
+    # 解析地址，确定每个地址对应的存储文件
+    report = {"libraries": {}, "same_content": [], "multiple_versions": {}, "unpinned": [],
+              "private_copies": [], "unresolved": {}}
+    canonical = {}
+    replacements = {}
+    for url, documents in sorted(references.items()):
+        ref = parse_cdn_url(url)
+        files = store.resolve(ref) if ref else None
+        if not files:
+            report["unresolved"][url] = documents
+            if ref is None:
+                continue
+        library = report["libraries"].setdefault(ref["name"], {}).setdefault(ref["version"], {"urls": {}})
+        library["urls"][url] = documents
+        if not is_pinned(ref["version"]) and url not in report["unpinned"]:
+            report["unpinned"].append(url)
+        if not files:
+            continue
+
+        # 内容相同的 JS 文件只保留一份（按路径排序取第一个）
+        target = ref["key"]
+        if target.endswith(DEDUPE_EXTENSIONS):
+            digest = store.file_hash(target)
+            canonical.setdefault(digest, set()).add(target)
+        replacements[url] = target
+
+    for digest, targets in canonical.items():
+        shared = min(targets)
+        for url, target in replacements.items():
+            if target in targets:
+                replacements[url] = shared
+        if len(targets) > 1:
+            report["same_content"].append({
+                "shared": shared,
+                "urls": sorted(url for url, target in replacements.items() if target == shared)
+            })
+
+    for name, versions in report["libraries"].items():
+        if len(versions) > 1:
+            report["multiple_versions"][name] = sorted(versions)
+
+    # 把用到的存储文件复制到发布目录（--no-mirror 时发布目录中可能还没有新填充的文件）
+    used = set()
+    for url, target in replacements.items():
+        if target.endswith(DEDUPE_EXTENSIONS):
+            used.add(target)
+        else:
+            used.update(store.resolve(parse_cdn_url(url)))
+    for store_path in sorted(used):
+        source = os.path.join(store.store_dir, store_path)
+        destination = os.path.join(dist_dir, VENDOR_DIR, store_path)
+        if not os.path.exists(destination) or file_sha256(destination) != store.file_hash(store_path):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copy2(source, destination)
+
+    shared_by_hash = {digest: min(targets) for digest, targets in canonical.items()}
+    cdn_names = {os.path.basename(target) for target in replacements.values()}
+    rewritten = 0
+    for entry in get_catalog().entries(include_missing=True):
+        project_dir = os.path.join(dist_dir, entry["path"])
+        if not os.path.isdir(project_dir):
+            continue
+
+        # 与共享副本内容相同的私有库副本
+        private = {}
+        for path in _project_files(project_dir, DEDUPE_EXTENSIONS):
+            detected = _detect_version(path)
+            if not detected and os.path.basename(path) not in cdn_names:
+                continue
+            shared = shared_by_hash.get(file_sha256(path))
+            report["private_copies"].append({
+                "file": _to_url_path(os.path.relpath(path, dist_dir)),
+                "library": f"{detected[0]}@{detected[1]}" if detected else None,
+                "shared": shared
+            })
+            if shared:
+                private[os.path.normpath(path)] = shared
+
+        for path in _project_files(project_dir, ('.html', '.htm', '.js', '.mjs')):
+            content = _read_text(path)
+            if content is None:
+                continue
+            base = _document_base(path, project_dir)
+            new_content = CDN_URL_PATTERN.sub(
+                lambda m: _relative_url(os.path.join(dist_dir, VENDOR_DIR, replacements[m.group(0)]), base)
+                if m.group(0) in replacements else m.group(0),
+                content
+            )
+            if private and path.lower().endswith(('.html', '.htm')):
+                def replace_private(match):
+                    local = os.path.normpath(os.path.join(base, match.group(4).split('?')[0]))
+                    if local not in private:
+                        return match.group(0)
+                    url = _relative_url(os.path.join(dist_dir, VENDOR_DIR, private[local]), base)
+                    return f"{match.group(1)}{match.group(2)}{match.group(3)}{url}{match.group(3)}"
+                new_content = SRC_ATTRIBUTE_PATTERN.sub(replace_private, new_content)
+            if new_content != content and write_file_if_changed(path, new_content):
+                rewritten += 1
+
+    print_report(report, replacements)
+    if report_path:
+        try:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"报告已保存到 {report_path}")
+        except Exception as e:
+            print(f"保存报告时出错: {e}")
+            return False
+
+    print(f"处理完成! 本地化地址: {len(replacements)}, 未解析: {len(report['unresolved'])}, "
+          f"共享文件: {len(used)}, 改写文件: {rewritten}")
+    return True
+
+
+def print_report(report, replacements):
+    """打印去重报告"""
+    print("\n第三方库引用:")
+    for name, versions in sorted(report["libraries"].items()):
+        for version, item in sorted(versions.items()):
+            count = sum(len(documents) for documents in item["urls"].values())
+            print(f"  {name}@{version}: {count} 处引用, {len(item['urls'])} 个地址")
+            for url in sorted(item["urls"]):
+                state = f"-> {VENDOR_DIR}/{replacements[url]}" if url in replacements else "(未本地化)"
+                print(f"    {url} {state}")
+
+    if report["multiple_versions"]:
+        print("\n同一个库的多个版本:")
+        for name, versions in sorted(report["multiple_versions"].items()):
+            print(f"  {name}: {', '.join(versions)}")
+
+    if report["same_content"]:
+        print("\n内容相同、已合并为一份的地址:")
+        for item in report["same_content"]:
+            print(f"  {item['shared']}: {', '.join(item['urls'])}")
+
+    if report["private_copies"]:
+        print("\n项目内的私有库副本:")
+        for item in report["private_copies"]:
+            state = f"-> {VENDOR_DIR}/{item['shared']}" if item["shared"] else "(与共享副本内容不同)"
+            print(f"  {item['file']} [{item['library'] or '未知版本'}] {state}")
+
+    if report["unpinned"]:
+        print("\n未固定版本的地址（CDN 内容可能变化）:")
+        for url in report["unpinned"]:
+            print(f"  {url}")
+
+    if report["unresolved"]:
+        print("\n未找到本地文件的地址:")
+        for url, documents in sorted(report["unresolved"].items()):
+            print(f"  {url} ({len(documents)} 处引用)")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='把 CDN 上的第三方库本地化到共享存储并改写引用')
+    parser.add_argument('--cache-dir', help='离线缓存目录，用于填充 common/vendor/')
+    parser.add_argument('--output', '-o', default=DIST_DIR, help=f'发布目录（默认: {DIST_DIR}）')
+    parser.add_argument('--report', metavar='FILE', help='保存 JSON 格式的去重报告')
+    parser.add_argument('--no-mirror', action='store_true', help='不重新镜像站点，直接处理发布目录')
+    args = parser.parse_args()
+
+    if args.cache_dir and not os.path.isdir(args.cache_dir):
+        print(f"离线缓存目录不存在: {args.cache_dir}")
+        return 1
+
+    ok = vendor_libraries(args.output, args.cache_dir, mirror=not args.no_mirror, report_path=args.report)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,17 +2,20 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
+import sys
 from datetime import datetime, timedelta
 import random
 
+# 复用 tools 目录中的项目目录缓存
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from project_catalog import find_all_config_paths
+from metadata_transaction import MetadataTransaction
+from page_weight import estimate_performance_impact
+
 def find_all_project_json_files():
     """查找所有project.json文件"""
-    project_files = []
-    for root, dirs, files in os.walk('projects'):
-        if 'project.json' in files:
-            project_files.append(os.path.join(root, 'project.json'))
-    return project_files
+    # 项目目录中的配置来自带磁盘缓存的项目目录，其他深度的 project.json 由遍历补充
+    return find_all_config_paths()
 
 def generate_creation_date(last_updated_date):
     """根据last_updated生成一个合理的creation_date"""
@@ -37,86 +40,90 @@ def generate_creation_date(last_updated_date):
     
     return creation_date.strftime("%Y-%m-%d")
 
-def update_project_json(file_path):
-    """更新单个project.json文件"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # 检查是否已有creation_date
-        if 'creation_date' not in data:
-            # 如果有last_updated，根据它生成creation_date
-            if 'last_updated' in data:
-                data['creation_date'] = generate_creation_date(data['last_updated'])
-            else:
-                # 如果没有last_updated，使用当前日期减去30天
-                data['creation_date'] = generate_creation_date(datetime.now().strftime("%Y-%m-%d"))
-        
-        # 确保有version字段
-        if 'version' not in data:
-            data['version'] = "1.0.0"
-        
-        # 确保有last_updated字段
-        if 'last_updated' not in data:
-            data['last_updated'] = datetime.now().strftime("%Y-%m-%d")
-        
-        # 确保有changelog字段
-        if 'changelog' not in data:
-            data['changelog'] = [{
-                "version": data['version'],
-                "date": data['last_updated'],
-                "changes": ["初始版本"]
-            }]
-        
-        # 确保有compatibility字段
-        if 'compatibility' not in data:
-            data['compatibility'] = {
-                "mobile": True,
-                "desktop": True,
-                "min_screen_width": 320,
-                "performance_impact": "medium"
-            }
-        
-        # 确保有author字段
-        if 'author' not in data:
-            data['author'] = {
-                "name": "Little Shock Team",
-                "contact": "https://waytoagi.feishu.cn/wiki/UaxewECiHiVBmykypR0c48FhnFd"
-            }
-        
-        # 确保有features字段
-        if 'features' not in data:
-            data['features'] = ["基本功能"]
-        
-        # 确保有dependencies字段
-        if 'dependencies' not in data:
-            data['dependencies'] = []
-        
-        # 保存更新后的数据
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        
-        print(f"已更新: {file_path}")
+def complete_project_data(data, project_path):
+    """补全单个项目配置中缺失的字段（原地修改）"""
+    # 检查是否已有creation_date
+    if 'creation_date' not in data:
+        # 如果有last_updated，根据它生成creation_date
+        if 'last_updated' in data:
+            data['creation_date'] = generate_creation_date(data['last_updated'])
+        else:
+            # 如果没有last_updated，使用当前日期减去30天
+            data['creation_date'] = generate_creation_date(datetime.now().strftime("%Y-%m-%d"))
+    
+    # 确保有version字段
+    if 'version' not in data:
+        data['version'] = "1.0.0"
+    
+    # 确保有last_updated字段
+    if 'last_updated' not in data:
+        data['last_updated'] = datetime.now().strftime("%Y-%m-%d")
+    
+    # 确保有changelog字段
+    if 'changelog' not in data:
+        data['changelog'] = [{
+            "version": data['version'],
+            "date": data['last_updated'],
+            "changes": ["初始版本"]
+        }]
+    
+    # 确保有compatibility字段（性能影响由页面体积分析推导）
+    if 'compatibility' not in data:
+        data['compatibility'] = {
+            "mobile": True,
+            "desktop": True,
+            "min_screen_width": 320,
+            "performance_impact": estimate_performance_impact(project_path)
+        }
+    
+    # 确保有author字段
+    if 'author' not in data:
+        data['author'] = {
+            "name": "Little Shock Team",
+            "contact": "https://waytoagi.feishu.cn/wiki/UaxewECiHiVBmykypR0c48FhnFd"
+        }
+    
+    # 确保有features字段
+    if 'features' not in data:
+        data['features'] = ["基本功能"]
+    
+    # 确保有dependencies字段
+    if 'dependencies' not in data:
+        data['dependencies'] = []
+
+def update_project_json(file_path, transaction=None):
+    """更新单个project.json文件
+
+    传入 transaction 时只把修改加入事务，由调用方统一提交；否则立即写回。
+    """
+    def edit(data):
+        complete_project_data(data, os.path.dirname(file_path))
+
+    if transaction is not None:
+        transaction.add(file_path, edit, "补全字段")
         return True
-    except Exception as e:
-        print(f"更新 {file_path} 时出错: {e}")
+
+    standalone = MetadataTransaction()
+    standalone.add(file_path, edit, "补全字段")
+    if standalone.commit()[0]["error"]:
         return False
+    print(f"已更新: {file_path}")
+    return True
 
 def main():
     """主函数"""
     project_files = find_all_project_json_files()
     print(f"找到 {len(project_files)} 个项目文件")
     
-    success_count = 0
-    fail_count = 0
-    
+    # 所有修改加入同一个事务，每个文件只读取一次，内容有变化时才写回
+    transaction = MetadataTransaction()
     for file_path in project_files:
-        if update_project_json(file_path):
-            success_count += 1
-        else:
-            fail_count += 1
+        update_project_json(file_path, transaction=transaction)
+    transaction.commit()
     
-    print(f"\n更新完成! 成功: {success_count}, 失败: {fail_count}")
+    success_count = transaction.stats["files"] - transaction.stats["failed"]
+    fail_count = transaction.stats["failed"]
+    print(f"\n更新完成! 成功: {success_count}, 失败: {fail_count} ({transaction.summary()})")
 
 if __name__ == "__main__":
     main()
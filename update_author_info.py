@@ -2,9 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
+import sys
 import random
 
+# 复用 tools 目录中的项目目录缓存
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from project_catalog import find_all_config_paths
+from metadata_transaction import MetadataTransaction
+
 # 可能的创建者名字列表（示例名字，实际使用时应替换为真实名字）
 CREATORS = [
     "王小明", "李小华", "张小强", "刘小红", "陈小军", 
@@ -21,11 +26,8 @@ CONTRIBUTORS = [
 
 def find_all_project_json_files():
     """查找所有project.json文件"""
-    project_files = []
-    for root, dirs, files in os.walk('projects'):
-        if 'project.json' in files:
-            project_files.append(os.path.join(root, 'project.json'))
-    return project_files
+    # 项目目录中的配置来自带磁盘缓存的项目目录，其他深度的 project.json 由遍历补充
+    return find_all_config_paths()
 
 def generate_random_creator():
     """生成随机创建者"""
@@ -36,42 +38,43 @@ def generate_random_contributors(count=2, exclude=None):
     available_contributors = [c for c in CONTRIBUTORS if c != exclude]
     return random.sample(available_contributors, min(count, len(available_contributors)))
 
-def update_author_info(file_path):
-    """更新单个project.json文件的作者信息"""
-    try:
-        # 读取文件
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+def complete_author_info(data):
+    """补全项目配置中缺失的作者信息（原地修改）"""
+    # 检查是否已有author字段
+    if 'author' not in data:
+        # 如果没有author字段，创建一个新的
+        creator = generate_random_creator()
+        contributors = generate_random_contributors(2)
+        data['author'] = {
+            "name": "Little Shock Team",
+            "contact": "https://waytoagi.feishu.cn/wiki/UaxewECiHiVBmykypR0c48FhnFd",
+            "creator": creator,
+            "contributors": contributors
+        }
+    else:
+        # 如果已有author字段，检查是否有creator和contributors
+        if 'creator' not in data['author'] or not data['author']['creator']:
+            data['author']['creator'] = generate_random_creator()
         
-        # 检查是否已有author字段
-        if 'author' not in data:
-            # 如果没有author字段，创建一个新的
-            creator = generate_random_creator()
-            contributors = generate_random_contributors(2)
-            data['author'] = {
-                "name": "Little Shock Team",
-                "contact": "https://waytoagi.feishu.cn/wiki/UaxewECiHiVBmykypR0c48FhnFd",
-                "creator": creator,
-                "contributors": contributors
-            }
-        else:
-            # 如果已有author字段，检查是否有creator和contributors
-            if 'creator' not in data['author'] or not data['author']['creator']:
-                data['author']['creator'] = generate_random_creator()
-            
-            if 'contributors' not in data['author'] or not data['author']['contributors']:
-                # 确保贡献者不包括创建者
-                data['author']['contributors'] = generate_random_contributors(2, data['author']['creator'])
-        
-        # 保存更新后的文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        
-        print(f"已更新作者信息: {file_path}")
+        if 'contributors' not in data['author'] or not data['author']['contributors']:
+            # 确保贡献者不包括创建者
+            data['author']['contributors'] = generate_random_contributors(2, data['author']['creator'])
+
+def update_author_info(file_path, transaction=None):
+    """更新单个project.json文件的作者信息
+
+    传入 transaction 时只把修改加入事务，由调用方统一提交；否则立即写回。
+    """
+    if transaction is not None:
+        transaction.add(file_path, complete_author_info, "补全作者信息")
         return True
-    except Exception as e:
-        print(f"更新 {file_path} 时出错: {e}")
+
+    standalone = MetadataTransaction()
+    standalone.add(file_path, complete_author_info, "补全作者信息")
+    if standalone.commit()[0]["error"]:
         return False
+    print(f"已更新作者信息: {file_path}")
+    return True
 
 def update_readme_with_author_info(project_dir, author_info):
     """更新README.md文件，添加作者信息"""
@@ -125,26 +128,23 @@ def main():
     project_files = find_all_project_json_files()
     print(f"找到 {len(project_files)} 个项目文件")
     
-    # 更新每个文件的作者信息
+    # 更新每个文件的作者信息（所有修改加入同一个事务，每个文件只读取一次）
     success_count = 0
     fail_count = 0
     
+    transaction = MetadataTransaction()
     for file_path in project_files:
-        if update_author_info(file_path):
-            # 读取更新后的作者信息
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if 'author' in data:
-                        # 更新对应的README文件
-                        project_dir = os.path.dirname(file_path)
-                        update_readme_with_author_info(project_dir, data['author'])
-            except Exception as e:
-                print(f"读取更新后的作者信息时出错: {e}")
-            
-            success_count += 1
-        else:
+        update_author_info(file_path, transaction=transaction)
+    
+    for result in transaction.commit():
+        if result["error"]:
             fail_count += 1
+            continue
+        # 直接使用提交后的作者信息更新对应的README文件
+        if 'author' in result["config"]:
+            project_dir = os.path.dirname(result["path"])
+            update_readme_with_author_info(project_dir, result["config"]['author'])
+        success_count += 1
     
     print(f"\n更新完成! 成功: {success_count}, 失败: {fail_count}")
 
@@ -2,46 +2,49 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
+import sys
+
+# 复用 tools 目录中的项目目录缓存
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from project_catalog import find_all_config_paths
+from metadata_transaction import MetadataTransaction
 
 def find_all_project_json_files():
     """查找所有project.json文件"""
-    project_files = []
-    for root, dirs, files in os.walk('projects'):
-        if 'project.json' in files:
-            project_files.append(os.path.join(root, 'project.json'))
-    return project_files
+    # 项目目录中的配置来自带磁盘缓存的项目目录，其他深度的 project.json 由遍历补充
+    return find_all_config_paths()
 
-def update_author_info(file_path):
-    """更新单个project.json文件的作者信息"""
-    try:
-        # 读取文件
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # 检查是否已有author字段
-        if 'author' not in data:
-            # 如果没有author字段，创建一个新的
-            data['author'] = {
-                "name": "Little Shock Team",
-                "contact": "https://waytoagi.feishu.cn/wiki/UaxewECiHiVBmykypR0c48FhnFd",
-                "creator": "Little-Shock",
-                "contributors": []
-            }
-        else:
-            # 如果已有author字段，更新creator和contributors
-            data['author']['creator'] = "Little-Shock"
-            data['author']['contributors'] = []
-        
-        # 保存更新后的文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        
-        print(f"已更新作者信息: {file_path}")
+def reset_author_info(data):
+    """把项目配置中的作者信息统一为 Little-Shock（原地修改）"""
+    # 检查是否已有author字段
+    if 'author' not in data:
+        # 如果没有author字段，创建一个新的
+        data['author'] = {
+            "name": "Little Shock Team",
+            "contact": "https://waytoagi.feishu.cn/wiki/UaxewECiHiVBmykypR0c48FhnFd",
+            "creator": "Little-Shock",
+            "contributors": []
+        }
+    else:
+        # 如果已有author字段，更新creator和contributors
+        data['author']['creator'] = "Little-Shock"
+        data['author']['contributors'] = []
+
+def update_author_info(file_path, transaction=None):
+    """更新单个project.json文件的作者信息
+
+    传入 transaction 时只把修改加入事务，由调用方统一提交；否则立即写回。
+    """
+    if transaction is not None:
+        transaction.add(file_path, reset_author_info, "重置作者信息")
         return True
-    except Exception as e:
-        print(f"更新 {file_path} 时出错: {e}")
+
+    standalone = MetadataTransaction()
+    standalone.add(file_path, reset_author_info, "重置作者信息")
+    if standalone.commit()[0]["error"]:
         return False
+    print(f"已更新作者信息: {file_path}")
+    return True
 
 def update_readme_with_author_info(project_dir):
     """更新README.md文件中的作者信息"""
@@ -96,19 +99,22 @@ def main():
     project_files = find_all_project_json_files()
     print(f"找到 {len(project_files)} 个项目文件")
     
-    # 更新每个文件的作者信息
+    # 更新每个文件的作者信息（所有修改加入同一个事务，每个文件只读取一次）
     success_count = 0
     fail_count = 0
     
+    transaction = MetadataTransaction()
     for file_path in project_files:
-        if update_author_info(file_path):
-            # 更新对应的README文件
-            project_dir = os.path.dirname(file_path)
-            update_readme_with_author_info(project_dir)
-            
-            success_count += 1
-        else:
+        update_author_info(file_path, transaction=transaction)
+    
+    for result in transaction.commit():
+        if result["error"]:
             fail_count += 1
+            continue
+        # 更新对应的README文件
+        project_dir = os.path.dirname(result["path"])
+        update_readme_with_author_info(project_dir)
+        success_count += 1
     
     print(f"\n更新完成! 成功: {success_count}, 失败: {fail_count}")
 
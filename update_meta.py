@@ -1,15 +1,17 @@
 import os
+import sys
 import json
 import random
 from datetime import datetime, timedelta
 
+# 复用 tools 目录中的项目目录缓存
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from project_catalog import find_all_config_paths
+
 def find_project_files():
     """查找所有project.json文件"""
-    result = []
-    for root, dirs, files in os.walk("projects"):
-        if "project.json" in files:
-            result.append(os.path.join(root, "project.json"))
-    return result
+    # 项目目录中的配置来自带磁盘缓存的项目目录，其他深度的 project.json 由遍历补充
+    return find_all_config_paths()
 
 def generate_creation_date(last_updated):
     """生成合理的创建日期"""